@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Asset Pipeline for VendAI POS
+Shared engine behind build/icons/generate_icons.py, simple_icon_generator.py and
+image-gen/generate_images.py. Each source is rendered or decoded once at the
+largest size needed and every other size is downsampled from that image in
+memory. ICO and ICNS files are built from the same images. Jobs run on a
+process pool, and a job is skipped when its sources and settings hash to the
+value recorded in the manifest next to its outputs. Outputs of jobs whose
+sources are gone are deleted.
+
+Requirements:
+    pip install Pillow
+"""
+
+import hashlib
+import io
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from PIL import Image
+except ImportError:
+    print("Missing required package. Install with:")
+    print("pip install Pillow")
+    sys.exit(1)
+
+# Bump when the rendering changes so every output is rebuilt once
+ENGINE_VERSION = 1
+MANIFEST_NAME = '.asset-manifest.json'
+# Older manifests held digests only; they are discarded and everything is rebuilt once
+MANIFEST_VERSION = 2
+HASH_BLOCK_SIZE = 1 << 20
+
+# ICO holds up to 256px; ICNS goes up to 1024px (512px @2x)
+ICO_SIZES = [256, 128, 64, 48, 32, 16]
+ICNS_SIZES = [1024, 512, 256, 128, 64, 32, 16]
+
+Task = Callable[['AssetJob'], None]
+
+
+class AssetJob:
+    """One unit of work: sources read, outputs written by task(job), and the settings that shape them"""
+
+    __slots__ = ('key', 'sources', 'outputs', 'task', 'params')
+
+    def __init__(self, key: str, sources: Iterable[Path], outputs: Iterable[Path], task: Task,
+                 params: Optional[Dict[str, Any]] = None):
+        self.key = key
+        self.sources = [Path(path) for path in sources]
+        self.outputs = [Path(path) for path in outputs]
+        self.task = task
+        self.params = params or {}
+
+    def digest(self) -> str:
+        """Hash of the source bytes, the task and its params; outputs are current while this matches"""
+        digest = hashlib.sha256()
+        settings = [ENGINE_VERSION, f"{self.task.__module__}.{self.task.__qualname__}", self.params]
+        digest.update(json.dumps(settings, sort_keys=True, default=str).encode('utf-8'))
+        for source in self.sources:
+            digest.update(source.name.encode('utf-8'))
+            with open(source, 'rb') as f:
+                for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                    digest.update(block)
+        return digest.hexdigest()
+
+
+class Manifest:
+    """Source digest and outputs of the last successful build, keyed by job"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.entries: Dict[str, Dict[str, Any]] = (
+            data.get('entries', {}) if data.get('version') == MANIFEST_VERSION else {})
+
+    def is_current(self, job: AssetJob, digest: str) -> bool:
+        entry = self.entries.get(job.key)
+        return entry is not None and entry['digest'] == digest and all(path.exists() for path in job.outputs)
+
+    def record(self, job: AssetJob, digest: str) -> None:
+        # Outputs are kept relative to the manifest so the folder can be moved as a whole
+        self.entries[job.key] = {
+            'digest': digest,
+            'outputs': [os.path.relpath(path, self.path.parent).replace(os.sep, '/') for path in job.outputs],
+        }
+
+    def prune(self, jobs: List[AssetJob]) -> int:
+        """Delete recorded outputs no job writes any more and forget removed jobs; returns how many were removed"""
+        keys = {job.key for job in jobs}
+        kept = {path.resolve() for job in jobs for path in job.outputs}
+        root = self.path.parent.resolve()
+        for entry in self.entries.values():
+            for output in entry.get('outputs', []):
+                path = (root / output).resolve()
+                if path in kept:
+                    continue
+                path.unlink(missing_ok=True)
+                # Drop subfolders the deleted outputs leave empty
+                folder = path.parent
+                while folder != root and root in folder.parents and folder.is_dir() and not any(folder.iterdir()):
+                    folder.rmdir()
+                    folder = folder.parent
+        gone = [key for key in self.entries if key not in keys]
+        for key in gone:
+            del self.entries[key]
+        return len(gone)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def _run_job(job: AssetJob) -> Tuple[str, Optional[str]]:
+    """Pool entry point: errors come back as text so one bad image does not stop the batch"""
+    try:
+        job.task(job)
+        return job.key, None
+    except Exception as e:
+        return job.key, f"{type(e).__name__}: {e}"
+
+
+def run_jobs(jobs: List[AssetJob], manifest_path: Path, workers: Optional[int] = None,
+             force: bool = False) -> Dict[str, int]:
+    """Run the jobs whose digest changed, record the ones that succeed and prune removed ones; returns counts"""
+    manifest = Manifest(manifest_path)
+    by_key = {job.key: job for job in jobs}
+    digests = {job.key: job.digest() for job in jobs}
+    stale = [job for job in jobs if force or not manifest.is_current(job, digests[job.key])]
+    counts = {'built': 0, 'skipped': len(jobs) - len(stale), 'failed': 0, 'pruned': manifest.prune(jobs)}
+    workers = min(workers or os.cpu_count() or 1, len(stale))
+
+    pool = None
+    try:
+        if workers <= 1:
+            results = map(_run_job, stale)
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            # Small images finish in milliseconds; batch them to keep pickling overhead down
+            results = pool.map(_run_job, stale, chunksize=max(1, len(stale) // (workers * 8)))
+        for key, error in results:
+            if error is None:
+                manifest.record(by_key[key], digests[key])
+                counts['built'] += 1
+            else:
+                manifest.entries.pop(key, None)
+                counts['failed'] += 1
+                print(f"✗ {key}: {error}")
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        manifest.save()
+    return counts
+
+
+def save_image(img: Image.Image, path: Path, **options: Any) -> None:
+    """Encode in memory and replace path in one step, so an interrupted run leaves no partial file"""
+    buffer = io.BytesIO()
+    img.save(buffer, **options)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(buffer.getvalue())
+    os.replace(tmp_path, path)
+
+
+def downsample(master: Image.Image, sizes: Iterable[int]) -> Dict[int, Image.Image]:
+    """Square images at each size, resampled from the one master render"""
+    return {size: master if size == master.width else master.resize((size, size), Image.LANCZOS)
+            for size in sorted(set(sizes), reverse=True)}
+
+
+def write_icon_set(master: Image.Image, out_dir: Path, pngs: Dict[str, int],
+                   ico: Optional[str] = 'icon.ico', icns: Optional[str] = 'icon.icns') -> List[Path]:
+    """Write the PNG sizes, ICO and ICNS for one master image; returns the paths written"""
+    ico_sizes = ICO_SIZES if ico else []
+    icns_sizes = [size for size in ICNS_SIZES if size <= master.width] if icns else []
+    images = downsample(master, [*pngs.values(), *ico_sizes, *icns_sizes])
+    written = []
+    for filename, size in pngs.items():
+        save_image(images[size], out_dir / filename, format='PNG')
+        written.append(out_dir / filename)
+    if ico:
+        frames = [images[size] for size in ico_sizes]
+        save_image(frames[0], out_dir / ico, format='ICO', sizes=[frame.size for frame in frames],
+                   append_images=frames[1:])
+        written.append(out_dir / ico)
+    if icns:
+        frames = [images[size] for size in icns_sizes]
+        save_image(frames[0], out_dir / icns, format='ICNS', append_images=frames[1:])
+        written.append(out_dir / icns)
+    return written
+
+
+def icon_outputs(out_dir: Path, pngs: Dict[str, int], ico: Optional[str] = 'icon.ico',
+                 icns: Optional[str] = 'icon.icns') -> List[Path]:
+    return [out_dir / name for name in [*pngs, ico, icns] if name]
+
+
+def render_thumbnails(job: AssetJob) -> None:
+    """Decode one product image once and write every size and format in params"""
+    params = job.params
+    sizes = sorted(params['sizes'], reverse=True)
+    with Image.open(job.sources[0]) as source:
+        # JPEG can decode straight at a reduced scale, which is most of the cost for large photos
+        source.draft('RGB', (sizes[0], sizes[0]))
+        img = source.convert('RGBA' if 'transparency' in source.info or source.mode in ('RGBA', 'LA', 'P')
+                             else 'RGB')
+    outputs = iter(job.outputs)
+    for size in sizes:
+        # Each size is resampled from the previous, larger one
+        if max(img.size) > size:
+            img = img.copy()
+            img.thumbnail((size, size), Image.LANCZOS)
+        for fmt in params['formats']:
+            save_image(img if fmt != 'jpg' or img.mode == 'RGB' else img.convert('RGB'), next(outputs),
+                       **ENCODERS[fmt](params['quality']))
+
+
+ENCODERS: Dict[str, Callable[[int], Dict[str, Any]]] = {
+    'webp': lambda quality: {'format': 'WEBP', 'quality': quality, 'method': 4},
+    'jpg': lambda quality: {'format': 'JPEG', 'quality': quality, 'optimize': True, 'progressive': True},
+    'png': lambda quality: {'format': 'PNG', 'optimize': True},
+}
+
+
+def thumbnail_jobs(sources: Iterable[Path], source_dir: Path, out_dir: Path, sizes: List[int],
+                   formats: List[str], quality: int) -> List[AssetJob]:
+    """One job per source image, writing <stem>-<size>.<format> under out_dir, mirroring subfolders
+
+    Sources sharing a folder and stem (x.jpg and x.png) keep their extension in the
+    name instead, e.g. x-png-256.webp, so neither overwrites the other.
+    """
+    params = {'sizes': sorted(sizes, reverse=True), 'formats': formats, 'quality': quality}
+    sources = list(sources)
+    relatives = [source.relative_to(source_dir) for source in sources]
+    # Lower-cased, since X.jpg and x.png still collide on case-insensitive file systems
+    stems = Counter((relative.parent, relative.stem.lower()) for relative in relatives)
+    jobs = []
+    for source, relative in zip(sources, relatives):
+        name = relative.stem
+        if stems[relative.parent, name.lower()] > 1:
+            name = f"{name}-{relative.suffix.lstrip('.').lower()}"
+        outputs = [out_dir / relative.parent / f"{name}-{size}.{fmt}"
+                   for size in params['sizes'] for fmt in formats]
+        jobs.append(AssetJob(relative.as_posix(), [source], outputs, render_thumbnails, params))
+    return jobs
@@ -3,17 +3,25 @@
 Icon Generator for VendAI POS
 Converts the SVG icon to various formats needed for different platforms.
 
+The SVG is rasterized once at 1024px; every PNG size, icon.ico and icon.icns
+are downsampled from that render in memory. Nothing is rebuilt while icon.svg
+is unchanged (see ../asset_pipeline.py).
+
 Requirements:
     pip install Pillow cairosvg
 
 Usage:
-    python generate_icons.py
+    python generate_icons.py [--force]
 """
 
-import os
+import argparse
+import io
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from asset_pipeline import MANIFEST_NAME, AssetJob, icon_outputs, run_jobs, write_icon_set
+
 try:
     from PIL import Image
     import cairosvg
@@ -32,47 +40,24 @@ SIZES = {
     'icon-32.png': 32,    # Windows small taskbar
     'icon-16.png': 16,    # Windows system tray
 }
+# Largest size any output needs (the 512px @2x entry of icon.icns)
+MASTER_SIZE = 1024
 
-def convert_svg_to_png(svg_path, output_path, size):
-    """Convert SVG to PNG at specified size"""
-    try:
-        cairosvg.svg2png(
-            url=str(svg_path),
-            write_to=str(output_path),
-            output_width=size,
-            output_height=size
-        )
-        print(f"✓ Created {output_path.name} ({size}x{size})")
-        return True
-    except Exception as e:
-        print(f"✗ Failed to create {output_path.name}: {e}")
-        return False
+def render_svg(svg_path, size):
+    """Rasterize the SVG once at size x size"""
+    png = cairosvg.svg2png(url=str(svg_path), output_width=size, output_height=size)
+    return Image.open(io.BytesIO(png)).convert('RGBA')
 
-def create_ico_from_pngs(png_files, ico_path):
-    """Create Windows ICO file from multiple PNG files"""
-    try:
-        images = []
-        for png_file in png_files:
-            if png_file.exists():
-                img = Image.open(png_file)
-                images.append(img)
-        
-        if images:
-            images[0].save(
-                str(ico_path),
-                format='ICO',
-                sizes=[(img.width, img.height) for img in images]
-            )
-            print(f"✓ Created {ico_path.name} with {len(images)} sizes")
-            return True
-        else:
-            print(f"✗ No PNG files found for ICO creation")
-            return False
-    except Exception as e:
-        print(f"✗ Failed to create {ico_path.name}: {e}")
-        return False
+def build_icons(job):
+    """Render the SVG at the master size and derive the PNGs, icon.ico and icon.icns from it"""
+    master = render_svg(job.sources[0], job.params['master_size'])
+    write_icon_set(master, job.outputs[0].parent, job.params['pngs'])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate the VendAI POS icons from icon.svg')
+    parser.add_argument('--force', action='store_true', help='Rebuild even if icon.svg is unchanged')
+    args = parser.parse_args(argv)
 
-def main():
     # Get script directory
     script_dir = Path(__file__).parent
     svg_file = script_dir / 'icon.svg'
@@ -86,36 +71,28 @@ def main():
     print(f"Output directory: {script_dir}")
     print()
     
-    # Convert SVG to various PNG sizes
-    png_files = []
-    success_count = 0
-    
-    for filename, size in SIZES.items():
-        output_path = script_dir / filename
-        if convert_svg_to_png(svg_file, output_path, size):
-            png_files.append(output_path)
-            success_count += 1
-    
-    print()
+    outputs = icon_outputs(script_dir, SIZES)
+    job = AssetJob('icons', [svg_file], outputs, build_icons, {'master_size': MASTER_SIZE, 'pngs': SIZES})
+    counts = run_jobs([job], script_dir / MANIFEST_NAME, force=args.force)
     
-    # Create Windows ICO file from PNGs
-    ico_path = script_dir / 'icon.ico'
-    ico_pngs = [f for f in png_files if f.name.endswith('.png')]
-    if create_ico_from_pngs(ico_pngs, ico_path):
-        success_count += 1
+    if counts['skipped']:
+        print(f"✓ icon.svg unchanged; {len(outputs)} icons are up to date (use --force to rebuild)")
+    elif counts['built']:
+        for path in outputs:
+            print(f"✓ Created {path.name}")
     
     print()
-    print(f"📊 Summary: {success_count}/{len(SIZES) + 1} icons created successfully")
+    print(f"📊 Summary: {counts['built'] * len(outputs)} icons created, "
+          f"{counts['skipped'] * len(outputs)} unchanged, {counts['failed']} failed")
     
-    if success_count > 0:
+    if counts['built']:
         print()
         print("📝 Next steps:")
-        print("1. For macOS .icns file, use iconutil or online converter")
-        print("2. Update electron-builder.json to point to generated icons")
-        print("3. Test icons in built applications")
+        print("1. Update electron-builder.json to point to generated icons")
+        print("2. Test icons in built applications")
     
-    return success_count > 0
+    return counts['failed'] == 0
 
 if __name__ == '__main__':
     success = main()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    sys.exit(0 if success else 1)
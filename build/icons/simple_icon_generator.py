@@ -1,19 +1,24 @@
 #!/usr/bin/env python3
 """
 Simple Icon Generator for VendAI POS (Windows compatible)
-Creates basic PNG icons in various sizes that can be converted to ICO/ICNS later.
+Creates basic PNG icons in various sizes plus icon.ico and icon.icns, without
+needing cairosvg. Each size is drawn once (small sizes keep their own stroke
+widths); nothing is redrawn while this script is unchanged.
 
 Requirements:
     pip install Pillow
 
 Usage:
-    python simple_icon_generator.py
+    python simple_icon_generator.py [--force]
 """
 
-import os
+import argparse
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from asset_pipeline import ICNS_SIZES, ICO_SIZES, MANIFEST_NAME, AssetJob, icon_outputs, run_jobs, save_image
+
 try:
     from PIL import Image, ImageDraw
 except ImportError:
@@ -80,52 +85,56 @@ def create_vendai_icon(size):
     
     return img
 
-def main():
+def build_icons(job):
+    """Draw every size once and write the PNGs, icon.ico and icon.icns from those images"""
+    out_dir = job.outputs[0].parent
+    icons = {size: create_vendai_icon(size) for size in sorted({*SIZES, *ICO_SIZES, *ICNS_SIZES})}
+    for size in SIZES:
+        save_image(icons[size], out_dir / f"icon-{size}.png", format='PNG')
+    # icon.png is the 512px drawing already made above
+    save_image(icons[512], out_dir / "icon.png", format='PNG')
+    frames = [icons[size] for size in ICO_SIZES]
+    save_image(frames[0], out_dir / "icon.ico", format='ICO', sizes=[frame.size for frame in frames],
+               append_images=frames[1:])
+    frames = [icons[size] for size in ICNS_SIZES]
+    save_image(frames[0], out_dir / "icon.icns", format='ICNS', append_images=frames[1:])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Draw the VendAI POS icons with Pillow only')
+    parser.add_argument('--force', action='store_true', help='Redraw even if this script is unchanged')
+    args = parser.parse_args(argv)
+
     script_dir = Path(__file__).parent
     
     print("🎨 VendAI POS Simple Icon Generator")
     print(f"Output directory: {script_dir}")
     print()
     
-    success_count = 0
-    
-    # Generate PNG files
-    for size in SIZES:
-        try:
-            icon = create_vendai_icon(size)
-            filename = f"icon-{size}.png"
-            filepath = script_dir / filename
-            
-            icon.save(filepath, 'PNG')
-            print(f"✓ Created {filename} ({size}x{size})")
-            success_count += 1
-            
-        except Exception as e:
-            print(f"✗ Failed to create icon-{size}.png: {e}")
+    pngs = {f"icon-{size}.png": size for size in SIZES}
+    pngs["icon.png"] = 512
+    outputs = icon_outputs(script_dir, pngs)
+    # The drawing code is the source: the icons change only when this file does
+    job = AssetJob('icons', [Path(__file__)], outputs, build_icons)
+    counts = run_jobs([job], script_dir / MANIFEST_NAME, force=args.force)
     
-    # Create main icon.png (512x512)
-    try:
-        main_icon = create_vendai_icon(512)
-        main_path = script_dir / "icon.png"
-        main_icon.save(main_path, 'PNG')
-        print(f"✓ Created icon.png (512x512)")
-        success_count += 1
-    except Exception as e:
-        print(f"✗ Failed to create icon.png: {e}")
+    if counts['skipped']:
+        print(f"✓ {len(outputs)} icons are up to date (use --force to redraw)")
+    elif counts['built']:
+        for path in outputs:
+            print(f"✓ Created {path.name}")
     
     print()
-    print(f"📊 Summary: {success_count}/{len(SIZES) + 1} icons created successfully")
+    print(f"📊 Summary: {counts['built'] * len(outputs)} icons created, "
+          f"{counts['skipped'] * len(outputs)} unchanged, {counts['failed']} failed")
     
-    if success_count > 0:
+    if counts['built']:
         print()
         print("📝 Next steps:")
-        print("1. Convert PNGs to ICO using online tool: https://convertio.co/png-ico/")
-        print("2. Convert PNGs to ICNS using online tool: https://convertio.co/png-icns/")
-        print("3. Or use ImageMagick: magick convert icon-*.png icon.ico")
-        print("4. Update electron-builder.json to point to generated icons")
+        print("1. Update electron-builder.json to point to generated icons")
+        print("2. Test icons in built applications")
     
-    return success_count > 0
+    return counts['failed'] == 0
 
 if __name__ == '__main__':
     success = main()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    sys.exit(0 if success else 1)
@@ -1,9 +1,7 @@
 // Distributor data utilities for loading metadata and products
 
-import samWestMetadata from './distributors/sam-west.json'
-import mahitajiMetadata from './distributors/mahitaji.json'
-import { sam_west_products } from './distributors/sam-west-products'
-import { mahitaji_products } from './distributors/mahitaji-products'
+// Metadata and products modules are generated by scripts/generate-supplier-products.py
+import { generatedDistributors } from './distributors/index'
 import { getProductImageMap, matchProductImage } from '@/lib/firebase-product-images'
 
 export interface DistributorContact {
@@ -51,6 +49,11 @@ export interface DistributorMetadata {
   connected: boolean
   categories: string[]
   pricelistSource: string
+  // Supplier pipeline settings (scripts/supplier_pipeline/registry.py)
+  pricelistPdf?: string
+  pricelistLayout?: string
+  idPrefix?: string
+  llmConcurrency?: number
   lastUpdated: string
 }
 
@@ -74,10 +77,9 @@ export interface DistributorProduct {
 }
 
 // All distributors metadata
-export const distributors: Record<string, DistributorMetadata> = {
-  'sam-west': samWestMetadata as DistributorMetadata,
-  'mahitaji': mahitajiMetadata as DistributorMetadata,
-}
+export const distributors: Record<string, DistributorMetadata> = Object.fromEntries(
+  Object.entries(generatedDistributors).map(([id, entry]) => [id, entry.metadata as DistributorMetadata])
+)
 
 // Get distributor by ID
 export function getDistributor(id: string): DistributorMetadata | null {
@@ -111,10 +113,9 @@ function convertToDistributorProduct(product: any): DistributorProduct {
 }
 
 // All products for distributors (from extracted pricelists)
-export const distributorProducts: Record<string, DistributorProduct[]> = {
-  'sam-west': sam_west_products.map(convertToDistributorProduct),
-  'mahitaji': mahitaji_products.map(convertToDistributorProduct)
-}
+export const distributorProducts: Record<string, DistributorProduct[]> = Object.fromEntries(
+  Object.entries(generatedDistributors).map(([id, entry]) => [id, entry.products.map(convertToDistributorProduct)])
+)
 
 // Get products for a distributor with pagination (synchronous, uses mock data)
 export function getDistributorProducts(
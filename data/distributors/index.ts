@@ -0,0 +1,12 @@
+// Generated by scripts/generate-supplier-products.py - do not edit by hand
+
+import type { Product } from "@/lib/types"
+import mahitajiMetadata from './mahitaji.json'
+import { mahitaji_products } from './mahitaji-products'
+import samWestMetadata from './sam-west.json'
+import { sam_west_products } from './sam-west-products'
+
+export const generatedDistributors: Record<string, { metadata: unknown; products: Product[] }> = {
+  "mahitaji": { metadata: mahitajiMetadata, products: mahitaji_products },
+  "sam-west": { metadata: samWestMetadata, products: sam_west_products },
+}
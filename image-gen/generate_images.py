@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Product Image Thumbnails for VendAI POS
+Batch-resizes the catalog images in public/images/products into WebP (and
+optionally JPEG/PNG) thumbnails, e.g. acacia-kids-apple-200mlx24.jpg becomes
+thumbs/acacia-kids-apple-200mlx24-256.webp. Each image is decoded once and every
+size is downsampled from it in memory; images run on a process pool, and images
+whose bytes and settings are unchanged since the last run are skipped, while
+thumbnails of deleted images are removed (see build/asset_pipeline.py).
+
+Requirements:
+    pip install Pillow
+
+Usage:
+    python image-gen/generate_images.py
+    python image-gen/generate_images.py --sizes 512 256 128 --format webp jpg --quality 75
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / 'build'))
+from asset_pipeline import ENCODERS, MANIFEST_NAME, run_jobs, thumbnail_jobs
+
+SOURCE_DIR = PROJECT_ROOT / 'public' / 'images' / 'products'
+OUTPUT_DIR = SOURCE_DIR / 'thumbs'
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+DEFAULT_SIZES = [256, 128]
+
+
+def find_images(source_dir, output_dir):
+    """Product images under source_dir, leaving out the thumbnails themselves"""
+    for path in sorted(source_dir.rglob('*')):
+        if path.suffix.lower() in IMAGE_EXTENSIONS and output_dir not in path.parents:
+            yield path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate resized product image thumbnails')
+    parser.add_argument('--source', default=str(SOURCE_DIR), help=f'Product images (default {SOURCE_DIR})')
+    parser.add_argument('--output', default=str(OUTPUT_DIR), help=f'Thumbnail directory (default {OUTPUT_DIR})')
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                        help='Longest edge of each thumbnail in pixels')
+    parser.add_argument('--format', nargs='+', dest='formats', choices=sorted(ENCODERS), default=['webp'],
+                        help='Thumbnail formats to write')
+    parser.add_argument('--quality', type=int, default=80, help='WebP/JPEG quality (1-100)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes used for resizing (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Rebuild thumbnails even for unchanged images')
+    args = parser.parse_args(argv)
+
+    source_dir, output_dir = Path(args.source).resolve(), Path(args.output).resolve()
+    images = list(find_images(source_dir, output_dir))
+    if not images:
+        print(f"✗ No product images found in {source_dir}")
+        return False
+
+    print("🖼  VendAI POS Product Thumbnails")
+    print(f"Source: {source_dir} ({len(images)} images)")
+    print(f"Output: {output_dir} ({', '.join(map(str, sorted(args.sizes, reverse=True)))}px, "
+          f"{', '.join(args.formats)})")
+    print()
+
+    started = time.perf_counter()
+    jobs = thumbnail_jobs(images, source_dir, output_dir, args.sizes, args.formats, args.quality)
+    counts = run_jobs(jobs, output_dir / MANIFEST_NAME, workers=args.workers, force=args.force)
+
+    print(f"📊 Summary: {counts['built']} images resized, {counts['skipped']} unchanged, "
+          f"{counts['failed']} failed, {counts['pruned']} removed in {time.perf_counter() - started:.1f}s")
+    return counts['failed'] == 0
+
+
+if __name__ == '__main__':
+    success = main()
+    sys.exit(0 if success else 1)
@@ -1,17 +1,37 @@
 #!/usr/bin/env python3
 """
 Supplier Product Data Generator using OpenAI API
-Extracts product data from Mahitaji and Sam West pricelists and updates the supplier module
+Extracts product data from every distributor registered in data/distributors/*.json
+and writes the generated products modules imported by data/distributor-data.ts
 """
 
 import os
 import json
-import re
-import PyPDF2
-from openai import OpenAI
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import argparse
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Tuple
+
+from supplier_pipeline.cache import ResponseCache
+from supplier_pipeline.chunking import (
+    DEFAULT_CHUNK_CHARS, ChunkReorder, clean_lines, clean_text, split_into_chunks
+)
+from supplier_pipeline.client import ClientSettings, RequestGuard, add_client_arguments, settings_from_args
+from supplier_pipeline.incremental import ChunkResult, RowIndex, write_price_delta
+from supplier_pipeline.journal import ExtractionJournal, chunk_key
+from supplier_pipeline.layouts import get_layout
+from supplier_pipeline.metrics import Metrics, add_metrics_arguments, metrics_from_args, profiled
+from supplier_pipeline.output import ProductOutput, SupplierWriter, atomic_write, iter_ndjson
+from supplier_pipeline.pdf_text import PdfTextCache, file_sha256
+from supplier_pipeline.product_index import build_product_index
+from supplier_pipeline.registry import SupplierConfig, load_registry
+from supplier_pipeline.ts_module import (
+    INDEX_MODULE, products_module_path, write_index_module, write_products_module
+)
+from supplier_pipeline.llm_extract import (
+    DEFAULT_CONCURRENCY, extract_chunk_products, merge_and_renumber, supplier_id_prefix
+)
 
 def load_env_file(env_path: str) -> None:
     """Load environment variables from .env.local file"""
@@ -31,42 +51,150 @@ def load_env_file(env_path: str) -> None:
     else:
         print(f"⚠ Environment file not found: {env_path}")
 
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / 'data' / 'cache' / 'llm'
+DEFAULT_JOURNAL_PATH = Path(__file__).parent.parent / 'data' / 'generated' / 'extraction_journal.jsonl'
+DEFAULT_PDF_TEXT_CACHE_DIR = Path(__file__).parent.parent / 'data' / 'cache' / 'pdf-text'
+# Suppliers processed at the same time; each also gets its own LLM concurrency budget
+DEFAULT_PARALLEL_SUPPLIERS = 4
+
 class SupplierDataGenerator:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, concurrency: int = DEFAULT_CONCURRENCY,
+                 chunk_chars: int = DEFAULT_CHUNK_CHARS, use_layouts: bool = True,
+                 cache: ResponseCache = None, text_cache: PdfTextCache = None,
+                 incremental: bool = True, full_refresh: bool = False,
+                 journal: ExtractionJournal = None, exports: List[str] = (),
+                 client_settings: ClientSettings = None, metrics: Metrics = None):
         """Initialize with OpenAI API key"""
         # Load environment variables from .env.local
         env_local_path = Path(__file__).parent.parent / '.env.local'
         load_env_file(str(env_local_path))
         
-        self.client = OpenAI(
-            api_key=api_key or os.getenv('OPENAI_API_KEY')
-        )
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        # Stage timings and token usage; without a file they are only summarized
+        self.metrics = metrics or Metrics()
+        # One limiter, retry policy and circuit breaker for every supplier thread
+        self.guard = RequestGuard(client_settings, self.metrics)
+        self.concurrency = concurrency
+        self.chunk_chars = chunk_chars
+        self.use_layouts = use_layouts
+        self.cache = cache
+        self.incremental = incremental
+        self.full_refresh = full_refresh
+        self.journal = journal
+        # Chunks whose request failed in this run, per supplier; they stay un-journaled
+        # so a re-run retries them
+        self._failures: Dict[str, int] = {}
+        self._failures_lock = threading.Lock()
+        self.suppliers: Dict[str, SupplierConfig] = {}
+        # Row index and price delta of each supplier extracted incrementally, kept
+        # until the run is published so a failed run never advances the index
+        self._refresh_plans: Dict[str, Tuple[RowIndex, Dict[str, Any]]] = {}
         self.project_root = Path(__file__).parent.parent
         self.data_dir = self.project_root / 'data'
+        self.text_cache = text_cache or PdfTextCache(DEFAULT_PDF_TEXT_CACHE_DIR)
+        self.output_dir = self.data_dir / 'generated'
+        # Each supplier's products are streamed out as NDJSON as soon as it finishes
+        self.output = ProductOutput(self.output_dir, exports)
+        self.product_index = None
         
+    @property
+    def failed_chunks(self) -> int:
+        return sum(self._failures.values())
+
+    def _record_failures(self, supplier_name: str, count: int) -> None:
+        if count:
+            with self._failures_lock:
+                self._failures[supplier_name] = self._failures.get(supplier_name, 0) + count
+
     def extract_pdf_text(self, pdf_path: str) -> str:
-        """Extract text from PDF file"""
+        """Extract text from PDF file, reusing cached text when the PDF is unchanged"""
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
+            return self.text_cache.extract_text(Path(pdf_path))
         except Exception as e:
             print(f"Error reading PDF {pdf_path}: {e}")
             return ""
 
     def clean_text(self, text: str) -> str:
         """Clean and normalize extracted text"""
-        # Remove extra whitespace and normalize
-        text = re.sub(r'\s+', ' ', text)
-        # Remove special characters that might interfere
-        text = re.sub(r'[^\w\s\.\,\-\(\)\@\#\%\$\&\+\=\:\;]', '', text)
-        return text.strip()
+        return clean_text(text)
+
+    def clean_lines(self, text: str) -> List[str]:
+        """Clean text row by row so chunking can still split on row boundaries"""
+        return clean_lines(text)
+
+    def extract_products(self, supplier_name: str, text: str, writer: SupplierWriter,
+                         layout_name: str = None, supplier_key: str = None,
+                         concurrency: int = None) -> int:
+        """Parse rows with the supplier's layout grammar and send only leftover rows to the LLM
+
+        Products are streamed to writer in pricelist order as each chunk finishes;
+        returns how many were written. With a supplier_key, rows are diffed against
+        the previous run's row index: LLM rows seen before are reused and only new
+        rows are sent for extraction.
+        """
+        layout = get_layout(layout_name) if self.use_layouts else None
+        if layout is not None:
+            with self.metrics.span("layout_parse", supplier=supplier_name, layout=layout.name) as span:
+                parsed, unparsed = layout.parse(text.splitlines())
+                span.bytes_in = len(text)
+                span.rows = len(parsed)
+            print(f"Parsed {len(parsed)} rows locally, {len(unparsed)} rows left for the LLM")
+        else:
+            parsed, unparsed = [], text.splitlines()
+        with self.metrics.span("clean_rows", supplier=supplier_name) as span:
+            llm_rows = self.clean_lines('\n'.join(unparsed))
+            span.rows = len(llm_rows)
+        writer.write(parsed)
+
+        if not (self.incremental and supplier_key):
+            with self.metrics.span("llm_extract", supplier=supplier_name) as span:
+                written = writer.count
+                reorder = ChunkReorder(lambda index, result: writer.write(result[1]))
+                self.generate_chunk_products_with_llm(supplier_name, llm_rows, concurrency, on_chunk=reorder.add)
+                span.rows = writer.count - written
+            return writer.count
+
+        row_index = RowIndex(self.output_dir / f"{supplier_key}_row_index.json",
+                             ignore_previous=self.full_refresh)
+        plan = row_index.plan()
+        if layout is not None:
+            plan.add_parsed([layout.row_key(product) for product in parsed], parsed)
+        plan.add_llm_rows(llm_rows)
+        print(f"Refresh plan for {supplier_name}: {plan.summary()}")
+
+        failed_before = self._failures.get(supplier_name, 0)
+        with self.metrics.span("llm_extract", supplier=supplier_name) as span:
+            written = writer.count
+            reorder = ChunkReorder(lambda index, result: writer.write(plan.release(*result)))
+            self.generate_chunk_products_with_llm(supplier_name, plan.rows_to_extract, concurrency,
+                                                  on_chunk=reorder.add)
+            writer.write(plan.release_rest())
+            span.rows = writer.count - written
+        if self._failures.get(supplier_name, 0) == failed_before:
+            # Written by save_refresh_state once the run's outputs are published
+            self._refresh_plans[supplier_key] = (row_index, {"rows": plan.current,
+                                                             "delta": plan.delta(supplier_name)})
+        else:
+            # Keep diffing against the last complete run until this one finishes
+            print(f"Row index for {supplier_name} not updated: some chunks failed")
+        return writer.count
 
     def generate_products_with_llm(self, supplier_name: str, pricelist_text: str) -> List[Dict[str, Any]]:
         """Use OpenAI to structure product data from pricelist text"""
+        chunk_results = self.generate_chunk_products_with_llm(supplier_name, pricelist_text.splitlines())
+        return merge_and_renumber([products for _, products in chunk_results],
+                                  supplier_id_prefix(supplier_name))
+
+    def generate_chunk_products_with_llm(self, supplier_name: str, rows: List[str], concurrency: int = None,
+                                         on_chunk: Callable[[int, ChunkResult], None] = None) -> List[ChunkResult]:
+        """Send rows to OpenAI in chunks; returns each chunk's rows with the products it produced
+
+        With on_chunk, each chunk's (rows, products) is handed over as soon as it
+        completes, in completion order, and nothing is kept for the return value.
+        """
+        chunks = split_into_chunks(rows, self.chunk_chars)
+        if not chunks:
+            return []
         
         system_prompt = """You are a data extraction expert specializing in converting supplier pricelists into structured product data for a POS system.
 
@@ -88,192 +216,294 @@ Guidelines:
 - Extract prices carefully, handling different formats (KSh, Ksh, numbers only, etc.)
 - Generate reasonable SKUs if not provided
 - Be conservative with price extraction - if unclear, mark as 0.00
-- Limit to maximum 50 most relevant/clear products to avoid overwhelming the system
+- Each line of the pricelist is one row; extract every product row you are given
 
 Return ONLY a valid JSON array of product objects, no additional text or explanations."""
 
-        user_prompt = f"""
+        def build_messages(chunk: str) -> List[Dict[str, str]]:
+            user_prompt = f"""
 Supplier: {supplier_name}
-Extract product data from this pricelist:
+Extract product data from this pricelist excerpt:
 
-{pricelist_text[:15000]}  # Limit text to stay within token limits
+{chunk}
 
 Return structured product data as JSON array.
 """
+            return [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
 
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=4000,
-                temperature=0.1
-            )
-            
-            # Extract JSON from response
-            content = response.choices[0].message.content.strip()
-            
-            # Try to find JSON in the response
-            json_match = re.search(r'\[.*\]', content, re.DOTALL)
-            if json_match:
-                json_str = json_match.group()
-                products = json.loads(json_str)
-                return products
+        concurrency = concurrency or self.concurrency
+        print(f"Sending {len(chunks)} chunks for {supplier_name} "
+              f"(concurrency {concurrency})")
+        model = "gpt-4o"
+        # Failed chunks keep an empty product list
+        results: List[ChunkResult] = [(chunk.split('\n'), []) for chunk in chunks] if on_chunk is None else []
+
+        def deliver(index: int, products: List[Dict[str, Any]]) -> None:
+            if on_chunk is None:
+                results[index] = (chunks[index].split('\n'), products)
             else:
-                print(f"Could not extract JSON from response for {supplier_name}")
-                return []
-                
-        except Exception as e:
-            print(f"Error calling OpenAI API for {supplier_name}: {e}")
-            return []
+                on_chunk(index, (chunks[index].split('\n'), products))
 
-    def process_pricelists(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Process both supplier pricelists"""
-        suppliers_data = {}
-        
-        # Process Mahitaji pricelist
-        mahitaji_pdf = self.data_dir / "mahitaji pricelist.pdf"
-        if mahitaji_pdf.exists():
-            print("Processing Mahitaji pricelist...")
-            text = self.extract_pdf_text(str(mahitaji_pdf))
-            clean_text = self.clean_text(text)
-            products = self.generate_products_with_llm("Mahitaji Enterprises Ltd", clean_text)
-            suppliers_data["mahitaji"] = products
-            print(f"Extracted {len(products)} products from Mahitaji pricelist")
-        else:
-            print("Mahitaji pricelist not found")
-            
-        # Process Sam West pricelist  
-        samwest_pdf = self.data_dir / "SAM WEST SUPERMARKET PRICELIST_20250726_094811 (2).pdf"
-        if samwest_pdf.exists():
-            print("Processing Sam West pricelist...")
-            text = self.extract_pdf_text(str(samwest_pdf))
-            clean_text = self.clean_text(text)
-            products = self.generate_products_with_llm("Sam West Distributors", clean_text)
-            suppliers_data["samwest"] = products
-            print(f"Extracted {len(products)} products from Sam West pricelist")
+        keys = [chunk_key(supplier_name, model, chunk) for chunk in chunks]
+        pending = []
+        for index, key in enumerate(keys):
+            done = self.journal.chunk_products(key) if self.journal is not None else None
+            if done is None:
+                pending.append(index)
+            else:
+                deliver(index, done)
+        if len(pending) < len(chunks):
+            print(f"Resuming {supplier_name}: {len(chunks) - len(pending)} of {len(chunks)} chunks "
+                  f"already in the journal")
+
+        completed = set()
+
+        def on_chunk_done(position: int, products: List[Dict[str, Any]]) -> None:
+            index = pending[position]
+            completed.add(index)
+            if self.journal is not None:
+                self.journal.record_chunk(keys[index], products)
+            deliver(index, products)
+
+        extract_chunk_products(
+            supplier_name,
+            [chunks[index] for index in pending],
+            build_messages,
+            api_key=self.api_key,
+            model=model,
+            max_tokens=4000,
+            temperature=0.1,
+            concurrency=concurrency,
+            cache=self.cache,
+            on_chunk_done=on_chunk_done,
+            guard=self.guard,
+            keep_results=False
+        )
+        self._record_failures(supplier_name, len(pending) - len(completed))
+        return results
+
+    def read_source_text(self, supplier: SupplierConfig) -> str:
+        """Text of a supplier's pricelist, from its PDF or an already extracted text file"""
+        with self.metrics.span("read_source", supplier=supplier.name, pdf=supplier.is_pdf) as span:
+            span.bytes_in = supplier.source.stat().st_size
+            if supplier.is_pdf:
+                text = self.extract_pdf_text(str(supplier.source))
+            else:
+                with open(supplier.source, 'r', encoding='utf-8') as f:
+                    text = f.read()
+            span.bytes_out = len(text)
+        return text
+
+    def process_supplier(self, supplier: SupplierConfig) -> int:
+        """Extract one supplier, or replay it from the journal if it already finished; returns the product count"""
+        source_hash = file_sha256(supplier.source)
+        id_prefix = supplier.id_prefix or supplier_id_prefix(supplier.name)
+        if self.journal is not None:
+            products = self.journal.supplier_products(supplier.key, source_hash)
+            if products is not None:
+                print(f"Resumed {len(products)} {supplier.name} products from the journal")
+                refresh = self.journal.supplier_refresh(supplier.key)
+                if self.incremental and refresh is not None:
+                    self._refresh_plans[supplier.key] = (
+                        RowIndex(self.output_dir / f"{supplier.key}_row_index.json"), refresh)
+                with self.metrics.span("write_ndjson", supplier=supplier.name) as span:
+                    writer = self.output.open_supplier(supplier.key, id_prefix)
+                    writer.write(products)
+                    span.rows = writer.close()
+                    span.bytes_out = writer.path.stat().st_size
+                return writer.count
+
+        print(f"Processing {supplier.name} pricelist ({supplier.source.name})...")
+        failed_before = self._failures.get(supplier.name, 0)
+        text = self.read_source_text(supplier)
+        writer = self.output.open_supplier(supplier.key, id_prefix)
+        try:
+            count = self.extract_products(supplier.name, text, writer, supplier.layout, supplier.key,
+                                          concurrency=supplier.concurrency)
+        except BaseException:
+            writer.discard()
+            raise
+        if self._failures.get(supplier.name, 0) == failed_before:
+            writer.close()
+            if self.journal is not None:
+                refresh = self._refresh_plans.get(supplier.key)
+                self.journal.record_supplier(supplier.key, source_hash, writer.path,
+                                             refresh[1] if refresh is not None else None)
         else:
-            print("Sam West pricelist not found")
-            
-        return suppliers_data
-
-    def save_products_json(self, suppliers_data: Dict[str, List[Dict[str, Any]]]) -> None:
-        """Save extracted products to JSON files"""
-        output_dir = self.project_root / "data" / "generated"
-        output_dir.mkdir(exist_ok=True)
-        
-        # Save individual supplier files
-        for supplier, products in suppliers_data.items():
-            output_file = output_dir / f"{supplier}_products.json"
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(products, f, indent=2, ensure_ascii=False)
-            print(f"Saved {len(products)} products to {output_file}")
-            
-        # Save combined file
-        combined_file = output_dir / "all_suppliers_products.json"
-        with open(combined_file, 'w', encoding='utf-8') as f:
-            json.dump(suppliers_data, f, indent=2, ensure_ascii=False)
-        print(f"Saved combined data to {combined_file}")
-
-    def update_supplier_module(self, suppliers_data: Dict[str, List[Dict[str, Any]]]) -> None:
-        """Update the supplier module TypeScript file with new product data"""
-        
-        supplier_module_path = self.project_root / "components" / "modules" / "supplier-module.tsx"
-        
-        if not supplier_module_path.exists():
-            print("Supplier module not found")
+            writer.discard()
+        print(f"Extracted {count} products from {supplier.name} pricelist")
+        return count
+
+    def process_pricelists(self, suppliers: List[SupplierConfig] = None,
+                           parallel: int = DEFAULT_PARALLEL_SUPPLIERS) -> Dict[str, int]:
+        """Process every registered supplier pricelist, several suppliers at a time; returns product counts"""
+        if suppliers is None:
+            suppliers = load_registry(self.data_dir / 'distributors', self.project_root)
+        if not suppliers:
+            print("No supplier pricelists registered in data/distributors")
+            return {}
+        self.suppliers = {supplier.key: supplier for supplier in suppliers}
+
+        pool = None
+        try:
+            if parallel <= 1:
+                counts = {supplier.key: self.process_supplier(supplier) for supplier in suppliers}
+            else:
+                pool = ThreadPoolExecutor(max_workers=max(1, min(parallel, len(suppliers))))
+                futures = [(supplier, pool.submit(self.process_supplier, supplier)) for supplier in suppliers]
+                # Keep registry order in the output regardless of which supplier finishes first
+                counts = {supplier.key: future.result() for supplier, future in futures}
+        except BaseException:
+            # Ctrl-C or a failed supplier: don't wait for the others, tell them to stop
+            self.guard.stop()
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            self.text_cache.close(wait=False)
+            raise
+        if pool is not None:
+            pool.shutdown()
+        # Every supplier thread shares the cache's PDF worker pool
+        self.text_cache.close()
+        return counts
+
+    def save_products_json(self, keys: List[str]) -> None:
+        """Publish the products streamed during the run (NDJSON, JSON and any extra exports)"""
+        with self.metrics.span("publish_output") as span:
+            counts = dict(self.output.counts)
+            written = self.output.commit(keys)
+            span.rows = sum(counts.values())
+            span.bytes_out = sum(path.stat().st_size for path in written)
+        for path in written:
+            count = counts.get(path.name.split('_products')[0])
+            if count is not None and path.suffix == '.ndjson':
+                print(f"Saved {count} products to {path}")
+            else:
+                print(f"Saved {path}")
+
+        # Snapshot for import scripts and the POS sync (see supplier_pipeline/product_index.py)
+        with self.metrics.span("product_index") as span:
+            self.product_index = build_product_index(self.output_dir)
+            span.rows = len(self.product_index)
+        print(f"Indexed {len(self.product_index)} products in {len(self.product_index.groups)} variant groups")
+
+    def save_price_comparison(self) -> None:
+        """Match products across suppliers and write the best-price table"""
+        if self.product_index is None or len({group.supplier for group in self.product_index.groups.values()}) < 2:
             return
-            
-        # Read current file
-        with open(supplier_module_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Generate TypeScript supplier objects
-        ts_suppliers = self.generate_typescript_suppliers(suppliers_data)
-        
-        # Find and replace the suppliers data
-        # Look for the suppliers array definition
-        pattern = r'const suppliers: Supplier\[\] = \[.*?\]'
-        
-        if re.search(pattern, content, re.DOTALL):
-            new_content = re.sub(
-                pattern, 
-                f'const suppliers: Supplier[] = [\n{ts_suppliers}\n  ]',
-                content, 
-                flags=re.DOTALL
-            )
-            
-            # Create backup
-            backup_path = supplier_module_path.with_suffix('.tsx.backup')
-            with open(backup_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-                
-            # Write updated file
-            with open(supplier_module_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-                
-            print(f"Updated supplier module with new product data")
-            print(f"Backup saved to {backup_path}")
-        else:
-            print("Could not find suppliers array in module file")
+        try:
+            from supplier_pipeline.matching import best_price_table
+        except ImportError:
+            print("⚠ numpy not installed; skipping the cross-supplier price comparison")
+            return
+        output_file = self.output_dir / "price_comparison.json"
+        with self.metrics.span("price_comparison") as span:
+            table = best_price_table(self.product_index)
+            with atomic_write(output_file) as f:
+                json.dump(table, f, indent=2, ensure_ascii=False)
+            span.rows = len(table)
+            span.bytes_out = output_file.stat().st_size
+        print(f"Matched {len(table)} products across suppliers; saved {output_file}")
 
-    def generate_typescript_suppliers(self, suppliers_data: Dict[str, List[Dict[str, Any]]]) -> str:
-        """Generate TypeScript supplier objects"""
-        
-        suppliers_ts = []
-        
-        # Mahitaji supplier
-        if "mahitaji" in suppliers_data:
-            products_json = json.dumps(suppliers_data["mahitaji"], indent=6)
-            mahitaji_supplier = f'''    {{
-      id: "mahitaji_enterprises",
-      name: "Mahitaji Enterprises Ltd",
-      contact: {{
-        email: "info@mahitaji.co.ke",
-        phone: "+254 700 123 456",
-        address: "Nairobi, Kenya"
-      }},
-      paymentTerms: "Net 30",
-      creditLimit: 2000000,
-      currentCredit: 850000,
-      accountBalance: -150000,
-      products: {products_json.replace('    ', '      ')}
-    }}'''
-            suppliers_ts.append(mahitaji_supplier)
-            
-        # Sam West supplier
-        if "samwest" in suppliers_data:
-            products_json = json.dumps(suppliers_data["samwest"], indent=6)
-            samwest_supplier = f'''    {{
-      id: "sam_west_distributors", 
-      name: "Sam West Distributors",
-      contact: {{
-        email: "orders@samwest.co.ke",
-        phone: "+254 722 345 678", 
-        address: "Mombasa, Kenya"
-      }},
-      paymentTerms: "Net 15",
-      creditLimit: 1500000,
-      currentCredit: 650000,
-      accountBalance: 25000,
-      products: {products_json.replace('    ', '      ')}
-    }}'''
-            suppliers_ts.append(samwest_supplier)
-            
-        return ',\n'.join(suppliers_ts)
+    def save_refresh_state(self) -> None:
+        """Write the row index and price delta of every supplier extracted incrementally"""
+        for key, (row_index, refresh) in self._refresh_plans.items():
+            row_index.save(refresh["rows"])
+            delta_path = self.output_dir / f"{key}_price_delta.json"
+            write_price_delta(delta_path, refresh["delta"])
+            print(f"Saved price delta to {delta_path}")
+        self._refresh_plans.clear()
+
+    def update_supplier_module(self, keys: List[str]) -> None:
+        """Write the generated products modules that data/distributor-data.ts imports, from the published NDJSON"""
+        distributors_dir = self.data_dir / 'distributors'
+        for key in keys:
+            supplier = self.suppliers.get(key)
+            if supplier is None:
+                print(f"⚠ No registry entry for {key}; skipping its products module")
+                continue
+            path = products_module_path(distributors_dir, supplier.id)
+            count = self.output.counts.get(key, 0)
+            with self.metrics.span("ts_module", supplier=supplier.name) as span:
+                changed = write_products_module(distributors_dir, supplier, iter_ndjson(self.output.ndjson_path(key)))
+                span.rows = count
+                span.bytes_out = path.stat().st_size if changed else 0
+            if changed:
+                print(f"Updated {path.relative_to(self.project_root)} ({count} products)")
+            else:
+                print(f"{path.relative_to(self.project_root)} unchanged")
+
+        # The index lists every distributor file, not just the suppliers processed in this run
+        if write_index_module(distributors_dir):
+            print(f"Updated {(distributors_dir / INDEX_MODULE).relative_to(self.project_root)}")
 
 def main():
     """Main execution function"""
     parser = argparse.ArgumentParser(description='Generate supplier product data using OpenAI')
     parser.add_argument('--api-key', help='OpenAI API key (or use .env.local file)')
     parser.add_argument('--output-only', action='store_true', help='Only generate JSON, do not update module')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Maximum concurrent OpenAI requests per supplier (default {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--chunk-chars', type=int, default=DEFAULT_CHUNK_CHARS,
+                        help=f'Maximum characters of pricelist text per request (default {DEFAULT_CHUNK_CHARS})')
+    parser.add_argument('--llm-only', action='store_true',
+                        help='Skip the local layout parsers and send every row to the LLM')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the LLM response cache')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Ignore cached LLM responses but store the fresh ones')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                        help=f'LLM response cache directory (default {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--refresh-pdf', action='store_true',
+                        help='Re-extract PDF text with PyPDF2 instead of using cached text or sidecars')
+    parser.add_argument('--full-refresh', action='store_true',
+                        help='Ignore the previous run\'s row index and treat every row as new')
+    parser.add_argument('--no-incremental', action='store_true',
+                        help='Do not diff against or write the per-supplier row index')
+    parser.add_argument('--suppliers', nargs='+', metavar='ID',
+                        help='Only process these distributor ids (default: every registered distributor)')
+    parser.add_argument('--parallel-suppliers', type=int, default=DEFAULT_PARALLEL_SUPPLIERS,
+                        help=f'Suppliers processed at the same time (default {DEFAULT_PARALLEL_SUPPLIERS})')
+    parser.add_argument('--export', nargs='+', choices=['csv', 'parquet'], default=[],
+                        help='Extra compact exports of all products (Parquet needs pyarrow)')
+    parser.add_argument('--restart', action='store_true',
+                        help='Discard the extraction journal from an interrupted run and start over')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes used for PDF page extraction, shared by all suppliers (default: CPU count)')
+    add_client_arguments(parser)
+    add_metrics_arguments(parser)
     
     args = parser.parse_args()
+    metrics = metrics_from_args(args, script='generate-supplier-products')
+    if args.profile:
+        # cProfile only sees the thread that started it
+        args.parallel_suppliers = 1
+    try:
+        with profiled(args.profile):
+            generate(args, metrics)
+    finally:
+        print(metrics.summary())
+        metrics.close()
+
+def generate(args: argparse.Namespace, metrics: Metrics) -> None:
+    """Run the extraction with parsed command-line arguments"""
+    journal = ExtractionJournal(DEFAULT_JOURNAL_PATH)
+    if args.restart:
+        journal.clear()
+    elif journal.resuming:
+        print(f"Resuming from {DEFAULT_JOURNAL_PATH}")
+    
+    text_cache = PdfTextCache(DEFAULT_PDF_TEXT_CACHE_DIR, refresh=args.refresh_pdf, workers=args.workers)
+    cache = None if args.no_cache else ResponseCache(Path(args.cache_dir), refresh=args.refresh)
     
     # Initialize generator (it will auto-load from .env.local)
-    generator = SupplierDataGenerator(args.api_key)
+    generator = SupplierDataGenerator(args.api_key, args.concurrency, args.chunk_chars,
+                                      use_layouts=not args.llm_only, cache=cache,
+                                      text_cache=text_cache, incremental=not args.no_incremental,
+                                      full_refresh=args.full_refresh, journal=journal,
+                                      exports=args.export,
+                                      client_settings=settings_from_args(args), metrics=metrics)
     
     # Check if we have an API key
     if not (args.api_key or os.getenv('OPENAI_API_KEY')):
@@ -288,28 +518,50 @@ def main():
     print("=" * 50)
     
     # Process pricelists
-    suppliers_data = generator.process_pricelists()
+    try:
+        suppliers = load_registry(generator.data_dir / 'distributors', generator.project_root,
+                                  only=args.suppliers)
+        counts = generator.process_pricelists(suppliers, args.parallel_suppliers)
+    except KeyboardInterrupt:
+        generator.output.abort()
+        print("\nInterrupted. Finished chunks are saved in the journal; re-run to resume.")
+        return
+    
+    print(generator.guard.summary())
+    if cache is not None:
+        cache.prune()
+        print(cache.summary())
     
-    if not suppliers_data:
+    if generator.failed_chunks:
+        generator.output.abort()
+        print(f"⚠ {generator.failed_chunks} chunks failed. Completed work is kept in {journal.path}; "
+              f"re-run to retry only the failed chunks.")
+        return
+    
+    if not counts:
         print("No data extracted from pricelists")
         return
         
-    # Save JSON files
-    generator.save_products_json(suppliers_data)
+    # Compact the journal into the output files
+    generator.save_products_json(list(counts))
+    generator.save_price_comparison()
     
     # Update module unless output-only is specified
     if not args.output_only:
         print("\nUpdating supplier module...")
-        generator.update_supplier_module(suppliers_data)
+        generator.update_supplier_module(list(counts))
+    
+    # Only now, with every output in place, may the next run diff against this one
+    generator.save_refresh_state()
+    journal.clear()
     
     print("\n" + "=" * 50)
     print("Generation complete!")
     
     # Print summary
-    total_products = sum(len(products) for products in suppliers_data.values())
-    print(f"Total products processed: {total_products}")
-    for supplier, products in suppliers_data.items():
-        print(f"  {supplier}: {len(products)} products")
+    print(f"Total products processed: {sum(counts.values())}")
+    for supplier, count in counts.items():
+        print(f"  {supplier}: {count} products")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
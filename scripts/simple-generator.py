@@ -6,48 +6,67 @@ Automatically loads OpenAI API key from .env.local
 
 import os
 import json
-import re
-import PyPDF2
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from openai import OpenAI
 
-# Load environment variables from .env.local
-try:
-    from dotenv import load_dotenv
-    env_path = Path(__file__).parent.parent / '.env.local'
-    load_dotenv(env_path)
-    print(f"✓ Loaded API key from .env.local")
-except ImportError:
-    # Fallback to manual loading if python-dotenv not available
+from supplier_pipeline.cache import ResponseCache
+from supplier_pipeline.chunking import DEFAULT_CHUNK_CHARS, split_into_chunks
+from supplier_pipeline.client import RequestGuard, add_client_arguments, settings_from_args
+from supplier_pipeline.layouts import get_layout
+from supplier_pipeline.metrics import Metrics, add_metrics_arguments, metrics_from_args, profiled
+from supplier_pipeline.pdf_text import PdfTextCache
+from supplier_pipeline.registry import load_registry
+from supplier_pipeline.llm_extract import DEFAULT_CONCURRENCY, extract_products, merge_and_renumber
+
+def load_env():
+    """Load environment variables from .env.local"""
     env_path = Path(__file__).parent.parent / '.env.local'
-    if env_path.exists():
-        with open(env_path, 'r') as f:
-            for line in f:
-                if line.strip() and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    os.environ[key.strip()] = value.strip()
+    try:
+        from dotenv import load_dotenv
+        load_dotenv(env_path)
+        print(f"✓ Loaded API key from .env.local")
+    except ImportError:
+        # Fallback to manual loading if python-dotenv not available
+        if env_path.exists():
+            with open(env_path, 'r') as f:
+                for line in f:
+                    if line.strip() and not line.startswith('#') and '=' in line:
+                        key, value = line.split('=', 1)
+                        os.environ[key.strip()] = value.strip()
+
+PDF_TEXT_CACHE = PdfTextCache(Path(__file__).parent.parent / 'data' / 'cache' / 'pdf-text',
+                              workers=os.cpu_count() or 1)
 
 def extract_pdf_text(pdf_path):
-    """Extract text from PDF"""
+    """Extract text from PDF (cached by file hash)"""
     try:
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-        return text
+        return PDF_TEXT_CACHE.extract_text(Path(pdf_path))
     except Exception as e:
         print(f"❌ Error reading {pdf_path}: {e}")
         return ""
 
-def generate_products(supplier_name, text):
-    """Use OpenAI to extract product data"""
-    client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-    
-    prompt = f"""Extract product data from this {supplier_name} pricelist into JSON format.
+def generate_products(supplier_name, text, id_prefix=None, layout_name=None,
+                      concurrency=DEFAULT_CONCURRENCY, chunk_chars=DEFAULT_CHUNK_CHARS, cache=None,
+                      guard=None, metrics=None):
+    """Parse known layouts locally, then use OpenAI for the remaining rows"""
+    id_prefix = id_prefix or supplier_name[:3].lower()
+    metrics = metrics or Metrics()
+
+    parsed, rows = [], text.splitlines()
+    layout = get_layout(layout_name)
+    if layout is not None:
+        with metrics.span("layout_parse", supplier=supplier_name, layout=layout.name) as span:
+            parsed, rows = layout.parse(rows)
+            span.bytes_in = len(text)
+            span.rows = len(parsed)
+        print(f"   Parsed {len(parsed)} rows locally, {len(rows)} left for OpenAI")
+
+    def build_messages(chunk):
+        prompt = f"""Extract product data from this {supplier_name} pricelist excerpt into JSON format.
 
 For each product, extract:
-- id: unique ID like "mah_001" 
+- id: unique ID like "{id_prefix}_001" 
 - name: product name
 - sku: product code (generate if missing)
 - category: category like "Beverages", "Snacks", etc.
@@ -56,33 +75,69 @@ For each product, extract:
 - minOrderQuantity: reasonable minimum (default 1)
 - leadTime: like "1-2 days"
 
-Limit to 30 clearest products. Return only JSON array:
+Each line is one pricelist row; include every product row. Return only JSON array:
 
-{text[:10000]}"""
+{chunk}"""
+        return [{"role": "user", "content": prompt}]
 
-    try:
-        response = client.chat.completions.create(
+    chunks = split_into_chunks(rows, chunk_chars)
+    if chunks:
+        print(f"   {len(chunks)} chunks, up to {concurrency} in flight")
+    with metrics.span("llm_extract", supplier=supplier_name, chunks=len(chunks)) as span:
+        llm_products = extract_products(
+            supplier_name,
+            chunks,
+            build_messages,
+            id_prefix=id_prefix,
+            api_key=os.getenv('OPENAI_API_KEY'),
             model="gpt-4o-mini",  # Using cheaper model
-            messages=[{"role": "user", "content": prompt}],
             max_tokens=3000,
-            temperature=0.1
+            temperature=0.1,
+            concurrency=concurrency,
+            cache=cache,
+            guard=guard
         )
-        
-        content = response.choices[0].message.content.strip()
-        json_match = re.search(r'\[.*\]', content, re.DOTALL)
-        
-        if json_match:
-            products = json.loads(json_match.group())
-            return products
-        else:
-            print(f"⚠ Could not extract JSON from {supplier_name} response")
-            return []
-    except Exception as e:
-        print(f"❌ Error processing {supplier_name}: {e}")
-        return []
+        span.rows = len(llm_products)
+    with metrics.span("merge", supplier=supplier_name) as span:
+        products = merge_and_renumber([parsed, llm_products], id_prefix)
+        span.rows = len(products)
+    return products
 
 def main():
     """Simple main function"""
+    parser = argparse.ArgumentParser(description='Simple supplier product generator')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help='Maximum concurrent OpenAI requests')
+    parser.add_argument('--chunk-chars', type=int, default=DEFAULT_CHUNK_CHARS,
+                        help='Maximum characters of pricelist text per request')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use the LLM response cache')
+    parser.add_argument('--refresh', action='store_true', help='Ignore cached responses but store fresh ones')
+    parser.add_argument('--workers', type=int, default=PDF_TEXT_CACHE.workers,
+                        help='Processes used for PDF page extraction')
+    parser.add_argument('--suppliers', nargs='+', metavar='ID',
+                        help='Only process these distributor ids')
+    parser.add_argument('--parallel-suppliers', type=int, default=4,
+                        help='Suppliers processed at the same time')
+    add_client_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    PDF_TEXT_CACHE.workers = args.workers
+    if args.profile:
+        # cProfile only sees the thread that started it
+        args.parallel_suppliers = 1
+
+    metrics = metrics_from_args(args, script='simple-generator')
+    try:
+        with profiled(args.profile):
+            run(args, metrics)
+    finally:
+        print(f"📊 {metrics.summary()}")
+        metrics.close()
+
+def run(args, metrics):
+    """Extract every registered pricelist and save the results"""
+    load_env()
+
     print("🚀 Supplier Data Generator")
     print("=" * 40)
     
@@ -94,29 +149,55 @@ def main():
     
     project_root = Path(__file__).parent.parent
     data_dir = project_root / 'data'
+    cache = None if args.no_cache else ResponseCache(data_dir / 'cache' / 'llm', refresh=args.refresh)
     
-    # Process pricelists
+    # Process every registered pricelist, a few suppliers at a time, under one shared rate limit
+    guard = RequestGuard(settings_from_args(args), metrics)
+    suppliers = load_registry(data_dir / 'distributors', project_root, only=args.suppliers)
+
+    def process(supplier):
+        print(f"📄 Processing {supplier.name} pricelist...")
+        with metrics.span("read_source", supplier=supplier.name, pdf=supplier.is_pdf) as span:
+            span.bytes_in = supplier.source.stat().st_size
+            if supplier.is_pdf:
+                text = extract_pdf_text(supplier.source)
+            else:
+                text = supplier.source.read_text(encoding='utf-8')
+            span.bytes_out = len(text)
+        if not text:
+            return []
+        products = generate_products(supplier.name, text, supplier.id_prefix, supplier.layout,
+                                     supplier.concurrency or args.concurrency, args.chunk_chars, cache, guard,
+                                     metrics)
+        print(f"✓ Extracted {len(products)} {supplier.name} products")
+        return products
+
     suppliers_data = {}
+    if suppliers:
+        pool = None
+        try:
+            if args.parallel_suppliers <= 1:
+                results = [process(supplier) for supplier in suppliers]
+            else:
+                pool = ThreadPoolExecutor(max_workers=min(args.parallel_suppliers, len(suppliers)))
+                results = list(pool.map(process, suppliers))
+        except BaseException:
+            # Ctrl-C or a failed supplier: don't wait for the others, tell them to stop
+            guard.stop()
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            PDF_TEXT_CACHE.close(wait=False)
+            raise
+        if pool is not None:
+            pool.shutdown()
+        # The supplier threads share PDF_TEXT_CACHE's worker pool
+        PDF_TEXT_CACHE.close()
+        suppliers_data = {supplier.key: products for supplier, products in zip(suppliers, results) if products}
     
-    # Mahitaji
-    mahitaji_pdf = data_dir / "mahitaji pricelist.pdf"
-    if mahitaji_pdf.exists():
-        print("📄 Processing Mahitaji pricelist...")
-        text = extract_pdf_text(mahitaji_pdf)
-        if text:
-            products = generate_products("Mahitaji", text)
-            suppliers_data['mahitaji'] = products
-            print(f"✓ Extracted {len(products)} Mahitaji products")
-    
-    # Sam West
-    samwest_pdf = data_dir / "SAM WEST SUPERMARKET PRICELIST_20250726_094811 (2).pdf"
-    if samwest_pdf.exists():
-        print("📄 Processing Sam West pricelist...")
-        text = extract_pdf_text(samwest_pdf)
-        if text:
-            products = generate_products("Sam West", text)
-            suppliers_data['samwest'] = products
-            print(f"✓ Extracted {len(products)} Sam West products")
+    print(f"🌐 {guard.summary()}")
+    if cache is not None:
+        cache.prune()
+        print(f"🗄  {cache.summary()}")
     
     # Save results
     if suppliers_data:
@@ -125,8 +206,11 @@ def main():
         
         # Save JSON
         output_file = output_dir / 'suppliers_products.json'
-        with open(output_file, 'w') as f:
-            json.dump(suppliers_data, f, indent=2)
+        with metrics.span("write_output") as span:
+            with open(output_file, 'w') as f:
+                json.dump(suppliers_data, f, indent=2)
+            span.rows = sum(len(products) for products in suppliers_data.values())
+            span.bytes_out = output_file.stat().st_size
         
         print(f"💾 Saved results to {output_file}")
         
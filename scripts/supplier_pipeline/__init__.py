@@ -0,0 +1,5 @@
+"""
+Supplier pricelist pipeline
+Shared building blocks for generate-supplier-products.py and simple-generator.py,
+and the `python -m supplier_pipeline` command line (cli.py)
+"""
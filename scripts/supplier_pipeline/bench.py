@@ -0,0 +1,443 @@
+"""
+Pipeline benchmarks
+Times every stage of the extraction pipeline on synthetic Mahitaji and Sam West
+pricelists (see synthetic.py) with the LLM stubbed out, so runs are repeatable
+offline and cost nothing. Each case runs in a fresh process so its peak RSS is its
+own. Results are saved as JSON and can be compared against an earlier run to catch
+regressions.
+
+    python -m supplier_pipeline.bench                           # 1k and 100k rows
+    python -m supplier_pipeline.bench --sizes 1k 100k 1m --sources text
+    python -m supplier_pipeline.bench --startup-only             # CLI cold start
+    python -m supplier_pipeline.bench --baseline data/benchmarks/results/bench-20251017-101500.json
+
+The stub answers each chunk locally with fake_openai.rows_to_products, streamed in
+the same pieces as the fake server, so llm_extract measures prompt building,
+limiter, stream parsing and validation (plus the stub itself), not network time.
+Modules the pipeline imports on first use (PyPDF2, openai, httpx) are loaded by an
+untimed warm-up before the stages that need them.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+
+from .chunking import DEFAULT_CHUNK_CHARS, clean_lines, split_into_chunks
+from .client import RequestGuard
+from .fake_openai import STREAM_PIECE_CHARS, rows_to_products
+from .layouts import get_layout
+from .llm_extract import extract_chunk_products, merge_and_renumber
+from .output import ProductOutput
+from .pdf_text import PdfTextCache
+from .product_index import SNAPSHOT_NAME, ProductIndex, build_product_index
+from .registry import SupplierConfig
+from .synthetic import LAYOUTS, fixture_path, format_size, parse_size
+from .ts_module import write_products_module
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RESULTS_VERSION = 1
+BENCH_DIR = Path(__file__).resolve().parents[2] / 'data' / 'benchmarks'
+DEFAULT_SIZES = ("1k", "100k")
+# Matching is quadratic within a block; skip it above this many rows per supplier
+DEFAULT_MATCH_MAX_ROWS = 100_000
+# A stage counts as changed when it moves by more than this share and this many seconds
+REGRESSION_THRESHOLD = 0.10
+MIN_DELTA_SECONDS = 0.02
+
+# `python -m supplier_pipeline ...` commands timed by --startup, and what they must stay under
+STARTUP_COMMANDS = (
+    ("--help",), ("parse", "--help"), ("export", "--help"), ("patch-module", "--help"), ("extract", "--help"),
+)
+STARTUP_BUDGET_SECONDS = 0.2
+STARTUP_REPEATS = 5
+# Modules no startup path should load before it needs them
+HEAVY_MODULES = {"openai", "httpx", "PyPDF2", "numpy", "pyarrow"}
+
+SUPPLIER_NAMES = {"mahitaji": "Mahitaji Enterprises Ltd", "sam-west": "Sam West Distributors Ltd"}
+# Rows sent through the stub before llm_extract is timed
+WARM_UP_ROWS = 50
+
+
+class _StubStream:
+    """Async iterator of chat.completion.chunk-like events for one answer"""
+
+    def __init__(self, content: str, prompt_chars: int):
+        self.content = content
+        self.prompt_chars = prompt_chars
+
+    async def _events(self) -> Any:
+        for start in range(0, len(self.content), STREAM_PIECE_CHARS):
+            delta = SimpleNamespace(content=self.content[start:start + STREAM_PIECE_CHARS])
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta, finish_reason=None)])
+        yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=None),
+                                                                   finish_reason="stop")])
+        total = (self.prompt_chars + len(self.content)) // 4
+        yield SimpleNamespace(usage=SimpleNamespace(total_tokens=total), choices=[])
+
+    def __aiter__(self) -> Any:
+        return self._events()
+
+    async def close(self) -> None:
+        pass
+
+
+class _StubCompletions:
+    async def create(self, model: str, messages: List[Dict[str, str]], **kwargs: Any) -> _StubStream:
+        prompt = messages[-1]["content"]
+        await asyncio.sleep(0)
+        return _StubStream(json.dumps(rows_to_products(prompt), indent=2), len(prompt))
+
+
+class _StubClient:
+    def __init__(self) -> None:
+        self.chat = SimpleNamespace(completions=_StubCompletions())
+
+    async def close(self) -> None:
+        pass
+
+
+class StubGuard(RequestGuard):
+    """RequestGuard whose client answers locally instead of calling the API"""
+
+    def open_client(self, api_key: Optional[str]) -> Any:
+        return _StubClient()
+
+
+def _max_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(rss / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+class StageRecorder:
+    """Wall time, CPU time and memory of each stage in one benchmark case"""
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        record: Dict[str, Any] = {"name": name}
+        if rows is not None:
+            record["rows"] = rows
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        started_cpu = time.process_time()
+        started = time.perf_counter()
+        yield record
+        record["wallSeconds"] = round(time.perf_counter() - started, 4)
+        record["cpuSeconds"] = round(time.process_time() - started_cpu, 4)
+        if self.trace_memory:
+            record["peakMb"] = round((tracemalloc.get_traced_memory()[1] - baseline) / 1e6, 1)
+        rss = _max_rss_mb()
+        if rss is not None:
+            record["maxRssMb"] = rss
+        self.stages.append(record)
+
+        details = [f"cpu {record['cpuSeconds']:.3f}s"]
+        if "rows" in record:
+            details.append(f"{record['rows']} rows")
+        if "bytesOut" in record:
+            details.append(f"{record['bytesOut'] / 1e6:.1f} MB out")
+        if "peakMb" in record:
+            details.append(f"peak +{record['peakMb']} MB")
+        print(f"    {name:<20} {record['wallSeconds']:9.3f}s  {', '.join(details)}")
+
+
+def _build_messages(chunk: str) -> List[Dict[str, str]]:
+    return [{"role": "user", "content": f"Extract product data from this pricelist excerpt:\n\n{chunk}"}]
+
+
+def _stub_extract(name: str, rows: List[str], chunk_chars: int) -> List[Dict[str, Any]]:
+    chunks = split_into_chunks(rows, chunk_chars)
+    results = extract_chunk_products(name, chunks, _build_messages, api_key="stub", guard=StubGuard())
+    return [product for products in results for product in products]
+
+
+def run_case(layout: str, rows: int, source: str, work_dir: str, fixtures_dir: str,
+             options: Dict[str, Any]) -> Dict[str, Any]:
+    """Run every stage for one synthetic pricelist; PDF cases stop once the text is extracted"""
+    if options.get("trace_memory"):
+        tracemalloc.start()
+    recorder = StageRecorder(options.get("trace_memory", False))
+    stage = recorder.stage
+    case = f"{layout}-{format_size(rows)}-{source}"
+    work = Path(work_dir) / case
+    name = SUPPLIER_NAMES[layout]
+    chunk_chars = options.get("chunk_chars", DEFAULT_CHUNK_CHARS)
+
+    started = time.perf_counter()
+    fixture = fixture_path(Path(fixtures_dir), layout, rows, source)
+    print(f"  {case} ({fixture.stat().st_size / 1e6:.1f} MB, ready in {time.perf_counter() - started:.1f}s)")
+    result: Dict[str, Any] = {"case": case, "layout": layout, "rows": rows, "source": source,
+                              "fixtureBytes": fixture.stat().st_size}
+
+    if source == "pdf":
+        # Untimed: pdf_extract should measure extraction, not loading PyPDF2
+        import PyPDF2  # noqa: F401
+
+        text_cache = PdfTextCache(work / "pdf-text", use_sidecars=False, workers=options.get("workers", 1))
+        with stage("pdf_extract", rows) as record:
+            text = text_cache.extract_text(fixture)
+            record["bytesOut"] = len(text)
+        with stage("pdf_cached", rows):
+            text_cache.extract_text(fixture)
+        text_cache.close()
+        result.update(stages=recorder.stages, maxRssMb=_max_rss_mb())
+        return result
+
+    with stage("read_text", rows):
+        text = fixture.read_text(encoding='utf-8')
+    with stage("clean_lines", rows) as record:
+        lines = clean_lines(text)
+        record["rows"] = len(lines)
+    with stage("layout_parse", rows) as record:
+        parsed, unparsed = get_layout(layout).parse(text.splitlines())
+        record["rows"] = len(parsed)
+    with stage("chunking", len(lines)) as record:
+        record["chunks"] = len(split_into_chunks(lines, chunk_chars))
+    # Untimed warm-up iteration: the first request loads openai and httpx, which a
+    # long run pays once and the stage should not
+    _stub_extract(name, lines[:WARM_UP_ROWS], chunk_chars)
+    with stage("llm_extract") as record:
+        leftovers = _stub_extract(name, clean_lines('\n'.join(unparsed)), chunk_chars)
+        record["rows"] = len(leftovers)
+    if options.get("llm_all", True):
+        with stage("llm_extract_all") as record:
+            record["rows"] = len(_stub_extract(name, lines, chunk_chars))
+    del text, lines
+
+    key = layout.replace('-', '')
+    with stage("merge") as record:
+        products = merge_and_renumber([parsed, leftovers], key[:3])
+        record["rows"] = len(products)
+    del parsed, leftovers
+
+    output_dir = work / "output"
+    with stage("write_output", len(products)) as record:
+        output = ProductOutput(output_dir, exports=["csv"])
+        output.write_supplier(key, products)
+        record["bytesOut"] = sum(path.stat().st_size for path in output.commit([key]))
+
+    supplier = SupplierConfig(id=layout, name=name, source=fixture, metadata={"name": name})
+    with stage("ts_module", len(products)) as record:
+        write_products_module(work / "distributors", supplier, products)
+        record["bytesOut"] = sum(path.stat().st_size for path in (work / "distributors").iterdir())
+    count = len(products)
+    del products
+
+    with stage("product_index_build", count):
+        build_product_index(output_dir)
+    with stage("product_index_load", count):
+        ProductIndex.load(output_dir / SNAPSHOT_NAME)
+
+    result.update(stages=recorder.stages, maxRssMb=_max_rss_mb(),
+                  ndjson=str(output.ndjson_path(key)))
+    return result
+
+
+def run_match_case(rows: int, ndjson: Dict[str, str], options: Dict[str, Any]) -> Dict[str, Any]:
+    """Cross-supplier matching over the products of the per-layout text cases"""
+    from .matching import best_price_table
+
+    if options.get("trace_memory"):
+        tracemalloc.start()
+    recorder = StageRecorder(options.get("trace_memory", False))
+    case = f"match-{format_size(rows)}"
+    print(f"  {case}")
+    with recorder.stage("index_from_ndjson") as record:
+        index = ProductIndex.from_ndjson({key: Path(path) for key, path in ndjson.items()})
+        record["rows"] = len(index)
+    with recorder.stage("price_comparison", len(index)) as record:
+        record["matches"] = len(best_price_table(index))
+    return {"case": case, "layout": "+".join(sorted(ndjson)), "rows": rows, "source": "text",
+            "stages": recorder.stages, "maxRssMb": _max_rss_mb()}
+
+
+def _imported_modules(stderr: str) -> List[str]:
+    """Top-level module names from `python -X importtime` output"""
+    names = set()
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and line.count("|") == 2:
+            names.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return sorted(names)
+
+
+def run_startup_case(repeats: int = STARTUP_REPEATS) -> Dict[str, Any]:
+    """Cold start of each CLI subcommand (best of repeats) and any heavy module it imports"""
+    scripts_dir = Path(__file__).resolve().parents[1]
+    print(f"  startup (best of {repeats})")
+    stages = []
+    for command in STARTUP_COMMANDS:
+        argv = [sys.executable, "-m", "supplier_pipeline", *command]
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            subprocess.run(argv, cwd=scripts_dir, capture_output=True, check=True)
+            timings.append(time.perf_counter() - started)
+        traced = subprocess.run([sys.executable, "-X", "importtime", *argv[1:]], cwd=scripts_dir,
+                                capture_output=True, text=True, check=True)
+        heavy = sorted(HEAVY_MODULES.intersection(_imported_modules(traced.stderr)))
+        record = {"name": " ".join(command), "wallSeconds": round(min(timings), 4), "heavyImports": heavy}
+        stages.append(record)
+        marker = "⚠" if heavy or record["wallSeconds"] > STARTUP_BUDGET_SECONDS else " "
+        print(f"  {marker} {record['name']:<20} {record['wallSeconds']:9.3f}s"
+              f"{'  imports ' + ', '.join(heavy) if heavy else ''}")
+    return {"case": "startup", "layout": "", "rows": 0, "source": "cli", "stages": stages}
+
+
+def _in_fresh_process(function: Any, *args: Any) -> Any:
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(function, *args).result()
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes: List[int], layouts: List[str], sources: List[str], work_dir: Path,
+                   fixtures_dir: Path, options: Dict[str, Any]) -> Dict[str, Any]:
+    runner = (lambda function, *args: function(*args)) if options.get("in_process") else _in_fresh_process
+    cases = [run_startup_case()] if options.get("startup") else []
+    for rows in sizes:
+        ndjson = {}
+        for layout in layouts:
+            for source in sources:
+                result = runner(run_case, layout, rows, source, str(work_dir), str(fixtures_dir), options)
+                if "ndjson" in result:
+                    ndjson[layout.replace('-', '')] = result.pop("ndjson")
+                cases.append(result)
+        if len(ndjson) > 1 and rows <= options.get("match_max_rows", DEFAULT_MATCH_MAX_ROWS):
+            cases.append(runner(run_match_case, rows, ndjson, options))
+    return {
+        "version": RESULTS_VERSION,
+        "createdAt": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "options": options,
+        "cases": cases,
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = REGRESSION_THRESHOLD) -> List[Dict[str, Any]]:
+    """Stages whose wall time moved by more than threshold (and MIN_DELTA_SECONDS) since baseline"""
+    before = {
+        (case["case"], stage["name"]): stage["wallSeconds"]
+        for case in baseline.get("cases", []) for stage in case["stages"]
+    }
+    changes = []
+    for case in current["cases"]:
+        for stage in case["stages"]:
+            old = before.get((case["case"], stage["name"]))
+            new = stage["wallSeconds"]
+            if old is None or abs(new - old) < MIN_DELTA_SECONDS:
+                continue
+            ratio = new / old if old else float('inf')
+            if abs(ratio - 1) > threshold:
+                changes.append({"case": case["case"], "stage": stage["name"], "before": old,
+                                "after": new, "ratio": round(ratio, 2), "regression": ratio > 1})
+    return changes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the supplier pipeline on synthetic pricelists')
+    parser.add_argument('--sizes', nargs='+', default=list(DEFAULT_SIZES),
+                        help=f'Rows per pricelist, e.g. 1k 100k 1m (default {" ".join(DEFAULT_SIZES)})')
+    parser.add_argument('--layouts', nargs='+', choices=LAYOUTS, default=list(LAYOUTS))
+    parser.add_argument('--sources', nargs='+', choices=['text', 'pdf'], default=['text', 'pdf'])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes used for PDF page extraction (default: CPU count)')
+    parser.add_argument('--chunk-chars', type=int, default=DEFAULT_CHUNK_CHARS)
+    parser.add_argument('--no-llm-all', action='store_true',
+                        help='Skip the stage that sends every row through the stubbed LLM')
+    parser.add_argument('--match-max-rows', type=int, default=DEFAULT_MATCH_MAX_ROWS,
+                        help=f'Largest size that also benchmarks price matching (default {DEFAULT_MATCH_MAX_ROWS})')
+    parser.add_argument('--startup', action='store_true',
+                        help=f'Also time the cold start of each `python -m supplier_pipeline` subcommand '
+                             f'(budget {STARTUP_BUDGET_SECONDS * 1000:.0f} ms)')
+    parser.add_argument('--startup-only', action='store_true', help='Only time the subcommand cold starts')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Record each stage\'s peak Python heap with tracemalloc (slows stages down)')
+    parser.add_argument('--in-process', action='store_true',
+                        help='Run cases in this process instead of a fresh one each (peak RSS then accumulates)')
+    parser.add_argument('--fixtures-dir', default=str(BENCH_DIR / 'fixtures'),
+                        help='Where generated pricelists are kept between runs')
+    parser.add_argument('--output', help='Results file (default data/benchmarks/results/bench-<time>.json)')
+    parser.add_argument('--baseline', help='Earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help=f'Relative change reported by --baseline (default {REGRESSION_THRESHOLD})')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exit with status 1 when --baseline finds a slower stage')
+    args = parser.parse_args()
+
+    options = {
+        "workers": args.workers,
+        "chunk_chars": args.chunk_chars,
+        "llm_all": not args.no_llm_all,
+        "match_max_rows": args.match_max_rows,
+        "trace_memory": args.trace_memory,
+        "in_process": args.in_process,
+        "startup": args.startup or args.startup_only,
+    }
+    sizes = [] if args.startup_only else [parse_size(size) for size in args.sizes]
+    if sizes:
+        print(f"Benchmarking {', '.join(map(format_size, sizes))} rows: {', '.join(args.layouts)} "
+              f"from {', '.join(args.sources)}")
+    with tempfile.TemporaryDirectory(prefix="supplier-bench-") as work_dir:
+        results = run_benchmarks(sizes, args.layouts, args.sources, Path(work_dir),
+                                 Path(args.fixtures_dir), options)
+
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    output = Path(args.output) if args.output else BENCH_DIR / 'results' / f"bench-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"✓ Saved results to {output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get("options", {}).get("trace_memory") != options["trace_memory"]:
+            print("⚠ Only one of the runs traced memory; tracemalloc slows every stage down")
+        changes = compare_results(baseline, results, args.threshold)
+        if not changes:
+            print(f"No stage moved by more than {args.threshold:.0%} against {args.baseline}")
+        for change in changes:
+            marker = "⚠ slower" if change["regression"] else "✓ faster"
+            print(f"{marker}: {change['case']} {change['stage']} {change['before']:.3f}s -> "
+                  f"{change['after']:.3f}s ({change['ratio']}x)")
+        if args.fail_on_regression and any(change["regression"] for change in changes):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+LLM response cache
+Content-addressed on-disk cache for chat completions, keyed on model, messages
+and temperature, with size- and age-based eviction
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30
+
+
+def cache_key(model: str, messages: List[Dict[str, str]], temperature: float) -> str:
+    """Stable hash of everything that determines the model's answer"""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Completion cache stored as one JSON file per key under cache_dir"""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+        refresh: bool = False,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 86400
+        # refresh: ignore existing entries but still store new answers
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.write_errors = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached completion text for key, or None on a miss"""
+        if self.refresh:
+            self.misses += 1
+            return None
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age_seconds:
+                path.unlink()
+                self.evictions += 1
+                self.misses += 1
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.get("content")
+
+    def put(self, key: str, content: str, **metadata: Any) -> None:
+        """Store a completion; written to a temp file and renamed so readers never see partial entries
+
+        A failed write only costs a future cache hit, so it is reported and counted
+        rather than raised into the extraction that produced the completion.
+        """
+        path = self._path(key)
+        entry = {"content": content, "createdAt": time.time(), **metadata}
+        # Supplier threads share one process; the thread id keeps their temp files apart
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, ValueError) as e:
+            self.write_errors += 1
+            print(f"⚠ Could not cache completion {key[:12]}: {e}")
+            try:
+                tmp_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+            return
+        self.writes += 1
+
+    def prune(self) -> None:
+        """Drop expired entries, then the oldest ones until the cache fits in max_bytes"""
+        if not self.cache_dir.exists():
+            return
+        now = time.time()
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age_seconds:
+                path.unlink(missing_ok=True)
+                self.evictions += 1
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+
+    def summary(self) -> str:
+        """One-line hit/miss report"""
+        lookups = self.hits + self.misses
+        rate = (100.0 * self.hits / lookups) if lookups else 0.0
+        errors = f", {self.write_errors} failed to store" if self.write_errors else ""
+        return (f"LLM cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate), "
+                f"{self.writes} stored{errors}, {self.evictions} evicted")
@@ -0,0 +1,73 @@
+"""
+Pricelist chunking
+Cleans pricelist rows, splits them into line-aligned chunks sized for a
+single LLM call, and puts chunk results that finish out of order back in order
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, List
+
+_WHITESPACE = re.compile(r'\s+')
+# Characters that might interfere with the prompt or JSON answer
+_UNSAFE_CHARS = re.compile(r'[^\w\s\.\,\-\(\)\@\#\%\$\&\+\=\:\;]')
+
+# ~3k characters is roughly 60-90 pricelist rows, which keeps the JSON answer
+# for one chunk comfortably below max_tokens=4000
+DEFAULT_CHUNK_CHARS = 3000
+
+
+def clean_text(text: str) -> str:
+    """Clean and normalize extracted text"""
+    text = _WHITESPACE.sub(' ', text)
+    text = _UNSAFE_CHARS.sub('', text)
+    return text.strip()
+
+
+def clean_lines(text: str) -> List[str]:
+    """Clean text row by row so chunking can still split on row boundaries"""
+    lines = (clean_text(line) for line in text.splitlines())
+    return [line for line in lines if line]
+
+
+def split_into_chunks(lines: Iterable[str], max_chars: int = DEFAULT_CHUNK_CHARS) -> List[str]:
+    """Group rows into chunks of at most max_chars without ever splitting a row"""
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+
+    for line in lines:
+        line = line.rstrip('\n')
+        if not line.strip():
+            continue
+        # +1 for the newline joining this row to the previous one
+        added = len(line) + (1 if current else 0)
+        if current and size + added > max_chars:
+            chunks.append('\n'.join(current))
+            current = []
+            size = 0
+            added = len(line)
+        # A single oversized row still becomes its own chunk
+        current.append(line)
+        size += added
+
+    if current:
+        chunks.append('\n'.join(current))
+    return chunks
+
+
+class ChunkReorder:
+    """Passes results to emit(index, result) in chunk order as soon as every earlier chunk has arrived"""
+
+    def __init__(self, emit: Callable[[int, Any], None]):
+        self.emit = emit
+        self.next = 0
+        self._pending: Dict[int, Any] = {}
+
+    def add(self, index: int, result: Any) -> None:
+        self._pending[index] = result
+        while self.next in self._pending:
+            self.emit(self.next, self._pending.pop(self.next))
+            self.next += 1
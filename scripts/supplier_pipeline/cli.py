@@ -0,0 +1,240 @@
+"""
+Supplier pipeline command line
+One entry point for the pipeline's jobs (run from the scripts directory):
+
+    python -m supplier_pipeline extract [generator options]    # generate-supplier-products.py
+    python -m supplier_pipeline extract --simple [options]     # simple-generator.py
+    python -m supplier_pipeline parse --suppliers mahitaji     # layout parsers only, no API calls
+    python -m supplier_pipeline stamp-sidecars                 # trust *_extracted_text.txt for these PDFs
+    python -m supplier_pipeline export --export csv --compare  # rebuild outputs from the NDJSON
+    python -m supplier_pipeline patch-module                   # rewrite data/distributors/*-products.ts
+    python -m supplier_pipeline icons                          # build/icons/generate_icons.py
+    python -m supplier_pipeline images                         # image-gen/generate_images.py
+
+Each subcommand imports what it needs when it runs: openai, PyPDF2 and numpy
+only load on the paths that use them, and .env.local is only read by extract.
+bench.py --startup measures the cold start of every subcommand.
+"""
+
+import argparse
+import os
+import runpy
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+PROJECT_ROOT = SCRIPTS_DIR.parent
+DATA_DIR = PROJECT_ROOT / 'data'
+DISTRIBUTORS_DIR = DATA_DIR / 'distributors'
+GENERATED_DIR = DATA_DIR / 'generated'
+PDF_TEXT_CACHE_DIR = DATA_DIR / 'cache' / 'pdf-text'
+GENERATOR_SCRIPT = SCRIPTS_DIR / 'generate-supplier-products.py'
+SIMPLE_GENERATOR_SCRIPT = SCRIPTS_DIR / 'simple-generator.py'
+ICONS_SCRIPT = PROJECT_ROOT / 'build' / 'icons' / 'generate_icons.py'
+IMAGES_SCRIPT = PROJECT_ROOT / 'image-gen' / 'generate_images.py'
+
+# Subcommands that hand their remaining arguments (including --help) to a script
+PASSTHROUGH = {"extract", "icons", "images"}
+
+
+def run_script(path: Path, argv: List[str]) -> int:
+    """Run a script as __main__ with argv, as if it had been started directly"""
+    saved_argv = sys.argv
+    sys.argv = [str(path), *argv]
+    try:
+        runpy.run_path(str(path), run_name="__main__")
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    finally:
+        sys.argv = saved_argv
+    return 0
+
+
+def extract(args: argparse.Namespace, extra: List[str]) -> int:
+    return run_script(SIMPLE_GENERATOR_SCRIPT if args.simple else GENERATOR_SCRIPT, extra)
+
+
+def icons(args: argparse.Namespace, extra: List[str]) -> int:
+    return run_script(ICONS_SCRIPT, extra)
+
+
+def images(args: argparse.Namespace, extra: List[str]) -> int:
+    return run_script(IMAGES_SCRIPT, extra)
+
+
+def parse(args: argparse.Namespace) -> int:
+    """Run the local layout parsers over registered pricelists"""
+    from .layouts import get_layout
+    from .output import ProductOutput
+    from .pdf_text import PdfTextCache
+    from .registry import load_registry
+
+    suppliers = load_registry(DISTRIBUTORS_DIR, PROJECT_ROOT, only=args.suppliers)
+    if not suppliers:
+        print("No supplier pricelists registered in data/distributors")
+        return 1
+    text_cache = PdfTextCache(PDF_TEXT_CACHE_DIR, workers=args.workers)
+    output = ProductOutput(Path(args.output)) if args.output else None
+    if output is not None:
+        # llm_extract brings in asyncio; only pay for it when products are written
+        from .llm_extract import merge_and_renumber, supplier_id_prefix
+    for supplier in suppliers:
+        layout = get_layout(supplier.layout)
+        if layout is None:
+            print(f"⚠ {supplier.name} has no layout parser; use extract for its rows")
+            continue
+        if supplier.is_pdf:
+            text = text_cache.extract_text(supplier.source)
+        else:
+            text = supplier.source.read_text(encoding='utf-8')
+        parsed, unparsed = layout.parse(text.splitlines())
+        print(f"{supplier.name}: {len(parsed)} rows parsed, {len(unparsed)} left for the LLM")
+        for line in unparsed[:args.show_unparsed]:
+            print(f"    {line}")
+        if output is not None:
+            products = merge_and_renumber([parsed], supplier.id_prefix or supplier_id_prefix(supplier.name))
+            output.write_supplier(supplier.key, products)
+    text_cache.close()
+    if output is not None:
+        for path in output.commit():
+            print(f"Saved {path}")
+    return 0
+
+
+def stamp_sidecars(args: argparse.Namespace) -> int:
+    """Record the PDF hash next to each registered PDF's text sidecar so extraction reuses it"""
+    from .pdf_text import PdfTextCache
+    from .registry import load_registry
+
+    text_cache = PdfTextCache(PDF_TEXT_CACHE_DIR)
+    stamped = 0
+    for supplier in load_registry(DISTRIBUTORS_DIR, PROJECT_ROOT, only=args.suppliers):
+        if not supplier.is_pdf:
+            continue
+        stamp = text_cache.stamp_sidecar(supplier.source)
+        if stamp is None:
+            print(f"⚠ {supplier.name} has no {text_cache.sidecar_path(supplier.source).name}")
+            continue
+        print(f"Stamped {stamp.relative_to(PROJECT_ROOT)}")
+        stamped += 1
+    return 0 if stamped else 1
+
+
+def export(args: argparse.Namespace) -> int:
+    """Rebuild the JSON files, exports, product index and price table from the NDJSON output"""
+    from .output import ProductOutput, atomic_write
+    from .product_index import build_product_index, ndjson_sources
+
+    output_dir = Path(args.output_dir)
+    keys = list(ndjson_sources(output_dir))
+    if args.suppliers:
+        keys = [key for key in keys if key in args.suppliers]
+    if not keys:
+        print(f"No *_products.ndjson files in {output_dir}; run extract first")
+        return 1
+    output = ProductOutput(output_dir, args.export)
+    for path in output.publish(keys):
+        print(f"Saved {path}")
+
+    index = build_product_index(output_dir)
+    print(f"Indexed {len(index)} products in {len(index.groups)} variant groups")
+    if args.compare:
+        try:
+            from .matching import best_price_table
+        except ImportError:
+            print("⚠ numpy not installed; skipping the cross-supplier price comparison")
+            return 0
+        import json
+
+        table = best_price_table(index)
+        output_file = output_dir / "price_comparison.json"
+        with atomic_write(output_file) as f:
+            json.dump(table, f, indent=2, ensure_ascii=False)
+        print(f"Matched {len(table)} products across suppliers; saved {output_file}")
+    return 0
+
+
+def patch_module(args: argparse.Namespace) -> int:
+    """Rewrite the generated products modules from the NDJSON output, without calling the API"""
+    from .output import ProductOutput, iter_ndjson
+    from .registry import load_registry
+    from .ts_module import INDEX_MODULE, products_module_path, write_index_module, write_products_module
+
+    registered = load_registry(DISTRIBUTORS_DIR, PROJECT_ROOT)
+    output = ProductOutput(Path(args.output_dir))
+    for supplier in registered:
+        if args.suppliers and supplier.id not in args.suppliers and supplier.key not in args.suppliers:
+            continue
+        source = output.ndjson_path(supplier.key)
+        if not source.exists():
+            print(f"⚠ No {source.name} for {supplier.name}; skipping its products module")
+            continue
+        path = products_module_path(DISTRIBUTORS_DIR, supplier.id)
+        if write_products_module(DISTRIBUTORS_DIR, supplier, iter_ndjson(source)):
+            print(f"Updated {path.relative_to(PROJECT_ROOT)}")
+        else:
+            print(f"{path.relative_to(PROJECT_ROOT)} unchanged")
+    if write_index_module(DISTRIBUTORS_DIR):
+        print(f"Updated {(DISTRIBUTORS_DIR / INDEX_MODULE).relative_to(PROJECT_ROOT)}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m supplier_pipeline',
+                                     description='Supplier pricelist pipeline')
+    commands = parser.add_subparsers(dest='command', required=True, metavar='COMMAND')
+
+    command = commands.add_parser('extract', add_help=False, allow_abbrev=False,
+                                  help='Extract products with OpenAI (options as generate-supplier-products.py)')
+    command.add_argument('--simple', action='store_true', help='Run simple-generator.py instead')
+    command.set_defaults(handler=extract)
+
+    command = commands.add_parser('parse', help='Parse pricelists with the local layout parsers only')
+    command.add_argument('--suppliers', nargs='+', metavar='ID', help='Only these distributor ids')
+    command.add_argument('--show-unparsed', type=int, default=0, metavar='N',
+                         help='Print the first N rows each layout could not parse')
+    command.add_argument('--output', metavar='DIR', help='Also write the parsed products to DIR')
+    command.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                         help='Processes used for PDF page extraction (default: CPU count)')
+    command.set_defaults(handler=parse)
+
+    command = commands.add_parser('stamp-sidecars',
+                                  help='Mark the text sidecars of the current pricelist PDFs as up to date')
+    command.add_argument('--suppliers', nargs='+', metavar='ID', help='Only these distributor ids')
+    command.set_defaults(handler=stamp_sidecars)
+
+    command = commands.add_parser('export', help='Rebuild JSON, CSV/Parquet and the product index from NDJSON')
+    command.add_argument('--export', nargs='+', choices=['csv', 'parquet'], default=[],
+                         help='Extra compact exports (Parquet needs pyarrow)')
+    command.add_argument('--compare', action='store_true',
+                         help='Also rebuild price_comparison.json (needs numpy)')
+    command.add_argument('--suppliers', nargs='+', metavar='KEY', help='Only these supplier keys')
+    command.add_argument('--output-dir', default=str(GENERATED_DIR),
+                         help=f'Directory with the *_products.ndjson files (default {GENERATED_DIR})')
+    command.set_defaults(handler=export)
+
+    command = commands.add_parser('patch-module', help='Rewrite the generated TypeScript products modules')
+    command.add_argument('--suppliers', nargs='+', metavar='ID', help='Only these distributor ids')
+    command.add_argument('--output-dir', default=str(GENERATED_DIR),
+                         help=f'Directory with the *_products.ndjson files (default {GENERATED_DIR})')
+    command.set_defaults(handler=patch_module)
+
+    command = commands.add_parser('icons', add_help=False,
+                                  help='Generate the application icons (build/icons/generate_icons.py)')
+    command.set_defaults(handler=icons)
+
+    command = commands.add_parser('images', add_help=False,
+                                  help='Resize product images into thumbnails (image-gen/generate_images.py)')
+    command.set_defaults(handler=images)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command in PASSTHROUGH:
+        return args.handler(args, extra)
+    if extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    return args.handler(args)
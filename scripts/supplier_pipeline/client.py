@@ -0,0 +1,219 @@
+"""
+Guarded OpenAI requests
+One RequestGuard per run holds the rate limiter, retry policy and circuit breaker
+that every chunk request goes through, so a 429 or timeout is paced and retried
+instead of silently turning into an empty product list. Completions can be
+streamed into a sink that parses them as they arrive. openai is only imported
+once a request is actually made.
+"""
+
+import argparse
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Protocol, Tuple, Type
+
+from .metrics import Metrics
+from .rate_limit import (
+    DEFAULT_MAX_RETRIES, CircuitBreaker, RateLimiter, RetryPolicy, retry_after_seconds
+)
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+Messages = List[Dict[str, str]]
+
+
+@lru_cache(maxsize=None)
+def retryable_errors() -> Tuple[Type[BaseException], ...]:
+    """Errors worth another attempt; anything else (bad request, auth) fails the chunk at once
+
+    A stream that breaks off mid-response surfaces as a bare httpx transport error.
+    Imported on first use so commands that never call the API don't load openai.
+    """
+    import httpx
+    from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+    return (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError, httpx.TransportError)
+
+
+class StreamSink(Protocol):
+    """Receives a streamed completion; reset() is called before every attempt"""
+
+    def reset(self) -> None: ...
+
+    def feed(self, text: str) -> None: ...
+
+
+class Completion(NamedTuple):
+    content: str
+    # "stop", or "length" when the answer was cut off at max_tokens
+    finish_reason: Optional[str]
+
+
+@dataclass(frozen=True)
+class ClientSettings:
+    """Request pacing and retry settings, usually filled from the command line"""
+
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    max_retries: int = DEFAULT_MAX_RETRIES
+    timeout: float = 120.0
+    # e.g. http://127.0.0.1:8089/v1 for supplier_pipeline.fake_openai
+    base_url: Optional[str] = None
+    failure_threshold: int = 8
+
+
+def add_client_arguments(parser: argparse.ArgumentParser) -> None:
+    """Rate limit and retry options shared by the generator scripts"""
+    parser.add_argument('--rpm', type=float, help='Requests per minute allowed by the API key (default: unlimited)')
+    parser.add_argument('--tpm', type=float, help='Tokens per minute allowed by the API key (default: unlimited)')
+    parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES,
+                        help=f'Retries per chunk on 429s, timeouts and 5xx errors (default {DEFAULT_MAX_RETRIES})')
+    parser.add_argument('--base-url', default=os.getenv('OPENAI_BASE_URL'),
+                        help='OpenAI-compatible endpoint, e.g. http://127.0.0.1:8089/v1 for the offline fake server')
+
+
+def settings_from_args(args: argparse.Namespace) -> ClientSettings:
+    return ClientSettings(
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        max_retries=args.max_retries,
+        base_url=args.base_url,
+    )
+
+
+def estimate_tokens(messages: Messages) -> int:
+    """Rough prompt size (about four characters per token) for tokens-per-minute pacing"""
+    return sum(len(message.get("content", "")) for message in messages) // 4 + 4 * len(messages)
+
+
+class ExtractionStopped(RuntimeError):
+    """Raised inside a supplier thread once its run's guard has been stopped"""
+
+
+class RequestGuard:
+    """Limiter, retry policy and circuit breaker shared by every request of a run"""
+
+    def __init__(self, settings: Optional[ClientSettings] = None, metrics: Optional[Metrics] = None):
+        self.settings = settings or ClientSettings()
+        # Receives the token usage of every completed request
+        self.metrics = metrics
+        self.limiter = RateLimiter(self.settings.requests_per_minute, self.settings.tokens_per_minute)
+        self.policy = RetryPolicy(self.settings.max_retries)
+        self.breaker = CircuitBreaker(self.settings.failure_threshold)
+        self.requests = 0
+        self.retries = 0
+        # Set from the main thread (Ctrl-C, a failed supplier) to end every extraction still running
+        self.stopped = threading.Event()
+
+    def stop(self) -> None:
+        """Ask every extraction sharing this guard to cancel its outstanding chunks"""
+        self.stopped.set()
+
+    def open_client(self, api_key: Optional[str]) -> "AsyncOpenAI":
+        """An async client for the current event loop; retries are handled here, not by the SDK"""
+        from openai import AsyncOpenAI
+
+        return AsyncOpenAI(
+            api_key=api_key,
+            base_url=self.settings.base_url,
+            max_retries=0,
+            timeout=self.settings.timeout,
+        )
+
+    async def complete(self, client: "AsyncOpenAI", label: str, messages: Messages, model: str,
+                       max_tokens: int, temperature: float, sink: Optional[StreamSink] = None) -> Completion:
+        """Run one chat completion under the guard; raises once retries run out
+
+        With a sink the completion is streamed and each text delta is fed to it
+        as it arrives; a retry resets the sink and starts the answer over.
+        """
+        from openai import RateLimitError
+
+        retryable = retryable_errors()
+        estimated = estimate_tokens(messages) + max_tokens
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            trial = await self.breaker.wait()
+            try:
+                await self.limiter.acquire(estimated)
+                self.requests += 1
+                if sink is None:
+                    completion, usage = await self._create(client, messages, model, max_tokens, temperature)
+                else:
+                    sink.reset()
+                    completion, usage = await self._stream(client, messages, model, max_tokens,
+                                                           temperature, sink)
+            except retryable as e:
+                retry_after = retry_after_seconds(e)
+                if isinstance(e, RateLimitError):
+                    if getattr(e, "code", None) == "insufficient_quota":
+                        raise
+                    self.limiter.record_throttle(retry_after)
+                else:
+                    self.breaker.record_failure()
+                if attempt >= self.policy.max_retries:
+                    raise
+                delay = self.policy.delay(attempt, retry_after)
+                attempt += 1
+                self.retries += 1
+                print(f"{label}: {type(e).__name__}, retrying in {delay:.1f}s "
+                      f"(attempt {attempt}/{self.policy.max_retries})")
+            else:
+                self.breaker.record_success()
+                self.limiter.record_success()
+                self.limiter.record_usage(estimated, getattr(usage, "total_tokens", None))
+                if self.metrics is not None:
+                    self.metrics.record_request(label, model, usage, time.perf_counter() - started, attempt + 1)
+                return completion
+            finally:
+                if trial:
+                    self.breaker.release_trial()
+            await asyncio.sleep(delay)
+
+    async def _create(self, client: "AsyncOpenAI", messages: Messages, model: str,
+                      max_tokens: int, temperature: float):
+        response = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        choice = response.choices[0]
+        return Completion((choice.message.content or "").strip(), choice.finish_reason), response.usage
+
+    async def _stream(self, client: "AsyncOpenAI", messages: Messages, model: str,
+                      max_tokens: int, temperature: float, sink: StreamSink):
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        parts: List[str] = []
+        finish_reason = usage = None
+        try:
+            async for event in stream:
+                if event.usage is not None:
+                    usage = event.usage
+                for choice in event.choices:
+                    text = choice.delta.content
+                    if text:
+                        parts.append(text)
+                        sink.feed(text)
+                    if choice.finish_reason:
+                        finish_reason = choice.finish_reason
+        finally:
+            await stream.close()
+        return Completion(''.join(parts).strip(), finish_reason), usage
+
+    def summary(self) -> str:
+        return (f"{self.requests} API requests, {self.retries} retries, "
+                f"{self.limiter.throttled} rate-limited, circuit {self.breaker.state}")
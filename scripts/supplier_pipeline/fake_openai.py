@@ -0,0 +1,340 @@
+"""
+Offline OpenAI stand-in
+A local OpenAI-compatible /v1/chat/completions server for exercising the extractor
+without network access or API spend. It answers with one product per pricelist row
+found in the prompt, after a configurable latency and generation speed, and
+enforces its own requests/tokens-per-minute windows (429 with Retry-After) plus
+random 429/500 injection, so rate limiting and retries can be load tested and
+tuned locally. Answers are streamed as server-sent events when asked to and are
+cut off at max_tokens (finish_reason "length") like the real API.
+
+    python -m supplier_pipeline.fake_openai --port 8089 --rpm 120 --latency 0.5
+    python generate-supplier-products.py --api-key test --base-url http://127.0.0.1:8089/v1 --no-cache
+
+    python -m supplier_pipeline.fake_openai --load-test 200 --rpm 300 --client-rpm 300
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .rate_limit import DEFAULT_MAX_RETRIES
+
+DEFAULT_PORT = 8089
+STREAM_PIECE_CHARS = 32
+
+# A pricelist row: optional numeric code, a name with letters, a decimal price and maybe a unit
+# ("KK061ACACIA KIDS APPLE 200MLX24CTN940.00", "16 10KG KUKU RICE KES 1,040.00 Bag")
+ROW_PATTERN = re.compile(
+    r'^\s*(?:(\d{3,})\s+)?(.*?[A-Za-z].*?)\s*(?:KES|KSH|Ksh)?\s*(\d[\d,]*\.\d{2})(?:\s*[A-Za-z]+)?\s*$')
+
+
+def rows_to_products(content: str) -> List[Dict[str, Any]]:
+    """What a well-behaved model would return for the rows in a prompt"""
+    products = []
+    for line in content.splitlines():
+        match = ROW_PATTERN.match(line)
+        if not match:
+            continue
+        code, name, price = match.groups()
+        products.append({
+            "name": " ".join(name.split()),
+            "sku": code or f"SUP-GEN-{len(products) + 1:03d}",
+            "category": "General",
+            "unitPrice": float(price.replace(',', '')),
+            "inStock": True,
+            "minOrderQuantity": 1,
+            "leadTime": "1-2 days",
+        })
+    return products
+
+
+class FakeOpenAIServer:
+    """Threaded HTTP server; use as a context manager or call start()/stop()"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.2,
+                 jitter: float = 0.1, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, error_rate: float = 0.0,
+                 server_error_rate: float = 0.0, window: float = 60.0,
+                 tokens_per_second: Optional[float] = None):
+        self.latency = latency
+        # Generation speed after the first token; None answers instantly
+        self.tokens_per_second = tokens_per_second
+        self.jitter = jitter
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.error_rate = error_rate
+        self.server_error_rate = server_error_rate
+        self.window = window
+        # (timestamp, tokens) of accepted requests inside the current window
+        self._accepted: Deque[Tuple[float, int]] = deque()
+        self._window_tokens = 0
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "completed": 0, "rate_limited": 0, "injected_429": 0, "injected_500": 0}
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _admit(self, tokens: int) -> Optional[float]:
+        """Record the request if it fits the rate windows, otherwise return seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            while self._accepted and now - self._accepted[0][0] >= self.window:
+                self._window_tokens -= self._accepted.popleft()[1]
+            over_requests = (self.requests_per_minute is not None
+                             and len(self._accepted) + 1 > self.requests_per_minute)
+            over_tokens = (self.tokens_per_minute is not None and self._accepted
+                           and self._window_tokens + tokens > self.tokens_per_minute)
+            if over_requests or over_tokens:
+                self.stats["rate_limited"] += 1
+                return max(0.05, self._accepted[0][0] + self.window - now)
+            self._accepted.append((now, tokens))
+            self._window_tokens += tokens
+            return None
+
+    def _generate(self, text: str) -> None:
+        """Sleep for as long as producing text would take"""
+        if self.tokens_per_second:
+            time.sleep(len(text) / 4 / self.tokens_per_second)
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _error(self, status: int, message: str, code: str, retry_after: Optional[float] = None) -> None:
+                headers = {}
+                if retry_after is not None:
+                    headers["retry-after-ms"] = str(int(retry_after * 1000))
+                    headers["retry-after"] = str(max(1, round(retry_after)))
+                self._send(status, {"error": {"message": message, "type": code, "code": code}}, headers)
+
+            def do_POST(self) -> None:
+                if not self.path.rstrip('/').endswith("/chat/completions"):
+                    self._error(404, f"Unknown path {self.path}", "not_found")
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                server._count("requests")
+
+                messages = request.get("messages", [])
+                prompt = "\n".join(str(message.get("content", "")) for message in messages)
+                prompt_tokens = len(prompt) // 4 + 4 * len(messages)
+                max_tokens = int(request.get("max_tokens") or 1000)
+
+                if random.random() < server.error_rate:
+                    server._count("injected_429")
+                    self._error(429, "Rate limit reached (injected)", "rate_limit_exceeded", random.uniform(0.2, 1.0))
+                    return
+                if random.random() < server.server_error_rate:
+                    server._count("injected_500")
+                    self._error(500, "The server had an error (injected)", "server_error")
+                    return
+                wait = server._admit(prompt_tokens + max_tokens)
+                if wait is not None:
+                    self._error(429, "Rate limit reached for requests", "rate_limit_exceeded", wait)
+                    return
+
+                # Time to first token
+                time.sleep(max(0.0, server.latency + random.uniform(-server.jitter, server.jitter)))
+                products = rows_to_products(messages[-1].get("content", "") if messages else "")
+                content = json.dumps(products, indent=2)
+                finish_reason = "stop"
+                if len(content) // 4 > max_tokens:
+                    content, finish_reason = content[:max_tokens * 4], "length"
+                completion_tokens = len(content) // 4
+                usage = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                }
+                server._count("completed")
+                head = {
+                    "id": f"chatcmpl-fake{random.getrandbits(48):x}",
+                    "created": int(time.time()),
+                    "model": request.get("model", "gpt-4o"),
+                }
+                if request.get("stream"):
+                    include_usage = (request.get("stream_options") or {}).get("include_usage")
+                    self._stream(head, content, finish_reason, usage if include_usage else None)
+                    return
+                server._generate(content)
+                self._send(200, dict(head, object="chat.completion", usage=usage, choices=[{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": finish_reason,
+                }]))
+
+            def _stream(self, head: Dict[str, Any], content: str, finish_reason: str,
+                        usage: Optional[Dict[str, int]]) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+
+                def event(delta: Dict[str, Any], finish: Optional[str] = None, **extra: Any) -> None:
+                    chunk = dict(head, object="chat.completion.chunk",
+                                 choices=[{"index": 0, "delta": delta, "finish_reason": finish}], **extra)
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                    self.wfile.flush()
+
+                event({"role": "assistant", "content": ""})
+                # About eight tokens per event, paced at the generation speed
+                for start in range(0, len(content), STREAM_PIECE_CHARS):
+                    piece = content[start:start + STREAM_PIECE_CHARS]
+                    server._generate(piece)
+                    event({"content": piece})
+                event({}, finish_reason)
+                if usage is not None:
+                    chunk = dict(head, object="chat.completion.chunk", choices=[], usage=usage)
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def synthetic_chunks(count: int, rows_per_chunk: int = 40) -> List[str]:
+    """Pricelist-like chunks for load testing"""
+    chunks = []
+    for chunk in range(count):
+        rows = []
+        for row in range(rows_per_chunk):
+            code = 1000 + chunk * rows_per_chunk + row
+            rows.append(f"{code} TEST PRODUCT {code} 500GX12 CTN {random.randint(50, 5000)}.00")
+        chunks.append("\n".join(rows))
+    return chunks
+
+
+def load_test(server: FakeOpenAIServer, chunks: int, concurrency: int,
+              client_rpm: Optional[float], client_tpm: Optional[float], max_retries: int,
+              rows_per_chunk: int = 40) -> Dict[str, Any]:
+    """Push synthetic chunks through the real extractor against the fake server"""
+    from .client import ClientSettings, RequestGuard
+    from .llm_extract import extract_chunks_async
+
+    guard = RequestGuard(ClientSettings(
+        requests_per_minute=client_rpm,
+        tokens_per_minute=client_tpm,
+        max_retries=max_retries,
+        base_url=server.url,
+        timeout=30.0,
+    ))
+    texts = synthetic_chunks(chunks, rows_per_chunk)
+    first_product: List[float] = []
+
+    def on_product(index: int, product: Dict[str, Any]) -> None:
+        if not first_product:
+            first_product.append(time.perf_counter())
+
+    def build_messages(chunk: str) -> List[Dict[str, str]]:
+        return [{"role": "user", "content": f"Extract product data from this pricelist excerpt:\n\n{chunk}"}]
+
+    started = time.perf_counter()
+    results = asyncio.run(extract_chunks_async(
+        "Load test", texts, build_messages, api_key="test", concurrency=concurrency, guard=guard,
+        on_product=on_product))
+    elapsed = time.perf_counter() - started
+    products = sum(len(result) for result in results)
+    return {
+        "chunks": chunks,
+        "failedChunks": sum(1 for result in results if not result),
+        "products": products,
+        "seconds": round(elapsed, 2),
+        "firstProductSeconds": round(first_product[0] - started, 3) if first_product else None,
+        "chunksPerMinute": round(chunks / elapsed * 60, 1),
+        "productsPerSecond": round(products / elapsed, 1),
+        "clientRequests": guard.requests,
+        "clientRetries": guard.retries,
+        "server": dict(server.stats),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Local OpenAI-compatible server for offline extraction runs')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency', type=float, default=0.2, help='Seconds to the first token (default 0.2)')
+    parser.add_argument('--jitter', type=float, default=0.1, help='Random +/- seconds added to the latency')
+    parser.add_argument('--tokens-per-second', type=float,
+                        help='Generation speed after the first token (default: instant)')
+    parser.add_argument('--rpm', type=float, help='Server-side requests per minute before answering 429')
+    parser.add_argument('--tpm', type=float, help='Server-side tokens per minute before answering 429')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with a random 429')
+    parser.add_argument('--server-error-rate', type=float, default=0.0,
+                        help='Share of requests answered with a 500')
+    parser.add_argument('--load-test', type=int, metavar='CHUNKS',
+                        help='Send this many synthetic chunks through the extractor, print the results and exit')
+    parser.add_argument('--concurrency', type=int, default=8, help='Load test: concurrent requests')
+    parser.add_argument('--rows-per-chunk', type=int, default=40, help='Load test: pricelist rows per chunk')
+    parser.add_argument('--client-rpm', type=float, help='Load test: client-side requests per minute')
+    parser.add_argument('--client-tpm', type=float, help='Load test: client-side tokens per minute')
+    parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES, help='Load test: retries per chunk')
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(
+        args.host, 0 if args.load_test else args.port, args.latency, args.jitter,
+        args.rpm, args.tpm, args.error_rate, args.server_error_rate,
+        tokens_per_second=args.tokens_per_second,
+    )
+    if args.load_test:
+        with server:
+            result = load_test(server, args.load_test, args.concurrency, args.client_rpm,
+                               args.client_tpm, args.max_retries, args.rows_per_chunk)
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"Fake OpenAI API listening on {server.url} (Ctrl+C to stop)")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
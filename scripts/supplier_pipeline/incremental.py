@@ -0,0 +1,208 @@
+"""
+Incremental pricelist refresh
+Keeps a per-row fingerprint index from the previous run so a new pricelist can be
+classified into added / removed / price-changed / unchanged rows, and only new
+rows need to be extracted again.
+"""
+
+import hashlib
+import json
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .layouts import parse_price
+from .output import atomic_write
+
+INDEX_VERSION = 1
+PRICE_PATTERN = re.compile(r'\d{1,3}(?:,\d{3})*\.\d{2}')
+
+ChunkResult = Tuple[List[str], List[Dict[str, Any]]]
+
+
+def line_key(line: str) -> Tuple[str, Optional[float]]:
+    """Split a raw row into a price-independent key and its (last) price"""
+    prices = PRICE_PATTERN.findall(line)
+    price = parse_price(prices[-1]) if prices else None
+    key = ' '.join(PRICE_PATTERN.sub(' ', line).split()).upper()
+    return key, price
+
+
+def fingerprint(key: str) -> str:
+    """Short stable hash used as the index key for a row"""
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _unique(keys: Iterable[str]) -> List[str]:
+    """Disambiguate repeated keys (identical rows listed twice) by occurrence"""
+    seen: Dict[str, int] = {}
+    unique = []
+    for key in keys:
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        unique.append(key if count == 0 else f"{key}#{count + 1}")
+    return unique
+
+
+class RefreshPlan:
+    """Classification of the current rows against the previous run"""
+
+    def __init__(self, previous: Dict[str, Dict[str, Any]]):
+        self.previous = previous
+        self.current: Dict[str, Dict[str, Any]] = {}
+        self.added: List[Dict[str, Any]] = []
+        self.price_changed: List[Dict[str, Any]] = []
+        self.unchanged = 0
+        self.rows_to_extract: List[str] = []
+        self._extract_ids: List[str] = []
+        self._extract_position: Dict[str, int] = {}
+        self._llm_rows: List[Tuple[str, str]] = []
+        self._reused: Dict[str, Dict[str, Any]] = {}
+        # Progress of release(): extracted rows covered so far and the next row to hand out
+        self._extracted = 0
+        self._released = 0
+        self._by_row: Dict[str, List[Dict[str, Any]]] = {}
+
+    def _classify(self, key: str, label: str, price: Optional[float]) -> Optional[Dict[str, Any]]:
+        """Record one row; returns the previous entry when the row already existed"""
+        row_id = fingerprint(key)
+        old = self.previous.get(row_id)
+        self.current[row_id] = {"label": label, "price": price, "product": None}
+        if old is None:
+            self.added.append({"row": label, "price": price})
+            return None
+        if old.get("price") != price:
+            self.price_changed.append({"row": label, "oldPrice": old.get("price"), "newPrice": price})
+        else:
+            self.unchanged += 1
+        return old
+
+    def add_parsed(self, keys: List[str], products: List[Dict[str, Any]]) -> None:
+        """Classify rows the layout parser already turned into products"""
+        for key, product in zip(_unique(keys), products):
+            label = f"{product.get('sku', '')} {product.get('name', '')} {product.get('unit', '')}".strip()
+            # Parsed rows are cheap to parse again, so their products aren't stored
+            self._classify(key, label, product.get("unitPrice"))
+
+    def add_llm_rows(self, rows: List[str]) -> None:
+        """Classify rows that need the LLM; only new ones are queued for extraction"""
+        keyed = [line_key(row) for row in rows]
+        for row, key, (_, price) in zip(rows, _unique(key for key, _ in keyed), keyed):
+            row_id = fingerprint(key)
+            self._llm_rows.append((row_id, row))
+            old = self._classify(key, row, price)
+            if old is not None and old.get("product") is not None:
+                product = dict(old["product"])
+                if price is not None:
+                    product["unitPrice"] = price
+                self._reused[row_id] = product
+                self.current[row_id]["product"] = product
+            else:
+                self._extract_position[row_id] = len(self._extract_ids)
+                self.rows_to_extract.append(row)
+                self._extract_ids.append(row_id)
+
+    @property
+    def removed(self) -> List[Dict[str, Any]]:
+        return [
+            {"row": entry.get("label"), "price": entry.get("price")}
+            for row_id, entry in self.previous.items()
+            if row_id not in self.current
+        ]
+
+    def release(self, rows: List[str], products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attach one chunk's fresh LLM output to its rows and return the products now ready
+
+        Call it for each chunk in order; products come back in pricelist order,
+        with reused rows slotted in between, as soon as every earlier row is known.
+        """
+        if rows:
+            # Chunks cover rows_to_extract in order, so row ids can be consumed in step
+            row_ids = self._extract_ids[self._extracted:self._extracted + len(rows)]
+            self._extracted += len(rows)
+            if len(rows) == len(products):
+                # The model answered row for row, so each product can be remembered
+                for row_id, product in zip(row_ids, products):
+                    self._by_row[row_id] = [product]
+                    self.current[row_id]["product"] = product
+            else:
+                # Can't tell which row produced which product; keep them together
+                # and let those rows be extracted again next time
+                self._by_row[row_ids[0]] = list(products)
+        return self._take(self._extracted)
+
+    def release_rest(self) -> List[Dict[str, Any]]:
+        """Products of the rows after the last chunk (reused rows only)"""
+        return self._take(len(self._extract_ids))
+
+    def _take(self, extracted: int) -> List[Dict[str, Any]]:
+        ready: List[Dict[str, Any]] = []
+        while self._released < len(self._llm_rows):
+            row_id = self._llm_rows[self._released][0]
+            if row_id in self._reused:
+                ready.append(self._reused[row_id])
+            elif self._extract_position[row_id] < extracted:
+                ready.extend(self._by_row.pop(row_id, []))
+            else:
+                break
+            self._released += 1
+        return ready
+
+    def finish(self, chunk_results: List[ChunkResult]) -> List[Dict[str, Any]]:
+        """Attach fresh LLM output to rows and return all LLM-row products in pricelist order"""
+        ordered: List[Dict[str, Any]] = []
+        for rows, products in chunk_results:
+            ordered.extend(self.release(rows, products))
+        return ordered + self.release_rest()
+
+    def summary(self) -> str:
+        return (f"{len(self.added)} added, {len(self.removed)} removed, "
+                f"{len(self.price_changed)} price changes, {self.unchanged} unchanged; "
+                f"{len(self.rows_to_extract)} rows need extraction")
+
+    def delta(self, supplier: str) -> Dict[str, Any]:
+        return {
+            "supplier": supplier,
+            "generatedAt": datetime.now(timezone.utc).isoformat(),
+            "unchanged": self.unchanged,
+            "added": self.added,
+            "removed": self.removed,
+            "priceChanged": self.price_changed,
+        }
+
+
+class RowIndex:
+    """Per-supplier row index persisted between runs"""
+
+    def __init__(self, path: Path, ignore_previous: bool = False):
+        self.path = Path(path)
+        self.ignore_previous = ignore_previous
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        if self.ignore_previous or not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable row index {self.path}: {e}")
+            return {}
+        if data.get("version") != INDEX_VERSION:
+            return {}
+        return data.get("rows", {})
+
+    def plan(self) -> RefreshPlan:
+        return RefreshPlan(self.load())
+
+    def save(self, rows: Dict[str, Dict[str, Any]]) -> None:
+        """Replace the index with a plan's current rows in one step; call only once the run's outputs are published"""
+        with atomic_write(self.path) as f:
+            json.dump({"version": INDEX_VERSION, "rows": rows}, f,
+                      ensure_ascii=False, separators=(',', ':'))
+
+
+def write_price_delta(path: Path, delta: Dict[str, Any]) -> None:
+    """Write the compact price-delta file for one supplier"""
+    with atomic_write(path) as f:
+        json.dump(delta, f, ensure_ascii=False, separators=(',', ':'))
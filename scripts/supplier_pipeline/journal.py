@@ -0,0 +1,113 @@
+"""
+Extraction journal
+Append-only JSON-lines record of completed chunks and suppliers, so an interrupted
+run (rate limits, crashes, Ctrl-C) resumes without redoing finished work
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+def chunk_key(supplier: str, model: str, chunk: str) -> str:
+    """Identity of one extraction request within a run"""
+    return hashlib.sha256(f"{supplier}\0{model}\0{chunk}".encode('utf-8')).hexdigest()
+
+
+class ExtractionJournal:
+    """Checkpoints per chunk and per supplier, replayed on the next start"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        # Work replayed from an interrupted run; records written by this run are not kept in memory
+        self.chunks: Dict[str, List[Dict[str, Any]]] = {}
+        self.suppliers: Dict[str, Dict[str, Any]] = {}
+        # Suppliers are processed on several threads that share one journal
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write; everything before it is intact
+                    continue
+                if record.get("type") == "chunk":
+                    self.chunks[record["key"]] = record["products"]
+                elif record.get("type") == "supplier":
+                    self.suppliers[record["supplier"]] = record
+
+    @property
+    def resuming(self) -> bool:
+        return bool(self.chunks or self.suppliers)
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        self._append_parts([json.dumps(record, ensure_ascii=False, separators=(',', ':')), '\n'])
+
+    def _append_parts(self, parts: Iterable[str]) -> None:
+        """Write one record from pieces, so large records never sit in memory as a single string"""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                for part in parts:
+                    f.write(part)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def chunk_products(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        return self.chunks.get(key)
+
+    def record_chunk(self, key: str, products: List[Dict[str, Any]]) -> None:
+        self._append({"type": "chunk", "key": key, "products": products})
+
+    def supplier_products(self, supplier: str, source_hash: str) -> Optional[List[Dict[str, Any]]]:
+        """Products of a supplier finished earlier in this run, if its source is unchanged"""
+        record = self.suppliers.get(supplier)
+        if record is None or record.get("sourceHash") != source_hash:
+            return None
+        return record["products"]
+
+    def supplier_refresh(self, supplier: str) -> Optional[Dict[str, Any]]:
+        """Row index and price delta journaled with a finished supplier, if it was extracted incrementally"""
+        record = self.suppliers.get(supplier)
+        return record.get("refresh") if record is not None else None
+
+    def record_supplier(self, supplier: str, source_hash: str, ndjson_path: Path,
+                        refresh: Optional[Dict[str, Any]] = None) -> None:
+        """Checkpoint a finished supplier, copying its products line by line from an NDJSON file
+
+        refresh holds the supplier's pending row index and price delta, so a resumed
+        run publishes the same refresh state as one that never stopped.
+        """
+        header = json.dumps({"type": "supplier", "supplier": supplier, "sourceHash": source_hash},
+                            ensure_ascii=False, separators=(',', ':'))
+
+        def parts() -> Iterator[str]:
+            yield header[:-1]
+            if refresh is not None:
+                yield ',"refresh":'
+                yield from json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).iterencode(refresh)
+            yield ',"products":['
+            with open(ndjson_path, 'r', encoding='utf-8') as f:
+                first = True
+                for line in f:
+                    line = line.rstrip('\n')
+                    if line:
+                        yield line if first else ',' + line
+                        first = False
+            yield ']}\n'
+
+        self._append_parts(parts())
+
+    def clear(self) -> None:
+        """Drop the journal once its results have been compacted into the output files"""
+        self.chunks.clear()
+        self.suppliers.clear()
+        self.path.unlink(missing_ok=True)
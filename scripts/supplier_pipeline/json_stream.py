@@ -0,0 +1,105 @@
+"""
+Incremental JSON array parsing
+Reads a model's answer as it streams in and hands back each object of the first
+top-level JSON array as soon as its closing brace arrives. Text before the array
+(a ```json fence, a sentence of preamble) is skipped, and a response cut off
+mid-array still yields every object that was complete.
+"""
+
+import json
+import re
+from typing import Any, List
+
+# Characters that change parser state; everything else is skipped in bulk
+_SPECIAL = re.compile(r'[\[\]{}"\\]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class JsonArrayStream:
+    """feed() text fragments, get back the array's objects completed so far"""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.started = False
+        self.closed = False
+        # Nesting inside the array: 0 between elements, 1 inside a top-level object
+        self.depth = 0
+        self.in_string = False
+        self._escape = False
+        self._in_object = False
+        self._fragments: List[str] = []
+        self.invalid = 0
+
+    @property
+    def truncated(self) -> bool:
+        """The array was opened but never closed"""
+        return self.started and not self.closed
+
+    def feed(self, text: str) -> List[Any]:
+        objects: List[Any] = []
+        if self.closed or not text:
+            return objects
+        pos = 0
+        if not self.started:
+            pos = text.find('[')
+            if pos < 0:
+                return objects
+            self.started = True
+            pos += 1
+        object_start = 0 if self._in_object else None
+        if self._escape:
+            # The previous fragment ended on a backslash inside a string
+            self._escape = False
+            pos += 1
+
+        while pos < len(text):
+            match = (_STRING_SPECIAL if self.in_string else _SPECIAL).search(text, pos)
+            if match is None:
+                break
+            index = match.start()
+            char = text[index]
+            pos = index + 1
+            if self.in_string:
+                if char == '\\':
+                    if pos >= len(text):
+                        self._escape = True
+                    pos += 1
+                else:
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in '{[':
+                if self.depth == 0 and char == '{':
+                    self._in_object = True
+                    object_start = index
+                self.depth += 1
+            elif self.depth == 0:
+                if char == ']':
+                    self.closed = True
+                    break
+            else:
+                self.depth -= 1
+                if self.depth == 0 and self._in_object:
+                    self._fragments.append(text[object_start:pos])
+                    self._emit(objects)
+                    object_start = None
+
+        if self._in_object and object_start is not None:
+            self._fragments.append(text[object_start:])
+        return objects
+
+    def _emit(self, objects: List[Any]) -> None:
+        raw = ''.join(self._fragments)
+        self._fragments = []
+        self._in_object = False
+        try:
+            objects.append(json.loads(raw))
+        except ValueError:
+            self.invalid += 1
+
+
+def parse_json_array(content: str) -> List[Any]:
+    """Every complete object of the first JSON array in content"""
+    return JsonArrayStream().feed(content)
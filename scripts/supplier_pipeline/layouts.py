@@ -0,0 +1,260 @@
+"""
+Pricelist layout parsers
+Compiled per-supplier row grammars that turn known pricelist layouts into products
+locally. Only rows a layout cannot parse need to go to the LLM.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Pattern, Tuple, Type
+
+# Keyword -> category table used for locally parsed rows. Order matters: when a
+# description hits several categories, the one listed first wins.
+CATEGORY_KEYWORDS = (
+    ("Beverages", "JUICE SODA WATER RTD NECTAR COLA SQUASH ENERGY DRINK TEA COFFEE NESCAFE COCOA MILO"),
+    ("Dairy", "MILK YOGHURT YOGURT CHEESE BUTTER GHEE CREAM"),
+    ("Grains & Flour", "RICE FLOUR ATTA UGALI MAIZE WIMBI MANDAZI BAKING SELFRAISING WHEAT OATS MEAL"),
+    ("Cooking Oils & Fats", "OIL FAT MARGARINE COOKING"),
+    ("Sugar & Sweeteners", "SUGAR HONEY JAM SYRUP"),
+    ("Snacks", "BISCUIT CRISPS CHIPS SWEETS CANDY CHOCOLATE GUM LOLLIPOP NUTS WAFER COOKIES"),
+    ("Personal Care", "SOAP LOTION SHAMPOO TOOTHPASTE TOOTHBRUSH DEO DEODORANT PETROLEUM WIPES DIAPER "
+                      "DIAPERS PADS SANITARY CONDOMS VASELINE HAIR"),
+    ("Household", "DETERGENT BLEACH JIK TISSUE SERVIETTE FOIL MATCHES CANDLE BROOM BRUSH SPONGE "
+                  "INSECTICIDE DOOM POLISH TROLLEY BASIN BUCKET"),
+    ("Condiments & Spices", "SALT SPICE SPICES MASALA ROYCO SAUCE KETCHUP VINEGAR PILAU CURRY PEPPER STOCK"),
+    ("Baby Care", "BABY KIDS INFANT CERELAC NAN"),
+)
+
+# Flattened to keyword -> (priority, category) so a row costs one findall plus
+# a dict lookup per word instead of a regex scan per category
+_CATEGORY_INDEX = {
+    keyword: (priority, category)
+    for priority, (category, keywords) in enumerate(CATEGORY_KEYWORDS)
+    for keyword in keywords.split()
+}
+_WORD_PATTERN = re.compile(r'[A-Z]+')
+
+
+def guess_category(description: str) -> str:
+    """Map a product description onto a retail category using CATEGORY_KEYWORDS"""
+    best = None
+    lookup = _CATEGORY_INDEX.get
+    for word in _WORD_PATTERN.findall(description.upper()):
+        hit = lookup(word)
+        if hit is None and word.endswith('S'):
+            hit = lookup(word[:-1])
+        if hit is not None and (best is None or hit < best):
+            best = hit
+    return best[1] if best is not None else "General"
+
+
+def parse_price(value: str) -> float:
+    """Convert "1,295.00" style prices to a number"""
+    return float(value.replace(',', ''))
+
+
+class LayoutResult(NamedTuple):
+    products: List[Dict[str, Any]]
+    unparsed: List[str]
+
+
+class LayoutParser:
+    """Base class for a compiled pricelist row grammar"""
+
+    name = ""
+    # Row grammar; subclasses build a product from its match groups
+    row_pattern: Pattern = re.compile(r'(?!)')
+    # Headers, footers and other boilerplate that carry no product data
+    skip_pattern: Optional[Pattern] = None
+    # False when the SKU is derived from the row position and shifts between editions
+    stable_sku = True
+
+    def reset(self) -> None:
+        """Clear any per-document state before a new parse"""
+
+    def build_product(self, match: 're.Match[str]') -> Optional[Dict[str, Any]]:
+        """Turn a row match into a product dict (without id)"""
+        raise NotImplementedError
+
+    def row_key(self, product: Dict[str, Any]) -> str:
+        """Price-independent identity of a parsed row, stable across pricelist editions"""
+        parts = [product.get("name", ""), product.get("unit", "")]
+        if self.stable_sku:
+            parts.insert(0, product.get("sku", ""))
+        return ' '.join('|'.join(str(part) for part in parts).split()).upper()
+
+    def parse_row(self, line: str) -> Optional[Dict[str, Any]]:
+        """Parse a single row, or return None if it does not fit the grammar"""
+        match = self.row_pattern.match(line)
+        if match is None:
+            return None
+        return self.build_product(match)
+
+    def parse(self, lines: Iterable[str]) -> LayoutResult:
+        """Parse every row, returning products plus the rows that need the LLM"""
+        self.reset()
+        products: List[Dict[str, Any]] = []
+        unparsed: List[str] = []
+        skip = self.skip_pattern.match if self.skip_pattern is not None else None
+        parse_row = self.parse_row
+
+        for raw_line in lines:
+            line = raw_line.strip()
+            if not line or (skip is not None and skip(line)):
+                continue
+            product = parse_row(line)
+            if product is None:
+                unparsed.append(line)
+            else:
+                products.append(product)
+        return LayoutResult(products, unparsed)
+
+
+class MahitajiLayout(LayoutParser):
+    """`KK061 ACACIA KIDS APPLE 200MLX24 CTN 940.00` -> code, description, UOM, price
+
+    Field separators are optional: the text sidecars have them glued together
+    (`KK061ACACIA KIDS APPLE 200MLX24CTN940.00`).
+    """
+
+    name = "mahitaji"
+    units = (
+        "BUNDL", "BOTTL", "STRIP", "BCKT", "BALE", "OUTR", "DRUM", "DISP", "TRAY",
+        "PCS", "CTN", "PKT", "DOZ", "BAG", "JER", "JAR", "BOX", "TIN", "PC",
+    )
+    # The description is greedy so the regex backtracks from the end of the row
+    # instead of trying every split point
+    row_pattern = re.compile(
+        r'(?P<code>[A-Z]{0,4}\d{2,6})\s?(?P<desc>.+)'
+        r'(?P<uom>' + '|'.join(units) + r')\s?'
+        r'(?P<price>\d{1,3}(?:,\d{3})*\.\d{2})$'
+    )
+    skip_pattern = re.compile(
+        r'MAHITAJI ENTERPRISES|Price List$|\[ ?AsOnDate|Code ?Item ?Unit'
+    )
+    # Multi-piece units print their count glued to the description
+    # (`JELLY6PC`, `100GX606PC`, `500GX202PC`)
+    counted_units = {"PC", "PCS", "PKT"}
+    trailing_count = re.compile(r'(?P<before>.*?)(?P<digits>\d+)$')
+    # Pack sizes that follow an X in the pricelist (500GX24); `100GX606PC` is
+    # X60 + 6PC because 606 is not one of them and 60 is
+    pack_sizes = {
+        1, 2, 3, 4, 5, 6, 8, 9, 10, 12, 15, 18, 20, 24, 25, 30, 36, 40, 45, 48, 50, 60, 70, 72,
+        80, 96, 100, 120, 144, 150, 200, 250, 300, 400, 500, 750,
+    }
+
+    def split_count(self, desc: str, uom: str) -> Tuple[str, str]:
+        """Move a multi-piece count glued to the end of desc into the unit (`6PC`, `20PKT`)"""
+        match = self.trailing_count.match(desc) if uom in self.counted_units else None
+        if match is None:
+            return desc, uom
+        before, digits = match.group('before', 'digits')
+        if re.search(r'X\s?$', before, re.IGNORECASE):
+            # Digits after the X are the pack size, possibly followed by the count
+            if int(digits) in self.pack_sizes:
+                return desc, uom
+            for width in range(len(digits) - 1, 0, -1):
+                pack, count = digits[:width], digits[width:]
+                if int(pack) in self.pack_sizes and len(count) <= 2 and count[0] != '0':
+                    return before + pack, count + uom
+            return desc, uom
+        # After a word (`JELLY6PC`, `TINS3PC`, `***2PC`) the digits are all count,
+        # unless they finish a one-letter code such as `T8` or `L9`
+        if len(digits) <= 2 and digits[0] != '0' and before and not before[-1].isdigit() \
+                and not re.search(r'(?:^|\s)[A-Z]$', before, re.IGNORECASE):
+            return before, digits + uom
+        return desc, uom
+
+    def build_product(self, match: 're.Match[str]') -> Optional[Dict[str, Any]]:
+        code, desc, uom, price = match.group('code', 'desc', 'uom', 'price')
+        desc, uom = self.split_count(desc, uom)
+        # Stars mark offers (`OFFER**6PC`, `*******2PC`); they are not part of the name
+        name = desc.strip(' *').replace('***', '').strip()
+        if not name:
+            return None
+        return {
+            "name": name,
+            "sku": code,
+            "category": guess_category(name),
+            "unitPrice": parse_price(price),
+            "unit": uom,
+            "inStock": True,
+            "minOrderQuantity": 1,
+            "leadTime": "1-2 days",
+        }
+
+
+class SamWestLayout(LayoutParser):
+    """`1 10KG ABABIL PK 386 PARBOILED RICE KES 1,295.00 Bag` -> index, description, price, unit
+
+    In the text sidecars the row index is glued to the description
+    (`110KG ABABIL ...`), so the expected next index is tracked to tell
+    `1` + `10KG ...` apart from `11` + `0KG ...`.
+    """
+
+    name = "sam-west"
+    sku_prefix = "SW"
+    stable_sku = False
+    row_pattern = re.compile(
+        r'(?P<lead>\d+)(?P<rest>.*?)KES ?(?P<price>\d{1,3}(?:,\d{3})*\.\d{2}) ?(?P<unit>[A-Za-z0-9/][A-Za-z0-9/ ]*)$'
+    )
+    skip_pattern = re.compile(
+        r'Date ?\d|Time ?\d|# ?Description|(?:Continue ?)?SUPERMARKET PRICELIST$|Page ?\d+'
+    )
+
+    def __init__(self) -> None:
+        self._next_index = 1
+
+    def reset(self) -> None:
+        self._next_index = 1
+
+    def _split_index(self, digits: str) -> Optional[int]:
+        """Work out how many leading digits belong to the row index"""
+        expected = str(self._next_index)
+        if digits.startswith(expected):
+            return len(expected)
+        # Lost sync (a row was skipped or the text starts mid-list): take the
+        # shortest prefix that still moves the index forward
+        for width in range(1, len(digits) + 1):
+            if int(digits[:width]) >= self._next_index:
+                return width
+        return None
+
+    def build_product(self, match: 're.Match[str]') -> Optional[Dict[str, Any]]:
+        lead, rest, price, unit = match.group('lead', 'rest', 'price', 'unit')
+        width = self._split_index(lead)
+        if width is None:
+            return None
+        index = int(lead[:width])
+        name = (lead[width:] + rest).strip()
+        if not name:
+            return None
+        self._next_index = index + 1
+        return {
+            "name": name,
+            "sku": f"{self.sku_prefix}-{index:05d}",
+            "category": guess_category(name),
+            "unitPrice": parse_price(price),
+            "unit": unit.strip(),
+            "inStock": True,
+            "minOrderQuantity": 1,
+            "leadTime": "1-2 days",
+        }
+
+
+LAYOUTS: Dict[str, Type[LayoutParser]] = {}
+
+
+def register_layout(layout: Type[LayoutParser]) -> Type[LayoutParser]:
+    """Make a layout available to get_layout() under its name"""
+    LAYOUTS[layout.name] = layout
+    return layout
+
+
+def get_layout(name: Optional[str]) -> Optional[LayoutParser]:
+    """Instantiate the layout registered under name, if any"""
+    layout = LAYOUTS.get(name or "")
+    return layout() if layout is not None else None
+
+
+register_layout(MahitajiLayout)
+register_layout(SamWestLayout)
@@ -0,0 +1,246 @@
+"""
+Concurrent LLM extraction
+Runs pricelist chunks through the async OpenAI client under a concurrency limit
+and a shared RequestGuard (rate limits, retries, circuit breaker), then merges
+the per-chunk answers into one renumbered product list. Answers are streamed and
+each product is validated as soon as its JSON object closes, so a response cut
+off at max_tokens still keeps every complete product.
+"""
+
+import asyncio
+import re
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from .cache import ResponseCache, cache_key
+from .client import ExtractionStopped, RequestGuard
+from .json_stream import JsonArrayStream
+from .schema import ExtractedProduct, InvalidProduct
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+DEFAULT_CONCURRENCY = 8
+# How often a running extraction checks whether its guard was stopped
+STOP_POLL_SECONDS = 0.2
+
+Messages = List[Dict[str, str]]
+
+
+class ProductStream:
+    """Stream sink that parses and validates products while the completion arrives"""
+
+    def __init__(self, on_product: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.on_product = on_product
+        self.parser = JsonArrayStream()
+        self.products: List[Dict[str, Any]] = []
+        self.rejected = 0
+
+    def reset(self) -> None:
+        self.parser.reset()
+        self.products = []
+        self.rejected = 0
+
+    def feed(self, text: str) -> None:
+        for raw in self.parser.feed(text):
+            try:
+                product = ExtractedProduct.from_raw(raw).to_dict()
+            except InvalidProduct:
+                self.rejected += 1
+                continue
+            self.products.append(product)
+            if self.on_product is not None:
+                self.on_product(product)
+
+    @property
+    def found_array(self) -> bool:
+        return self.parser.started
+
+    @property
+    def invalid(self) -> int:
+        """Objects that were malformed JSON or failed validation"""
+        return self.parser.invalid + self.rejected
+
+
+def parse_products_json(content: str) -> Optional[List[Dict[str, Any]]]:
+    """Validated products from a complete answer, or None if it holds no JSON array"""
+    stream = ProductStream()
+    stream.feed(content)
+    return stream.products if stream.found_array else None
+
+
+def supplier_id_prefix(supplier_name: str) -> str:
+    """Build the supplier_initials prefix used in product ids (e.g. "Sam West Distributors" -> "swd")"""
+    words = re.findall(r'[A-Za-z0-9]+', supplier_name)
+    if not words:
+        return "sup"
+    if len(words) == 1:
+        return words[0][:3].lower()
+    return ''.join(word[0] for word in words).lower()
+
+
+def merge_and_renumber(chunk_results: List[List[Dict[str, Any]]], id_prefix: str) -> List[Dict[str, Any]]:
+    """Flatten per-chunk results in chunk order and assign sequential ids"""
+    merged: List[Dict[str, Any]] = []
+    for products in chunk_results:
+        for product in products:
+            if isinstance(product, dict):
+                merged.append(product)
+
+    width = max(3, len(str(len(merged))))
+    for index, product in enumerate(merged, start=1):
+        product['id'] = f"{id_prefix}_{index:0{width}d}"
+    return merged
+
+
+async def _extract_chunk(
+    client: Callable[[], "AsyncOpenAI"],
+    semaphore: asyncio.Semaphore,
+    guard: RequestGuard,
+    label: str,
+    messages: Messages,
+    model: str,
+    max_tokens: int,
+    temperature: float,
+    cache: Optional[ResponseCache] = None,
+    on_product: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """Send one chunk to the model and stream-parse its product array; None if the request failed"""
+    stream = ProductStream(on_product)
+    key = None
+    if cache is not None:
+        key = cache_key(model, messages, temperature)
+        cached = cache.get(key)
+        if cached is not None:
+            stream.feed(cached)
+            if stream.found_array:
+                return stream.products
+            stream.reset()
+
+    async with semaphore:
+        try:
+            completion = await guard.complete(client(), label, messages, model, max_tokens, temperature,
+                                              sink=stream)
+        except Exception as e:
+            print(f"Error calling OpenAI API for {label}: {e}")
+            return None
+
+    if not stream.found_array:
+        print(f"Could not extract JSON from response for {label}")
+        return None
+    if stream.invalid:
+        print(f"{label}: skipped {stream.invalid} invalid products")
+    if stream.parser.truncated or completion.finish_reason == "length":
+        # Keep what arrived complete; don't cache it so a refresh asks again
+        print(f"⚠ {label}: response cut off at max_tokens, kept {len(stream.products)} complete products "
+              f"(lower --chunk-chars to avoid this)")
+    elif cache is not None:
+        cache.put(key, completion.content, model=model)
+    return stream.products
+
+
+async def extract_chunks_async(
+    supplier_name: str,
+    chunks: List[str],
+    build_messages: Callable[[str], Messages],
+    api_key: Optional[str] = None,
+    model: str = "gpt-4o",
+    max_tokens: int = 4000,
+    temperature: float = 0.1,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache: Optional[ResponseCache] = None,
+    on_chunk_done: Optional[Callable[[int, List[Dict[str, Any]]], None]] = None,
+    guard: Optional[RequestGuard] = None,
+    on_product: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    keep_results: bool = True,
+) -> List[List[Dict[str, Any]]]:
+    """Extract every chunk concurrently; results keep the original chunk order
+
+    on_chunk_done(index, products) is called as soon as each chunk succeeds and
+    on_product(index, product) for every validated product as it streams in (a
+    retried request can report a product again); failed chunks come back as empty
+    lists and are counted in a closing warning. With keep_results=False every
+    chunk comes back empty, so a caller that consumes on_chunk_done does not hold
+    the whole pricelist in memory. Pass one guard to every call of a run so all
+    suppliers share its rate limits; stopping the guard cancels outstanding chunks
+    and raises ExtractionStopped.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    guard = guard or RequestGuard()
+    clients: List["AsyncOpenAI"] = []
+    failed: List[int] = []
+
+    def client() -> "AsyncOpenAI":
+        # Opened on the first cache miss, so a run served from the cache never loads openai
+        if not clients:
+            clients.append(guard.open_client(api_key))
+        return clients[0]
+
+    async def run(index: int, chunk: str) -> List[Dict[str, Any]]:
+        products = await _extract_chunk(
+            client,
+            semaphore,
+            guard,
+            f"{supplier_name} chunk {index + 1}/{len(chunks)}",
+            build_messages(chunk),
+            model,
+            max_tokens,
+            temperature,
+            cache,
+            None if on_product is None else lambda product: on_product(index, product),
+        )
+        if products is None:
+            failed.append(index + 1)
+            return []
+        if on_chunk_done is not None:
+            on_chunk_done(index, products)
+        return products if keep_results else []
+
+    async def watch_stop() -> None:
+        # Ctrl-C reaches the main thread, not this loop; poll the guard so requests in flight end too
+        while not guard.stopped.is_set():
+            await asyncio.sleep(STOP_POLL_SECONDS)
+
+    work = asyncio.gather(*(run(index, chunk) for index, chunk in enumerate(chunks)))
+    watcher = asyncio.ensure_future(watch_stop())
+    try:
+        await asyncio.wait([work, watcher], return_when=asyncio.FIRST_COMPLETED)
+        if not work.done():
+            work.cancel()
+            try:
+                await work
+            except asyncio.CancelledError:
+                pass
+            raise ExtractionStopped(f"{supplier_name}: extraction stopped")
+        results = work.result()
+    finally:
+        watcher.cancel()
+        if clients:
+            await clients[0].close()
+    if failed:
+        print(f"⚠ {supplier_name}: {len(failed)}/{len(chunks)} chunks failed "
+              f"(chunks {', '.join(map(str, sorted(failed)))})")
+    return results
+
+
+def extract_chunk_products(
+    supplier_name: str,
+    chunks: List[str],
+    build_messages: Callable[[str], Messages],
+    **kwargs: Any,
+) -> List[List[Dict[str, Any]]]:
+    """Blocking wrapper around extract_chunks_async; one product list per chunk"""
+    if not chunks:
+        return []
+    return asyncio.run(extract_chunks_async(supplier_name, chunks, build_messages, **kwargs))
+
+
+def extract_products(
+    supplier_name: str,
+    chunks: List[str],
+    build_messages: Callable[[str], Messages],
+    id_prefix: Optional[str] = None,
+    **kwargs: Any,
+) -> List[Dict[str, Any]]:
+    """Blocking wrapper: extract all chunks, then merge and renumber the products"""
+    chunk_results = extract_chunk_products(supplier_name, chunks, build_messages, **kwargs)
+    return merge_and_renumber(chunk_results, id_prefix or supplier_id_prefix(supplier_name))
@@ -0,0 +1,333 @@
+"""
+Cross-supplier product matching
+Lines up the same product across distributors and builds a best-price table.
+Names are normalized into brand, name tokens and pack size (500GX12, 12*150G,
+10KG); candidates are blocked by pack size (or brand when there is none), and each
+block is scored at once as a NumPy matrix product of hashed character-trigram
+vectors. A shared brand and pack size is not enough on its own: matched names
+must also share words beyond the brand. Prices are normalized per piece and per
+kg/litre before comparison.
+"""
+
+import hashlib
+import re
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .product_index import ProductGroup, ProductIndex, ProductRecord
+
+FEATURE_DIM = 2048
+# Larger size blocks (e.g. every 500g item of dozens of suppliers) are split by brand
+MAX_BLOCK_ROWS = 2000
+MATCH_THRESHOLD = 0.65
+BRAND_WEIGHT = 3.0
+# Share of the shorter name's non-brand words the other name must also have
+# (ZESTA MIXED FRUIT JAM 200G vs ZESTA BAKING POWDER 250G shares none)
+MIN_TOKEN_OVERLAP = 0.5
+# Spelling variants that still count as the same word (COLOURS / COLORS)
+TOKEN_SIMILARITY = 0.8
+# Offers this far apart per piece usually mean a pack count was read wrongly
+SUSPECT_PRICE_RATIO = 2.5
+
+# Measures converted to grams / millilitres / millimetres
+_MEASURES = {
+    "KG": ("g", 1000.0), "KGS": ("g", 1000.0), "G": ("g", 1.0), "GM": ("g", 1.0), "GMS": ("g", 1.0),
+    "GR": ("g", 1.0), "GRM": ("g", 1.0), "GRMS": ("g", 1.0),
+    "L": ("ml", 1000.0), "LT": ("ml", 1000.0), "LTR": ("ml", 1000.0), "LTRS": ("ml", 1000.0),
+    "ML": ("ml", 1.0), "MLS": ("ml", 1.0), "CL": ("ml", 10.0),
+    "M": ("mm", 1000.0), "MTR": ("mm", 1000.0), "MTRS": ("mm", 1000.0), "CM": ("mm", 10.0), "MM": ("mm", 1.0),
+}
+_MEASURE_UNITS = r'KGS?|GRMS?|GRM|GR|GMS?|G|LTRS?|LT|L|MLS?|CL|MTRS?|MM|CM|M'
+PER_MEASURE = {"g": "Kg", "ml": "Litre", "mm": "Metre"}
+SIZE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(' + _MEASURE_UNITS + r')(?=X|\*|[^A-Z]|$)')
+# Item counts next to the size; nested packs (20X12X100G, 200GX12X12) multiply.
+# A second measure is not a count (30CM*15M is a 15 metre roll, not 15 rolls)
+COUNT_BEFORE = re.compile(r'(?:\d{1,3}\s*[X*]\s*)+$')
+COUNT_AFTER = re.compile(r'^(?:\s*[X*]\s*\d{1,3}(?![\d.]|\s*(?:' + _MEASURE_UNITS + r')(?![A-Z])))+')
+# Piece counts, including the outers they come in (12OUTRX24PC is 288 pieces)
+COUNT_PIECES = re.compile(
+    r'((?:\d{1,3}\s*(?:OUTRS?|OUTERS?|PKTS?|PACKS?|BOX|DOZ)\s*[X*]\s*)*)(\d{1,3})\s*(PCS|PC|PACK|\'S)\b')
+# Words may start with digits (DORMANS 3K COFFE); sizes and counts are removed first
+TOKEN_PATTERN = re.compile(r'(?<![A-Z0-9])(?:\d+[A-Z][A-Z0-9]*|[A-Z][A-Z0-9]+)')
+# Dotted initials (C.I.L) read as one word, so they stay the brand
+INITIALS_DOT = re.compile(r'(?<=\b[A-Z])\.(?=[A-Z]\b)')
+STOPWORDS = {
+    "PCS", "PC", "PACK", "CTN", "CARTON", "BALE", "BAG", "OUTER", "OUTR", "PKT", "PACKET",
+    "JAR", "TIN", "TINS", "BOTTLE", "DOZEN", "DOZ", "CASE", "THE", "AND", "WITH", "SATCH",
+}
+
+# Units priced per single item
+PIECE_UNITS = {
+    "PC", "PCS", "PIECE", "PKT", "PACKET", "JAR", "TIN", "BOTTLE", "BTL", "SACHET", "EACH",
+    "BAG", "JERICAN", "ROLL", "BAR", "TUBE", "BOX",
+}
+FIXED_PACK_UNITS = {"DOZEN": 12, "DOZ": 12, "DZ": 12}
+# Shipping packs whose item count is the one printed in the name (500GX12 CTN);
+# other packs (OUTER, BUNDL...) have no known count and can't be compared per piece
+NAMED_PACK_UNITS = {"CTN", "CARTON", "BALE", "CASE"}
+
+
+class NormalizedName(NamedTuple):
+    brand: str
+    tokens: Tuple[str, ...]
+    measure: Optional[str]
+    size: Optional[float]
+    count: int
+
+    @property
+    def size_key(self) -> Optional[str]:
+        if self.measure is None:
+            return None
+        return f"{self.size:g}{self.measure}"
+
+
+@lru_cache(maxsize=1 << 16)
+def normalize_name(name: str) -> NormalizedName:
+    """Split a pricelist description into brand, tokens and pack size"""
+    text = name.upper()
+    measure = size = None
+    count = 1
+    spans = []
+
+    match = SIZE_PATTERN.search(text)
+    if match:
+        measure, factor = _MEASURES[match.group(2)]
+        size = float(match.group(1)) * factor
+        start, end = match.span()
+        before = COUNT_BEFORE.search(text[:start])
+        after = COUNT_AFTER.search(text[end:])
+        counted = before or after
+        if counted:
+            for number in re.findall(r'\d+', counted.group()):
+                count *= int(number)
+            if before:
+                start = before.start()
+            else:
+                end += after.end()
+        spans.append((start, end))
+    pieces = COUNT_PIECES.search(text)
+    if pieces and count == 1:
+        count = int(pieces.group(2))
+        if pieces.group(3) != "'S":
+            for number in re.findall(r'\d+', pieces.group(1)):
+                count *= int(number)
+        spans.append(pieces.span())
+
+    for start, end in sorted(spans, reverse=True):
+        text = text[:start] + ' ' + text[end:]
+    text = INITIALS_DOT.sub('', text)
+    tokens = tuple(token for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS)
+    return NormalizedName(tokens[0] if tokens else "", tokens, measure, size, max(count, 1))
+
+
+def piece_price(record: ProductRecord, normalized: NormalizedName) -> Optional[float]:
+    """Price of one item, dividing pack prices (CTN, BALE, 3PC, 20PKT, DOZEN...) by the pack count"""
+    if record.price is None:
+        return None
+    unit = record.unit.upper()
+    leading = re.match(r'(\d+)\s*(?:PCS?|PKTS?)$', unit)
+    if leading:
+        return record.price / int(leading.group(1))
+    if unit in FIXED_PACK_UNITS:
+        return record.price / FIXED_PACK_UNITS[unit]
+    if unit in PIECE_UNITS:
+        return record.price
+    count = record.units_per_base or normalized.count
+    if unit in NAMED_PACK_UNITS and count > 1:
+        return record.price / count
+    return None
+
+
+@lru_cache(maxsize=1 << 16)
+def _same_token(a: str, b: str) -> bool:
+    """Equal, an abbreviation (SERV / SERVIETTE) or a close spelling (COFFE / COFFEE)"""
+    if a == b:
+        return True
+    if min(len(a), len(b)) >= 3 and (a.startswith(b) or b.startswith(a)):
+        return True
+    return min(len(a), len(b)) >= 4 and SequenceMatcher(None, a, b).ratio() >= TOKEN_SIMILARITY
+
+
+def token_overlap(a: NormalizedName, b: NormalizedName) -> float:
+    """Share of the shorter name's non-brand tokens found in the other name; 1.0 when neither has any"""
+    left, right = a.tokens[1:], b.tokens[1:]
+    if len(left) > len(right):
+        left, right = right, left
+    if not left:
+        return 0.0 if right else 1.0
+    return sum(any(_same_token(token, other) for other in right) for token in left) / len(left)
+
+
+@lru_cache(maxsize=1 << 16)
+def _bucket(gram: str) -> int:
+    digest = hashlib.blake2b(gram.encode('utf-8'), digest_size=4).digest()
+    return int.from_bytes(digest, 'little') % FEATURE_DIM
+
+
+def _features(normalized: NormalizedName) -> Dict[int, float]:
+    """Hashed brand, whole-token and character-trigram features"""
+    features: Dict[int, float] = {}
+    # Same words under a different brand (MIRINDA vs EXCEL ORANGE) are a different product
+    if normalized.brand:
+        features[_bucket(f"b:{normalized.brand}")] = BRAND_WEIGHT
+    for token in normalized.tokens:
+        bucket = _bucket(f"w:{token}")
+        features[bucket] = features.get(bucket, 0.0) + 2.0
+    padded = f" {' '.join(normalized.tokens)} "
+    for i in range(len(padded) - 2):
+        bucket = _bucket(padded[i:i + 3])
+        features[bucket] = features.get(bucket, 0.0) + 1.0
+    return features
+
+
+def _block_vectors(features: List[Dict[int, float]]) -> np.ndarray:
+    """Dense, L2-normalized vectors for one block only, so memory tracks the largest block"""
+    vectors = np.zeros((len(features), FEATURE_DIM), dtype=np.float32)
+    for row, row_features in enumerate(features):
+        if row_features:
+            vectors[row, list(row_features)] = list(row_features.values())
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _blocks(names: List[NormalizedName]) -> Iterable[List[int]]:
+    """Candidate blocks keyed on pack size (or brand when there is none); oversized ones split by brand"""
+    blocks: Dict[str, List[int]] = {}
+    for row, normalized in enumerate(names):
+        blocks.setdefault(normalized.size_key or f"brand:{normalized.brand}", []).append(row)
+    for rows in blocks.values():
+        if len(rows) <= MAX_BLOCK_ROWS:
+            yield rows
+            continue
+        by_brand: Dict[str, List[int]] = {}
+        for row in rows:
+            by_brand.setdefault(names[row].brand, []).append(row)
+        yield from by_brand.values()
+
+
+def _mutual_best(scores: np.ndarray, suppliers: np.ndarray, threshold: float) -> Iterator[Tuple[int, int]]:
+    """Pairs (i, j) from different suppliers that are each other's best match at the other's supplier"""
+    codes, local = np.unique(suppliers, return_inverse=True)
+    rows = np.arange(len(local))
+    # best[i, s]: the row of supplier s most similar to row i
+    best = np.empty((len(local), len(codes)), dtype=np.intp)
+    for code in range(len(codes)):
+        columns = np.flatnonzero(local == code)
+        best[:, code] = columns[scores[:, columns].argmax(axis=1)]
+    back = best[best, local[:, None]]
+    mutual = (
+        (back == rows[:, None])
+        & (local[best] != local[:, None])
+        & (rows[:, None] < best)
+        & (scores[rows[:, None], best] >= threshold)
+    )
+    for i, code in zip(*np.nonzero(mutual)):
+        yield int(i), int(best[i, code])
+
+
+def match_products(index: ProductIndex, threshold: float = MATCH_THRESHOLD) -> List[List[Tuple[ProductGroup, float]]]:
+    """Clusters of variant groups that are the same product at different suppliers"""
+    groups = list(index.groups.values())
+    names = [normalize_name(group.name) for group in groups]
+    supplier_codes = {supplier: code for code, supplier in enumerate(sorted({g.supplier for g in groups}))}
+    suppliers = np.array([supplier_codes[group.supplier] for group in groups], dtype=np.intp)
+
+    # Union-find over group rows so matches chain across any number of suppliers
+    parent = list(range(len(groups)))
+    score = [0.0] * len(groups)
+
+    def find(node: int) -> int:
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for rows in _blocks(names):
+        block_suppliers = suppliers[rows]
+        if len(rows) < 2 or (block_suppliers == block_suppliers[0]).all():
+            continue
+        vectors = _block_vectors([_features(names[row]) for row in rows])
+        scores = vectors @ vectors.T
+        for i, j in _mutual_best(scores, block_suppliers, threshold):
+            a, b = rows[i], rows[j]
+            if token_overlap(names[a], names[b]) < MIN_TOKEN_OVERLAP:
+                continue
+            parent[find(a)] = find(b)
+            similarity = float(scores[i, j])
+            score[a] = max(score[a], similarity)
+            score[b] = max(score[b], similarity)
+
+    clusters: Dict[int, List[Tuple[ProductGroup, float]]] = {}
+    for row, group in enumerate(groups):
+        if score[row] > 0:
+            clusters.setdefault(find(row), []).append((group, score[row]))
+    return [members for members in clusters.values() if len({group.supplier for group, _ in members}) > 1]
+
+
+def best_price_table(index: ProductIndex, threshold: float = MATCH_THRESHOLD) -> List[Dict[str, Any]]:
+    """One row per matched product with every supplier's offers normalized per piece and per kg/litre"""
+    table = []
+    for members in match_products(index, threshold):
+        reference = normalize_name(members[0][0].name)
+        offers = []
+        # Every offer has the reference's brand, all its words (or the reverse) and its size, and no
+        # two offers state different pack counts; anything less needs a look
+        verified = True
+        pack_counts = set()
+        for group, similarity in members:
+            group_name = normalize_name(group.name)
+            for variant in group.variants:
+                normalized = normalize_name(variant.name)
+                # Some pricelists reuse one code for unrelated items; keep only this product's rows
+                if (normalized.size_key != group_name.size_key
+                        or token_overlap(group_name, normalized) < MIN_TOKEN_OVERLAP):
+                    continue
+                per_piece = piece_price(variant, normalized)
+                if per_piece is None:
+                    continue
+                offer = {
+                    "supplier": variant.supplier,
+                    "id": variant.id,
+                    "name": variant.name,
+                    "unit": variant.unit,
+                    "unitPrice": variant.price,
+                    "piecePrice": round(per_piece, 2),
+                    "similarity": round(similarity, 3),
+                }
+                if normalized.size:
+                    offer[f"pricePer{PER_MEASURE[normalized.measure]}"] = round(per_piece / normalized.size * 1000, 2)
+                offers.append(offer)
+                if normalized.count > 1:
+                    pack_counts.add(normalized.count)
+                verified = (verified and _same_token(reference.brand, normalized.brand)
+                            and token_overlap(reference, normalized) == 1.0
+                            and normalized.size_key == reference.size_key)
+        if len({offer["supplier"] for offer in offers}) < 2:
+            continue
+        offers.sort(key=lambda offer: offer["piecePrice"])
+        best, worst = offers[0], offers[-1]
+        check_units = worst["piecePrice"] > best["piecePrice"] * SUSPECT_PRICE_RATIO
+        verified = verified and len(pack_counts) <= 1 and not check_units
+        table.append({
+            "product": members[0][0].name,
+            "size": reference.size_key,
+            "bestSupplier": best["supplier"],
+            "bestPiecePrice": best["piecePrice"],
+            "savingPercent": round((1 - best["piecePrice"] / worst["piecePrice"]) * 100, 1)
+            if worst["piecePrice"] else 0.0,
+            "verified": verified,
+            "checkUnits": check_units,
+            "offers": offers,
+        })
+    # Trustworthy savings first, then partial matches; rows with suspect pack counts last
+    table.sort(key=lambda row: (not row["verified"], row["checkUnits"], -row["savingPercent"]))
+    return table
+
+
+def price_comparison(suppliers_data: Dict[str, Iterable[Dict[str, Any]]],
+                     threshold: float = MATCH_THRESHOLD) -> List[Dict[str, Any]]:
+    """Best-price table straight from SupplierDataGenerator output (supplier key -> products)"""
+    return best_price_table(ProductIndex.from_products(suppliers_data), threshold)
@@ -0,0 +1,202 @@
+"""
+Run metrics
+Lightweight spans around pipeline stages (wall and CPU time, bytes in and out,
+rows produced) plus token usage and estimated cost of every OpenAI request.
+Records are appended to a JSON-lines file as they happen, one "span" or
+"request" object per line and a closing "run" object with the totals, so runs
+can be compared and API spend budgeted with any JSON tool. An optional cProfile
+dump covers the calling thread.
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+DEFAULT_METRICS_PATH = Path(__file__).resolve().parents[2] / 'data' / 'metrics' / 'pipeline-metrics.jsonl'
+
+# USD per million (prompt, completion) tokens; dated snapshots match by prefix
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+
+def model_prices(model: str) -> Optional[Tuple[float, float]]:
+    """(prompt, completion) USD per million tokens, or None for an unknown model"""
+    for name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model == name or model.startswith(name + "-"):
+            return MODEL_PRICES[name]
+    return None
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    prices = model_prices(model)
+    if prices is None:
+        return None
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+
+class Span:
+    """One timed stage; set rows, bytes_in and bytes_out on it while it runs"""
+
+    __slots__ = ("name", "attrs", "rows", "bytes_in", "bytes_out")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+        self.rows: Optional[int] = None
+        self.bytes_in: Optional[int] = None
+        self.bytes_out: Optional[int] = None
+
+
+class Metrics:
+    """Collects spans and request usage for one run; safe to share between threads"""
+
+    def __init__(self, path: Optional[Path] = None, script: str = ""):
+        self.path = Path(path) if path else None
+        self.run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.script = script
+        self.started = time.perf_counter()
+        self.started_cpu = time.process_time()
+        # name -> [count, wall seconds, cpu seconds, rows]
+        self.stages: Dict[str, list] = {}
+        # model -> [requests, prompt tokens, completion tokens]
+        self.usage: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._file = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Line-buffered so an interrupted run still leaves every finished record
+            self._file = open(self.path, 'a', encoding='utf-8', buffering=1)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if self._file is None:
+            return
+        record = dict(type=record.pop("type"), run=self.run_id, **record)
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Span]:
+        """Time the enclosed block; CPU time is that of the calling thread"""
+        span = Span(name, attrs)
+        started_at = time.time()
+        started_cpu = time.thread_time()
+        started = time.perf_counter()
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            wall = time.perf_counter() - started
+            cpu = time.thread_time() - started_cpu
+            with self._lock:
+                totals = self.stages.setdefault(name, [0, 0.0, 0.0, 0])
+                totals[0] += 1
+                totals[1] += wall
+                totals[2] += cpu
+                totals[3] += span.rows or 0
+            record: Dict[str, Any] = {"type": "span", "name": name, "start": round(started_at, 3),
+                                      "wallSeconds": round(wall, 4), "cpuSeconds": round(cpu, 4)}
+            for key, value in (("rows", span.rows), ("bytesIn", span.bytes_in), ("bytesOut", span.bytes_out)):
+                if value is not None:
+                    record[key] = value
+            record.update(span.attrs)
+            if error:
+                record["error"] = error
+            self._write(record)
+
+    def record_request(self, label: str, model: str, usage: Any, seconds: float, attempts: int) -> None:
+        """Tokens and cost of one completed request, from response.usage"""
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+        completion_tokens = getattr(usage, "completion_tokens", None) or 0
+        with self._lock:
+            totals = self.usage.setdefault(model, [0, 0, 0])
+            totals[0] += 1
+            totals[1] += prompt_tokens
+            totals[2] += completion_tokens
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        self._write({"type": "request", "label": label, "model": model, "seconds": round(seconds, 3),
+                     "attempts": attempts, "promptTokens": prompt_tokens,
+                     "completionTokens": completion_tokens,
+                     "costUsd": round(cost, 6) if cost is not None else None})
+
+    @property
+    def cost(self) -> float:
+        """Estimated USD spent so far; models without a known price count as zero"""
+        return sum(estimate_cost(model, prompt, completion) or 0.0
+                   for model, (_, prompt, completion) in self.usage.items())
+
+    def summary(self) -> str:
+        stages = ", ".join(f"{name} {totals[1]:.1f}s" for name, totals in self.stages.items())
+        lines = [f"Stage time: {stages or 'none recorded'}"]
+        for model, (requests, prompt, completion) in self.usage.items():
+            cost = estimate_cost(model, prompt, completion)
+            estimate = f"~${cost:.4f}" if cost is not None else "unknown price"
+            lines.append(f"{model}: {requests} requests, {prompt} prompt + {completion} completion tokens "
+                         f"({estimate})")
+        if self.path is not None:
+            lines.append(f"Metrics appended to {self.path}")
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        """Write the run totals and close the metrics file"""
+        self._write({
+            "type": "run",
+            "script": self.script,
+            "end": round(time.time(), 3),
+            "wallSeconds": round(time.perf_counter() - self.started, 3),
+            "cpuSeconds": round(time.process_time() - self.started_cpu, 3),
+            "stages": {name: {"count": count, "wallSeconds": round(wall, 4), "cpuSeconds": round(cpu, 4),
+                              "rows": rows}
+                       for name, (count, wall, cpu, rows) in self.stages.items()},
+            "models": {model: {"requests": requests, "promptTokens": prompt, "completionTokens": completion}
+                       for model, (requests, prompt, completion) in self.usage.items()},
+            "costUsd": round(self.cost, 6),
+        })
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+@contextmanager
+def profiled(path: Optional[str]) -> Iterator[None]:
+    """cProfile the enclosed block into path (readable with pstats or snakeviz); no-op without a path"""
+    if not path:
+        yield
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(path)
+        print(f"Saved profile to {path}")
+
+
+def add_metrics_arguments(parser: argparse.ArgumentParser) -> None:
+    """Metrics and profiling options shared by the generator scripts"""
+    parser.add_argument('--metrics', default=str(DEFAULT_METRICS_PATH),
+                        help=f'JSON-lines file that run metrics are appended to (default {DEFAULT_METRICS_PATH})')
+    parser.add_argument('--no-metrics', action='store_true', help='Do not write the metrics file')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='Write a cProfile dump of the run (suppliers are then processed one at a time)')
+
+
+def metrics_from_args(args: argparse.Namespace, script: str = "") -> Metrics:
+    return Metrics(None if args.no_metrics else Path(args.metrics), script)
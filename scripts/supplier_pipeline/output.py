@@ -0,0 +1,313 @@
+"""
+Streaming product output
+Products are appended to a staged NDJSON file (one compact product per line) as
+each extraction chunk finishes and are numbered while the file is moved into
+place; the JSON, CSV and Parquet files are then built by streaming over those
+lines, so memory use does not grow with the size of the catalog.
+"""
+
+import csv
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional
+
+from .layouts import parse_price
+
+# Same columns as data/sample-pricelist.csv (read by lib/ai/prompt-chain.ts), plus the supplier
+CSV_COLUMNS = [
+    "name", "brand", "category", "barcode", "carton barcode", "retail uom",
+    "base uom", "units per base", "unit price", "carton price", "supplier",
+]
+# Pack units priced per carton/bag rather than per piece
+BASE_UNITS = {"CTN", "CARTON", "BALE", "BAG", "BOX", "DOZ", "DOZEN", "PKT", "OUTER", "CASE", "TRAY", "JAR"}
+# "... 200MLX24" / "... 500G X 12PCS": pieces per pack at the end of a name
+PACK_SIZE_PATTERN = re.compile(r'[X*]\s*(\d{1,3})\s*(?:PCS?|S)?\s*$', re.IGNORECASE)
+NUMBER_PATTERN = re.compile(r'\d[\d,]*(?:\.\d+)?')
+PARQUET_BATCH_ROWS = 50_000
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = 'w') -> Iterator[IO]:
+    """Write to a temporary file next to path and move it into place only on success"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    kwargs = {} if 'b' in mode else {'encoding': 'utf-8', 'newline': ''}
+    try:
+        with open(tmp_path, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def iter_ndjson_lines(path: Path) -> Iterator[str]:
+    """Raw product lines of an NDJSON file, without trailing newlines"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line:
+                yield line
+
+
+def iter_ndjson(path: Path) -> Iterator[Dict[str, Any]]:
+    for line in iter_ndjson_lines(path):
+        yield json.loads(line)
+
+
+def _write_array(out: IO, lines: Iterable[str], indent: str = '') -> None:
+    """Concatenate already-serialized products into a JSON array"""
+    out.write('[')
+    first = True
+    for line in lines:
+        out.write('\n' + indent + line if first else ',\n' + indent + line)
+        first = False
+    out.write('\n' + indent[:-2] + ']' if not first else ']')
+
+
+def pack_size(name: str) -> Optional[int]:
+    match = PACK_SIZE_PATTERN.search(name or '')
+    if not match:
+        return None
+    size = int(match.group(1))
+    return size if size > 1 else None
+
+
+def coerce_price(value: Any) -> Optional[float]:
+    """unitPrice as a number; LLM rows occasionally carry it as a string"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        match = NUMBER_PATTERN.search(value)
+        return parse_price(match.group()) if match else None
+    return None
+
+
+def csv_row(product: Dict[str, Any], supplier: str = '') -> List[Any]:
+    """Map a generated product onto the sample pricelist columns"""
+    unit = str(product.get("unit") or "PCS").upper()
+    price = coerce_price(product.get("unitPrice"))
+    if unit in BASE_UNITS:
+        units_per_base = pack_size(product.get("name", "")) or 1
+        carton_price = price
+        piece_price = round(price / units_per_base, 2) if price is not None else ''
+        base_uom, retail_uom = unit, "PCS"
+    else:
+        units_per_base, carton_price, piece_price = 1, '', price
+        base_uom = retail_uom = unit
+    return [
+        product.get("name", ""),
+        product.get("brand", ""),
+        product.get("category", ""),
+        # Supplier codes are not barcodes; prompt-chain.ts dedupes imports on this column
+        product.get("pieceBarcode", ""),
+        product.get("cartonBarcode", ""),
+        retail_uom,
+        base_uom,
+        units_per_base,
+        '' if piece_price is None else piece_price,
+        '' if carton_price is None else carton_price,
+        supplier,
+    ]
+
+
+def _dump(product: Dict[str, Any]) -> str:
+    return json.dumps(product, ensure_ascii=False, separators=(',', ':'))
+
+
+class SupplierWriter:
+    """Appends one supplier's products to its staged NDJSON file as they become available"""
+
+    __slots__ = ("output", "key", "id_prefix", "path", "count", "_file")
+
+    def __init__(self, output: "ProductOutput", key: str, id_prefix: Optional[str]):
+        self.output = output
+        self.key = key
+        # Products are numbered <prefix>_001... when committed, once the total is known
+        self.id_prefix = id_prefix
+        self.path = output.staged_path(key)
+        self.count = 0
+        output.output_dir.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        with output._lock:
+            output._writing[key] = self.path
+
+    def write(self, products: Iterable[Dict[str, Any]]) -> None:
+        for product in products:
+            if isinstance(product, dict):
+                self._file.write(_dump(product))
+                self._file.write('\n')
+                self.count += 1
+
+    def close(self) -> int:
+        """Finish the staged file so commit() publishes it; returns the product count"""
+        self._file.close()
+        self.output._stage(self)
+        return self.count
+
+    def discard(self) -> None:
+        self._file.close()
+        with self.output._lock:
+            self.output._writing.pop(self.key, None)
+        self.path.unlink(missing_ok=True)
+
+
+class ProductOutput:
+    """Collects per-supplier NDJSON as results arrive and publishes all output files at the end"""
+
+    def __init__(self, output_dir: Path, exports: Iterable[str] = ()):
+        self.output_dir = Path(output_dir)
+        self.exports = set(exports)
+        self.counts: Dict[str, int] = {}
+        self._staged: Dict[str, Path] = {}
+        self._id_prefixes: Dict[str, str] = {}
+        # Staged files of suppliers still being extracted
+        self._writing: Dict[str, Path] = {}
+        self._lock = threading.Lock()
+
+    def ndjson_path(self, key: str) -> Path:
+        return self.output_dir / f"{key}_products.ndjson"
+
+    def staged_path(self, key: str) -> Path:
+        """Where a supplier's NDJSON is streamed until commit()"""
+        return self.output_dir / f".{key}_products.ndjson.staged"
+
+    def open_supplier(self, key: str, id_prefix: Optional[str] = None) -> SupplierWriter:
+        """Start streaming a supplier's products; with an id_prefix, commit() assigns sequential ids"""
+        return SupplierWriter(self, key, id_prefix)
+
+    def _stage(self, writer: SupplierWriter) -> None:
+        with self._lock:
+            self._writing.pop(writer.key, None)
+            self._staged[writer.key] = writer.path
+            self.counts[writer.key] = writer.count
+            if writer.id_prefix:
+                self._id_prefixes[writer.key] = writer.id_prefix
+            else:
+                self._id_prefixes.pop(writer.key, None)
+
+    def write_supplier(self, key: str, products: Iterable[Dict[str, Any]]) -> int:
+        """Stream already numbered products to a staged NDJSON file; safe to call from worker threads"""
+        writer = self.open_supplier(key)
+        writer.write(products)
+        return writer.close()
+
+    def abort(self) -> None:
+        """Drop staged files from a run that will not be published"""
+        with self._lock:
+            for staged in [*self._staged.values(), *self._writing.values()]:
+                try:
+                    staged.unlink(missing_ok=True)
+                except OSError:
+                    # Still open by an interrupted writer on Windows
+                    pass
+            self._staged.clear()
+            self._writing.clear()
+            self._id_prefixes.clear()
+            self.counts.clear()
+
+    def commit(self, order: Optional[List[str]] = None) -> List[Path]:
+        """Move staged NDJSON into place and build the derived files; returns the paths written"""
+        keys = [key for key in (order or list(self._staged)) if key in self._staged]
+        written: List[Path] = []
+        for key in keys:
+            target = self.ndjson_path(key)
+            staged = self._staged.pop(key)
+            id_prefix = self._id_prefixes.pop(key, None)
+            if id_prefix is None:
+                os.replace(staged, target)
+            else:
+                width = max(3, len(str(self.counts[key])))
+                with atomic_write(target) as out:
+                    for index, line in enumerate(iter_ndjson_lines(staged), start=1):
+                        product = json.loads(line)
+                        product['id'] = f"{id_prefix}_{index:0{width}d}"
+                        out.write(_dump(product))
+                        out.write('\n')
+                staged.unlink()
+            written.append(target)
+        return written + self.publish(keys)
+
+    def publish(self, keys: List[str]) -> List[Path]:
+        """Build the per-supplier JSON, combined JSON and exports from published NDJSON"""
+        written: List[Path] = []
+        for key in keys:
+            json_path = self.output_dir / f"{key}_products.json"
+            with atomic_write(json_path) as out:
+                _write_array(out, iter_ndjson_lines(self.ndjson_path(key)))
+            written.append(json_path)
+
+        combined = self.output_dir / "all_suppliers_products.json"
+        with atomic_write(combined) as out:
+            out.write('{')
+            for index, key in enumerate(keys):
+                out.write(',\n' if index else '\n')
+                out.write(f'  {json.dumps(key)}: ')
+                _write_array(out, iter_ndjson_lines(self.ndjson_path(key)), indent='    ')
+            out.write('\n}\n' if keys else '}\n')
+        written.append(combined)
+
+        if "csv" in self.exports:
+            written.append(self.write_csv(keys))
+        if "parquet" in self.exports:
+            path = self.write_parquet(keys)
+            if path is not None:
+                written.append(path)
+        return written
+
+    def write_csv(self, keys: List[str]) -> Path:
+        path = self.output_dir / "all_suppliers_products.csv"
+        with atomic_write(path) as out:
+            writer = csv.writer(out)
+            writer.writerow(CSV_COLUMNS)
+            for key in keys:
+                for product in iter_ndjson(self.ndjson_path(key)):
+                    writer.writerow(csv_row(product, key))
+        return path
+
+    def write_parquet(self, keys: List[str]) -> Optional[Path]:
+        """Columnar export in row batches; skipped when pyarrow is not installed"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("⚠ pyarrow not installed; skipping Parquet export")
+            return None
+
+        schema = pa.schema([
+            ("supplier", pa.string()),
+            ("id", pa.string()),
+            ("name", pa.string()),
+            ("sku", pa.string()),
+            ("category", pa.string()),
+            ("unitPrice", pa.float64()),
+            ("unit", pa.string()),
+            ("inStock", pa.bool_()),
+            ("minOrderQuantity", pa.int64()),
+            ("leadTime", pa.string()),
+        ])
+        path = self.output_dir / "all_suppliers_products.parquet"
+
+        def to_batch(rows: List[Dict[str, Any]]) -> Any:
+            return pa.RecordBatch.from_pylist(rows, schema=schema)
+
+        with atomic_write(path, 'wb') as out:
+            with pq.ParquetWriter(out, schema) as writer:
+                batch: List[Dict[str, Any]] = []
+                for key in keys:
+                    for product in iter_ndjson(self.ndjson_path(key)):
+                        row = {name: product.get(name) for name in schema.names}
+                        row["supplier"] = key
+                        row["unitPrice"] = coerce_price(row["unitPrice"])
+                        batch.append(row)
+                        if len(batch) >= PARQUET_BATCH_ROWS:
+                            writer.write_batch(to_batch(batch))
+                            batch = []
+                if batch:
+                    writer.write_batch(to_batch(batch))
+        return path
@@ -0,0 +1,288 @@
+"""
+PDF text extraction with a content-addressed text cache
+Pages are produced lazily; repeat runs on an unchanged PDF are served from the
+cached text through mmap without importing or running PyPDF2. Uncached PDFs are
+split into page ranges on one process pool shared by every supplier thread.
+"""
+
+import hashlib
+import mmap
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+    import PyPDF2
+
+# Bump when the way pages are extracted or stored changes
+EXTRACTOR_VERSION = "pypdf2-1"
+PAGE_SEPARATOR = "\f"
+# Existing sidecars in data/ that were written by the TypeScript tooling
+SIDECAR_SUFFIX = "_extracted_text.txt"
+# Stamp next to a sidecar holding the SHA-256 of the PDF it was extracted from;
+# the sidecar itself is plain pricelist text read as-is by the TypeScript scripts
+STAMP_SUFFIX = ".sha256"
+# Page ranges handed to each worker; several per worker keeps the pool balanced
+# when some pages are much denser than others
+RANGES_PER_WORKER = 4
+# Readers each worker keeps open, one per PDF it has recently been given pages of
+WORKER_READERS = 4
+# Below this many pages, starting workers and parsing the PDF again in each of them
+# costs more than extracting every page in this process (about 30ms a page)
+MIN_PARALLEL_PAGES = 32
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """Hash a file's contents without reading it into memory at once"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_pdf_pages(pdf_path: Path) -> Iterator[str]:
+    """Yield the text of each page with PyPDF2, one page at a time"""
+    import PyPDF2
+
+    with open(pdf_path, 'rb') as file:
+        yield from _iter_reader_pages(PyPDF2.PdfReader(file))
+
+
+def _iter_reader_pages(reader: "PyPDF2.PdfReader") -> Iterator[str]:
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def usable_workers(workers: int) -> int:
+    """Worker processes worth starting: never more than the CPUs this process may use"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return max(1, min(workers, cpus))
+
+
+# Per-process readers, opened on a worker's first page range of each PDF
+_worker_readers: Dict[Tuple[str, int, int], "PyPDF2.PdfReader"] = {}
+
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """Extract pages [start, stop) in a worker process"""
+    import PyPDF2
+
+    stat = os.stat(pdf_path)
+    key = (pdf_path, stat.st_size, stat.st_mtime_ns)
+    reader = _worker_readers.get(key)
+    if reader is None:
+        while len(_worker_readers) >= WORKER_READERS:
+            _worker_readers.pop(next(iter(_worker_readers)))
+        reader = _worker_readers[key] = PyPDF2.PdfReader(pdf_path)
+    pages = reader.pages
+    return [pages[index].extract_text() or "" for index in range(start, stop)]
+
+
+def page_pool(workers: int) -> "ProcessPoolExecutor":
+    """Process pool for page extraction
+
+    Workers start from a fresh interpreter (forkserver, or spawn where that is
+    unavailable): callers run supplier threads, and forking a multithreaded
+    process can copy locks held by other threads into the child.
+    """
+    # Imported here like PyPDF2: cache hits shouldn't pay for multiprocessing
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+def iter_pdf_pages_parallel(pdf_path: Path, workers: int,
+                            pool: Optional[Callable[[], "ProcessPoolExecutor"]] = None) -> Iterator[str]:
+    """Yield page text in order while a process pool extracts page ranges in parallel
+
+    pool returns a shared pool sized to the whole run's worker budget, for when
+    several PDFs are extracted at once; otherwise a pool of workers processes is
+    started here. Short PDFs, and hosts without a spare CPU, are extracted in this
+    process without starting any workers.
+    """
+    import PyPDF2
+
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        page_count = len(reader.pages)
+        workers = min(usable_workers(workers), page_count)
+        if workers <= 1 or page_count < MIN_PARALLEL_PAGES:
+            yield from _iter_reader_pages(reader)
+            return
+
+    owned = pool is None
+    executor = page_pool(workers) if owned else pool()
+    step = max(1, -(-page_count // (workers * RANGES_PER_WORKER)))
+    futures = [
+        executor.submit(_extract_page_range, str(pdf_path), start, min(start + step, page_count))
+        for start in range(0, page_count, step)
+    ]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        if owned:
+            executor.shutdown()
+
+
+def iter_text_pages(text_path: Path) -> Iterator[str]:
+    """Yield pages from a cached text file, split on form feeds, via mmap"""
+    if text_path.stat().st_size == 0:
+        return
+    with open(text_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        separator = PAGE_SEPARATOR.encode('ascii')
+        start = 0
+        while True:
+            end = mapped.find(separator, start)
+            if end == -1:
+                yield mapped[start:].decode('utf-8')
+                return
+            yield mapped[start:end].decode('utf-8')
+            start = end + 1
+
+
+class PdfTextCache:
+    """Looks up or produces page text for a PDF, keyed on its content hash
+
+    workers is the process budget for the whole cache: every thread extracting
+    through it shares one pool of that size. Call close() once extraction is done.
+    """
+
+    def __init__(self, cache_dir: Path, use_sidecars: bool = True, refresh: bool = False,
+                 workers: int = 1):
+        self.cache_dir = Path(cache_dir)
+        self.workers = workers
+        self.use_sidecars = use_sidecars
+        self.refresh = refresh
+        self._pool: Optional["ProcessPoolExecutor"] = None
+        self._pool_lock = threading.Lock()
+        # Sidecars already reported as unstamped, so the hint is printed once per run
+        self._unstamped: Set[Path] = set()
+
+    def _page_pool(self) -> "ProcessPoolExecutor":
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = page_pool(usable_workers(self.workers))
+            return self._pool
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the extraction workers; a later cache miss starts them again
+
+        Without wait, queued pages are cancelled and running ones are not waited for.
+        """
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def cache_path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}-{EXTRACTOR_VERSION}.txt"
+
+    @staticmethod
+    def sidecar_path(pdf_path: Path) -> Path:
+        return pdf_path.with_name(pdf_path.stem + SIDECAR_SUFFIX)
+
+    @classmethod
+    def stamp_path(cls, pdf_path: Path) -> Path:
+        sidecar = cls.sidecar_path(pdf_path)
+        return sidecar.with_name(sidecar.name + STAMP_SUFFIX)
+
+    def stamp_sidecar(self, pdf_path: Path) -> Optional[Path]:
+        """Record that pdf_path's sidecar was extracted from the PDF as it is now"""
+        pdf_path = Path(pdf_path)
+        if not self.sidecar_path(pdf_path).exists():
+            return None
+        stamp = self.stamp_path(pdf_path)
+        tmp_path = stamp.with_name(f".{stamp.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(file_sha256(pdf_path) + "\n", encoding='utf-8')
+        os.replace(tmp_path, stamp)
+        return stamp
+
+    def _usable_sidecar(self, pdf_path: Path, digest: str) -> Optional[Path]:
+        """The sidecar, if its stamp names the PDF's current content hash"""
+        if not self.use_sidecars:
+            return None
+        sidecar = self.sidecar_path(pdf_path)
+        if not sidecar.exists():
+            return None
+        try:
+            stamped = self.stamp_path(pdf_path).read_text(encoding='utf-8').strip()
+        except OSError:
+            stamped = None
+        # Modification times survive copies and checkouts unchanged, so only the hash is trusted
+        if stamped == digest:
+            return sidecar
+        with self._pool_lock:
+            report = sidecar not in self._unstamped
+            self._unstamped.add(sidecar)
+        if report:
+            print(f"⚠ {sidecar.name} is not stamped for the current {pdf_path.name}; extracting the PDF "
+                  f"instead. If the text matches the PDF, run `python -m supplier_pipeline stamp-sidecars`")
+        return None
+
+    def source_for(self, pdf_path: Path, digest: Optional[str] = None) -> Optional[Path]:
+        """Return the cached text file that would serve pdf_path, if any"""
+        if self.refresh:
+            return None
+        digest = digest or file_sha256(pdf_path)
+        cached = self.cache_path(digest)
+        if cached.exists():
+            return cached
+        return self._usable_sidecar(pdf_path, digest)
+
+    def iter_pages(self, pdf_path: Path) -> Iterator[str]:
+        """Yield page text, from cache when possible, otherwise extracting and caching it"""
+        pdf_path = Path(pdf_path)
+        digest = file_sha256(pdf_path)
+        source = self.source_for(pdf_path, digest)
+        if source is not None:
+            yield from iter_text_pages(source)
+            return
+
+        target = self.cache_path(digest)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        if self.workers > 1:
+            pages = iter_pdf_pages_parallel(pdf_path, self.workers, self._page_pool)
+        else:
+            pages = iter_pdf_pages(pdf_path)
+        complete = False
+        started = time.perf_counter()
+        page_count = 0
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as out:
+                for index, page in enumerate(pages):
+                    # Form feeds inside page text would break page splitting
+                    page = page.replace(PAGE_SEPARATOR, '\n')
+                    if index:
+                        out.write(PAGE_SEPARATOR)
+                    out.write(page)
+                    page_count += 1
+                    yield page
+            complete = True
+            elapsed = time.perf_counter() - started
+            rate = page_count / elapsed if elapsed > 0 else float(page_count)
+            print(f"Extracted {page_count} pages from {pdf_path.name} in {elapsed:.2f}s "
+                  f"({rate:.1f} pages/s, {self.workers} worker{'s' if self.workers != 1 else ''})")
+        finally:
+            # Only a fully extracted document becomes a cache entry
+            if complete:
+                os.replace(tmp_path, target)
+            else:
+                tmp_path.unlink(missing_ok=True)
+
+    def extract_text(self, pdf_path: Path) -> str:
+        """Whole-document text with one newline between pages"""
+        return "\n".join(self.iter_pages(pdf_path))
@@ -0,0 +1,262 @@
+"""
+In-memory product index
+Compact, slotted records built from the generated product data. Units of measure
+listed under the same supplier code (e.g. Mahitaji's 1110 AFYA HONEY as 3PC, JAR
+and CTN) are grouped into one ProductGroup, and every lookup (product id, SKU,
+supplier code, piece barcode, carton barcode) is a single dict access. A columnar JSON
+snapshot lets import scripts and the POS sync load 100k+ products without
+re-reading and re-parsing the per-supplier outputs.
+"""
+
+import gc
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .output import atomic_write, coerce_price, iter_ndjson, pack_size
+from .pdf_text import file_sha256
+
+SNAPSHOT_VERSION = 2
+SNAPSHOT_NAME = "product_index.json"
+
+# Snapshot column order; ProductRecord slots use the same names
+COLUMNS = (
+    "id", "supplier", "code", "name", "unit", "price", "category",
+    "piece_barcode", "carton_barcode", "units_per_base", "in_stock", "sku",
+)
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Bulk-creating 100k+ small objects otherwise triggers repeated, pointless GC passes"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class ProductRecord:
+    """One sellable unit of a product (a single pricelist row)"""
+
+    __slots__ = COLUMNS + ("group",)
+
+    def __init__(self, id: str, supplier: str, code: str, name: str, unit: str, price: Optional[float],
+                 category: str = "", piece_barcode: str = "", carton_barcode: str = "",
+                 units_per_base: Optional[int] = None, in_stock: bool = True, sku: str = ""):
+        self.id = id
+        self.supplier = supplier
+        self.code = code
+        self.name = name
+        self.unit = unit
+        self.price = price
+        self.category = category
+        self.piece_barcode = piece_barcode
+        self.carton_barcode = carton_barcode
+        self.units_per_base = units_per_base
+        self.in_stock = in_stock
+        # The supplier's own item code, empty when the row had none (code then falls back to a barcode or the name)
+        self.sku = sku
+        self.group: Optional["ProductGroup"] = None
+
+    @classmethod
+    def from_product(cls, product: Dict[str, Any], supplier: str) -> "ProductRecord":
+        """Build from a generated product or a data/processed-products.json entry"""
+        name = product.get("name", "")
+        sku = str(product.get("sku") or product.get("code") or "")
+        code = sku or str(product.get("pieceBarcode") or name)
+        return cls(
+            id=str(product.get("id") or f"{supplier}:{code}:{product.get('unit', '')}"),
+            supplier=supplier,
+            code=code,
+            name=name,
+            unit=str(product.get("unit") or product.get("baseUOM") or "PCS").upper(),
+            price=coerce_price(product.get("unitPrice", product.get("price"))),
+            category=product.get("category", ""),
+            piece_barcode=str(product.get("pieceBarcode") or ""),
+            carton_barcode=str(product.get("cartonBarcode") or ""),
+            units_per_base=product.get("unitsPerBase") or pack_size(name),
+            in_stock=bool(product.get("inStock", True)),
+            sku=sku,
+        )
+
+    def __repr__(self) -> str:
+        return f"ProductRecord({self.supplier}:{self.code} {self.name!r} {self.unit} @ {self.price})"
+
+
+class ProductGroup:
+    """All units of measure a supplier lists under one code"""
+
+    __slots__ = ("supplier", "code", "name", "variants")
+
+    def __init__(self, supplier: str, code: str, name: str):
+        self.supplier = supplier
+        self.code = code
+        self.name = name
+        self.variants: List[ProductRecord] = []
+
+    @property
+    def units(self) -> List[str]:
+        return [variant.unit for variant in self.variants]
+
+    def variant(self, unit: str) -> Optional[ProductRecord]:
+        unit = unit.upper()
+        for variant in self.variants:
+            if variant.unit == unit:
+                return variant
+        return None
+
+    def __repr__(self) -> str:
+        return f"ProductGroup({self.supplier}:{self.code} {self.name!r} {'/'.join(self.units)})"
+
+
+class ProductIndex:
+    """Products with constant-time lookup by id, supplier code and barcode"""
+
+    def __init__(self, records: Iterable[ProductRecord] = ()):
+        self.records: List[ProductRecord] = []
+        self.groups: Dict[Tuple[str, str], ProductGroup] = {}
+        self._by_id: Dict[str, ProductRecord] = {}
+        self._by_sku: Dict[str, List[ProductRecord]] = {}
+        self._by_code: Dict[str, List[ProductGroup]] = {}
+        self._by_piece_barcode: Dict[str, ProductRecord] = {}
+        self._by_carton_barcode: Dict[str, ProductRecord] = {}
+        self.extend(records)
+
+    def add(self, record: ProductRecord) -> None:
+        self.extend((record,))
+
+    def extend(self, records: Iterable[ProductRecord]) -> None:
+        with _gc_paused():
+            self._extend(list(records))
+
+    def _extend(self, records: List[ProductRecord]) -> None:
+        self.records.extend(records)
+        self._by_id.update((record.id, record) for record in records)
+        by_sku = self._by_sku
+        for record in records:
+            if record.sku:
+                by_sku.setdefault(record.sku.upper(), []).append(record)
+        # Earlier records win a shared barcode, so insert in reverse order
+        for record in reversed(records):
+            if record.piece_barcode:
+                self._by_piece_barcode[record.piece_barcode] = record
+            if record.carton_barcode:
+                self._by_carton_barcode[record.carton_barcode] = record
+
+        groups = self.groups
+        for record in records:
+            key = (record.supplier, record.code)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = ProductGroup(record.supplier, record.code, record.name)
+                self._by_code.setdefault(record.code.upper(), []).append(group)
+            group.variants.append(record)
+            record.group = group
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[ProductRecord]:
+        return iter(self.records)
+
+    def by_id(self, product_id: str) -> Optional[ProductRecord]:
+        """The variant with this generated product id (e.g. "mah_0015")"""
+        return self._by_id.get(product_id)
+
+    def by_sku(self, sku: str, supplier: Optional[str] = None) -> Optional[ProductRecord]:
+        """The first variant listed under this supplier SKU (e.g. "KK061"), optionally for one supplier"""
+        for record in self._by_sku.get(sku.upper(), ()):
+            if supplier is None or record.supplier == supplier:
+                return record
+        return None
+
+    def by_code(self, code: str, supplier: Optional[str] = None) -> List[ProductGroup]:
+        """Variant groups listed under a supplier's item code, optionally for one supplier"""
+        groups = self._by_code.get(code.upper(), [])
+        if supplier is not None:
+            return [group for group in groups if group.supplier == supplier]
+        return list(groups)
+
+    def group(self, supplier: str, code: str) -> Optional[ProductGroup]:
+        return self.groups.get((supplier, code))
+
+    def by_piece_barcode(self, barcode: str) -> Optional[ProductRecord]:
+        return self._by_piece_barcode.get(barcode)
+
+    def by_carton_barcode(self, barcode: str) -> Optional[ProductRecord]:
+        return self._by_carton_barcode.get(barcode)
+
+    def by_barcode(self, barcode: str) -> Optional[ProductRecord]:
+        """A scanned barcode may be either the piece or the carton code"""
+        return self._by_piece_barcode.get(barcode) or self._by_carton_barcode.get(barcode)
+
+    @classmethod
+    def from_products(cls, suppliers_data: Dict[str, Iterable[Dict[str, Any]]]) -> "ProductIndex":
+        return cls(
+            ProductRecord.from_product(product, supplier)
+            for supplier, products in suppliers_data.items()
+            for product in products
+        )
+
+    @classmethod
+    def from_ndjson(cls, paths: Dict[str, Path]) -> "ProductIndex":
+        """Build from the per-supplier <key>_products.ndjson files, streaming each one"""
+        return cls.from_products({supplier: iter_ndjson(path) for supplier, path in paths.items()})
+
+    def save(self, path: Path, sources: Optional[Dict[str, str]] = None) -> None:
+        """Write a columnar snapshot; sources maps file names to content hashes for staleness checks"""
+        columns = {name: [getattr(record, name) for record in self.records] for name in COLUMNS}
+        with atomic_write(path) as f:
+            json.dump({"version": SNAPSHOT_VERSION, "sources": sources or {}, "columns": columns},
+                      f, ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def from_snapshot(cls, data: Dict[str, Any]) -> "ProductIndex":
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported product index snapshot version {data.get('version')}")
+        columns = [data["columns"][name] for name in COLUMNS]
+        with _gc_paused():
+            return cls(map(ProductRecord, *columns))
+
+    @classmethod
+    def load(cls, path: Path) -> "ProductIndex":
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_snapshot(json.load(f))
+
+
+def source_hashes(paths: Dict[str, Path]) -> Dict[str, str]:
+    return {Path(path).name: file_sha256(path) for path in paths.values()}
+
+
+def ndjson_sources(output_dir: Path) -> Dict[str, Path]:
+    """Supplier key -> NDJSON products file in an output directory"""
+    return {
+        path.name[:-len("_products.ndjson")]: path
+        for path in sorted(Path(output_dir).glob("*_products.ndjson"))
+    }
+
+
+def build_product_index(output_dir: Path) -> ProductIndex:
+    """Build the index from the generated NDJSON files and write its snapshot"""
+    sources = ndjson_sources(output_dir)
+    index = ProductIndex.from_ndjson(sources)
+    index.save(Path(output_dir) / SNAPSHOT_NAME, source_hashes(sources))
+    return index
+
+
+def load_product_index(output_dir: Path) -> ProductIndex:
+    """Load the snapshot when it matches the current NDJSON files, otherwise rebuild it"""
+    snapshot = Path(output_dir) / SNAPSHOT_NAME
+    if snapshot.exists():
+        try:
+            with open(snapshot, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("sources") == source_hashes(ndjson_sources(output_dir)):
+                return ProductIndex.from_snapshot(data)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Rebuilding unreadable product index snapshot {snapshot}: {e}")
+    return build_product_index(output_dir)
@@ -0,0 +1,204 @@
+"""
+Rate limiting and retries for LLM requests
+Token buckets for requests and tokens per minute that slow down when the API
+answers 429 and recover on success, exponential backoff that honours Retry-After,
+and a circuit breaker that holds requests back once the API keeps failing. State is
+guarded by thread locks, not asyncio ones, so one limiter can be shared by
+suppliers running their own event loops on different threads.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Optional
+
+DEFAULT_MAX_RETRIES = 5
+# Never go below this share of the configured rate when adapting to 429s
+MIN_RATE_FRACTION = 0.1
+# How often requests held by a half-open breaker look again while its trial is in flight
+TRIAL_POLL_SECONDS = 0.5
+
+
+class TokenBucket:
+    """Refills continuously at rate_per_minute; acquire() waits until enough is available"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.max_rate = rate_per_minute / 60.0
+        self.rate = self.max_rate
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.available = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        # A request larger than the bucket could never fit; let it through once the bucket is full
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+                wait = (amount - self.available) / self.rate
+            await asyncio.sleep(wait)
+
+    def refund(self, amount: float) -> None:
+        """Return an over-estimate once the real usage is known"""
+        with self._lock:
+            self._refill()
+            self.available = min(self.capacity, self.available + amount)
+
+    def drain(self) -> None:
+        """Empty the bucket so nothing more goes out until it refills"""
+        with self._lock:
+            self._refill()
+            self.available = min(self.available, 0.0)
+
+    def scale(self, factor: float) -> None:
+        with self._lock:
+            self._refill()
+            self.rate = min(self.max_rate, max(self.max_rate * MIN_RATE_FRACTION, self.rate * factor))
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits shared by all in-flight requests
+
+    Additive-increase / multiplicative-decrease: every 429 cuts both rates by
+    `backoff_factor` and pauses sending for the Retry-After period, every success
+    raises them a little until they are back at the configured limits.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 backoff_factor: float = 0.7, recovery_factor: float = 1.05):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.backoff_factor = backoff_factor
+        self.recovery_factor = recovery_factor
+        self._paused_until = 0.0
+        self.throttled = 0
+
+    async def acquire(self, tokens: int = 0) -> None:
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None and tokens:
+            await self.tokens.acquire(tokens)
+
+    def record_usage(self, estimated: int, actual: Optional[int]) -> None:
+        if self.tokens is not None and actual is not None and actual < estimated:
+            self.tokens.refund(estimated - actual)
+
+    def record_success(self) -> None:
+        for bucket in (self.requests, self.tokens):
+            if bucket is not None and bucket.rate < bucket.max_rate:
+                bucket.scale(self.recovery_factor)
+
+    def record_throttle(self, retry_after: Optional[float]) -> None:
+        self.throttled += 1
+        for bucket in (self.requests, self.tokens):
+            if bucket is not None:
+                bucket.scale(self.backoff_factor)
+                bucket.drain()
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter; a server-provided Retry-After wins"""
+
+    def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES, base_delay: float = 1.0,
+                 max_delay: float = 60.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and lets one trial request
+    through after `reset_after` seconds; a success closes it again
+
+    Requests wait in wait() while the breaker is open instead of failing, so
+    pending chunks resume once the API recovers. Whoever holds the trial must
+    call release_trial() however the request ends.
+    """
+
+    def __init__(self, failure_threshold: int = 8, reset_after: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+
+    async def wait(self) -> bool:
+        """Wait until a request may be sent; True when this caller holds the half-open trial"""
+        while True:
+            with self._lock:
+                state = self.state
+                if state == "closed":
+                    return False
+                if state == "half-open" and not self._trial_in_flight:
+                    self._trial_in_flight = True
+                    return True
+                if state == "open":
+                    delay = self.opened_at + self.reset_after - time.monotonic()
+                else:
+                    delay = TRIAL_POLL_SECONDS
+            await asyncio.sleep(max(delay, 0.01))
+
+    def release_trial(self) -> None:
+        """Free the trial slot; a 429, a non-retryable error or a cancellation settles nothing"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+def retry_after_seconds(error: Any) -> Optional[float]:
+    """Read retry-after-ms / retry-after from an API error's response headers"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            continue
+    return None
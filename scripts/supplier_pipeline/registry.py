@@ -0,0 +1,96 @@
+"""
+Supplier registry
+Loads the suppliers to process from data/distributors/*.json, so onboarding a
+distributor means adding a JSON file rather than editing the generators
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class SupplierConfig:
+    """Everything the pipeline needs to know about one distributor"""
+
+    id: str
+    name: str
+    source: Path
+    layout: Optional[str] = None
+    id_prefix: Optional[str] = None
+    # Per-supplier cap on concurrent LLM requests; None uses the run default
+    concurrency: Optional[int] = None
+    contact: Dict[str, Any] = field(default_factory=dict)
+    business_info: Dict[str, Any] = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict, repr=False)
+    # The distributor JSON file this config was loaded from
+    config_path: Optional[Path] = None
+
+    @property
+    def key(self) -> str:
+        """Output key used for generated file names (e.g. "sam-west" -> "samwest")"""
+        return self.id.replace('-', '')
+
+    @property
+    def is_pdf(self) -> bool:
+        return self.source.suffix.lower() == '.pdf'
+
+
+def _resolve_source(metadata: Dict[str, Any], project_root: Path) -> Optional[Path]:
+    """Prefer the original PDF; fall back to the extracted text sidecar"""
+    for field_name in ("pricelistPdf", "pricelistSource"):
+        value = metadata.get(field_name)
+        if value:
+            path = project_root / value
+            if path.exists():
+                return path
+    return None
+
+
+def load_supplier(path: Path, project_root: Path) -> Optional[SupplierConfig]:
+    """Build a SupplierConfig from one distributor JSON file, or None if it has no usable pricelist"""
+    with open(path, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    if metadata.get("status", "active") != "active":
+        return None
+    source = _resolve_source(metadata, project_root)
+    if source is None:
+        print(f"⚠ No pricelist found for {metadata.get('id', path.stem)} ({path.name})")
+        return None
+    return SupplierConfig(
+        id=metadata.get("id", path.stem),
+        name=metadata.get("displayName") or metadata.get("name", path.stem),
+        source=source,
+        layout=metadata.get("pricelistLayout"),
+        id_prefix=metadata.get("idPrefix"),
+        concurrency=metadata.get("llmConcurrency"),
+        contact=metadata.get("contact", {}),
+        business_info=metadata.get("businessInfo", {}),
+        metadata=metadata,
+        config_path=Path(path),
+    )
+
+
+def load_distributor_files(distributors_dir: Path) -> Dict[str, Path]:
+    """Every distributor metadata file by id, including inactive ones and those without a pricelist"""
+    files = {}
+    for path in sorted(Path(distributors_dir).glob('*.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        files[metadata.get("id", path.stem)] = path
+    return files
+
+
+def load_registry(distributors_dir: Path, project_root: Path,
+                  only: Optional[List[str]] = None) -> List[SupplierConfig]:
+    """All active suppliers with a pricelist, optionally limited to the given ids"""
+    suppliers = []
+    for path in sorted(Path(distributors_dir).glob('*.json')):
+        supplier = load_supplier(path, project_root)
+        if supplier is None:
+            continue
+        if only and supplier.id not in only and supplier.key not in only:
+            continue
+        suppliers.append(supplier)
+    return suppliers
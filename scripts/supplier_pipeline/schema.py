@@ -0,0 +1,99 @@
+"""
+Extracted product schema
+Typed, slotted record for one product returned by the model. Values are coerced
+the way the prompt asks for them (unitPrice "KES 1,295.00" -> 1295.0, quantities
+as integers, inStock as a boolean); rows without a usable name are rejected.
+Keys the schema doesn't know (unit, brand...) are kept as they came.
+"""
+
+import re
+from typing import Any, Dict, Optional
+
+from .output import coerce_price
+
+DEFAULT_LEAD_TIME = "1-2 days"
+_FALSE_WORDS = {"false", "no", "n", "0", "out of stock", ""}
+
+
+class InvalidProduct(ValueError):
+    """The model returned something that can't be used as a product"""
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    return " ".join(str(value).split())
+
+
+def _quantity(value: Any) -> int:
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return max(1, int(value))
+    match = re.search(r'\d+', str(value or ""))
+    return max(1, int(match.group())) if match else 1
+
+
+def _flag(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() not in _FALSE_WORDS
+    return True if value is None else bool(value)
+
+
+class ExtractedProduct:
+    """One product as the extraction prompt defines it"""
+
+    __slots__ = ("id", "name", "sku", "category", "unit_price", "in_stock",
+                 "min_order_quantity", "lead_time", "extra")
+
+    # JSON key -> slot
+    FIELDS = {
+        "id": "id", "name": "name", "sku": "sku", "category": "category",
+        "unitPrice": "unit_price", "inStock": "in_stock",
+        "minOrderQuantity": "min_order_quantity", "leadTime": "lead_time",
+    }
+
+    def __init__(self, id: str, name: str, sku: str = "", category: str = "",
+                 unit_price: float = 0.0, in_stock: bool = True, min_order_quantity: int = 1,
+                 lead_time: str = DEFAULT_LEAD_TIME, extra: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.name = name
+        self.sku = sku
+        self.category = category
+        self.unit_price = unit_price
+        self.in_stock = in_stock
+        self.min_order_quantity = min_order_quantity
+        self.lead_time = lead_time
+        self.extra = extra or {}
+
+    @classmethod
+    def from_raw(cls, raw: Any) -> "ExtractedProduct":
+        """Validate and coerce one object from the model's JSON array"""
+        if not isinstance(raw, dict):
+            raise InvalidProduct(f"expected an object, got {type(raw).__name__}")
+        name = _text(raw.get("name"))
+        if not name:
+            raise InvalidProduct("product has no name")
+        price = raw.get("unitPrice")
+        unit_price = coerce_price(price) if price not in (None, "") else 0.0
+        if unit_price is None:
+            raise InvalidProduct(f"unitPrice {price!r} of {name!r} is not a number")
+        return cls(
+            id=_text(raw.get("id")),
+            name=name,
+            sku=_text(raw.get("sku")),
+            category=_text(raw.get("category")),
+            unit_price=unit_price,
+            in_stock=_flag(raw.get("inStock")),
+            min_order_quantity=_quantity(raw.get("minOrderQuantity")),
+            lead_time=_text(raw.get("leadTime")) or DEFAULT_LEAD_TIME,
+            extra={key: value for key, value in raw.items() if key not in cls.FIELDS},
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        product = {key: getattr(self, slot) for key, slot in self.FIELDS.items()}
+        product.update(self.extra)
+        return product
+
+    def __repr__(self) -> str:
+        return f"ExtractedProduct({self.sku or self.id} {self.name!r} @ {self.unit_price})"
@@ -0,0 +1,207 @@
+"""
+Synthetic pricelists
+Deterministic pricelists in the Mahitaji and Sam West row formats, written as
+extracted text (rows glued together the way PyPDF2 returns them) or as a real
+PDF, for benchmarking the pipeline at sizes the two real pricelists can't reach.
+About 2% of rows are deliberately malformed so the LLM fallback has work too.
+The PDF writer needs no extra dependencies.
+
+    python -m supplier_pipeline.synthetic --layout sam-west --rows 100000 --format pdf -o sw.pdf
+"""
+
+import argparse
+import random
+import zlib
+from pathlib import Path
+from typing import Iterator, List
+
+GENERATOR_VERSION = 2
+ROWS_PER_PAGE = 60
+MALFORMED_SHARE = 0.02
+LAYOUTS = ("mahitaji", "sam-west")
+
+BRANDS = (
+    "ACACIA", "AFIA", "AFYA", "ARIEL", "BASMATI", "BLUEBAND", "BROOKSIDE", "CADBURY", "COLGATE",
+    "DAAWAT", "DETTOL", "DOWNY", "EXE", "FALCON", "FRESHA", "GEISHA", "GOLDEN", "HARPIC", "HUGGIES",
+    "IMPERIAL", "JOGOO", "KABRAS", "KASKAZI", "KENSALT", "KETEPA", "KIMBO", "KIWI", "KUKU", "LIFEBUOY",
+    "MENENGAI", "MILO", "MUMIAS", "NESCAFE", "NIVEA", "OMO", "PEARL", "PEPSODENT", "PISHORI",
+    "PRESTIGE", "PROPER", "RAHA", "RINA", "ROYCO", "SAFARI", "SAVANNAH", "SOKO", "SUNLIGHT", "TILDA",
+    "TOP", "TUSKER", "USAFI", "VASELINE", "WIMBI", "ZESTA",
+)
+PRODUCTS = (
+    "APPLE JUICE", "MANGO NECTAR", "ORANGE SQUASH", "COLA SODA", "DRINKING WATER", "BLACK TEA",
+    "INSTANT COFFEE", "DRINKING CHOCOLATE", "FRESH MILK", "LONG LIFE MILK", "STRAWBERRY YOGHURT",
+    "SALTED BUTTER", "PARBOILED RICE", "BIRYANI RICE", "MAIZE FLOUR", "WHEAT FLOUR", "ATTA MARK",
+    "PORRIDGE OATS", "COOKING OIL", "VEGETABLE FAT", "MARGARINE", "WHITE SUGAR", "BROWN SUGAR",
+    "PURE HONEY", "MIXED FRUIT JAM", "DIGESTIVE BISCUIT", "POTATO CRISPS", "CHOCOLATE WAFER",
+    "MILK CHOCOLATE", "CHEWING GUM", "BATHING SOAP", "BODY LOTION", "ANTI DANDRUFF SHAMPOO",
+    "HERBAL TOOTHPASTE", "PETROLEUM JELLY", "BABY WIPES", "BABY DIAPERS", "SANITARY PADS",
+    "WASHING DETERGENT", "BAR SOAP", "TOILET TISSUE", "KITCHEN SERVIETTE", "SAFETY MATCHES",
+    "INSECTICIDE SPRAY", "SHOE POLISH", "TABLE SALT", "CURRY POWDER", "PILAU MASALA",
+    "BEEF STOCK", "TOMATO SAUCE", "CHILLI SAUCE", "WHITE VINEGAR", "PEANUT BUTTER",
+)
+SIZES = ("50G", "100G", "200G", "250G", "400G", "500G", "1KG", "2KG", "5KG", "10KG",
+         "200ML", "250ML", "300ML", "500ML", "1LTR", "1.5LTR", "2LTR", "5LTR")
+COUNTS = (6, 10, 12, 20, 24, 36, 48)
+# Multi-piece units glue their count to the pack size (500GX246PC = 500GX24, 6PC)
+MAHITAJI_UNITS = ("CTN", "CTN", "CTN", "PCS", "PKT", "BALE", "OUTR", "DOZ", "BAG", "JAR", "3PC", "TIN",
+                  "6PC", "12PC", "20PKT")
+# Units the Mahitaji layout doesn't know, so those rows fall through to the LLM
+UNKNOWN_UNITS = ("ROLL", "SACHET", "KG")
+SAM_WEST_UNITS = ("Bag", "Bale", "Packet", "Piece", "Carton", "Tin", "Jar", "Bottle", "Outer")
+
+
+def parse_size(value: str) -> int:
+    """Row count from "1000", "100k" or "1m" """
+    value = value.strip().lower()
+    factor = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    return int(float(value[:-1] if factor > 1 else value) * factor)
+
+
+def format_size(rows: int) -> str:
+    """Inverse of parse_size for round numbers ("100k")"""
+    for suffix, factor in (("m", 1_000_000), ("k", 1_000)):
+        if rows >= factor and rows % factor == 0:
+            return f"{rows // factor}{suffix}"
+    return str(rows)
+
+
+def _price(rng: random.Random) -> str:
+    return f"{rng.randint(2_000, 1_200_000) / 100:,.2f}"
+
+
+def _description(rng: random.Random) -> str:
+    size = rng.choice(SIZES)
+    if rng.random() < 0.6:
+        size = f"{size}X{rng.choice(COUNTS)}"
+    return f"{rng.choice(BRANDS)} {rng.choice(PRODUCTS)} {size}"
+
+
+def _mahitaji_page(rng: random.Random, first_row: int, rows: int) -> List[str]:
+    lines = ["MAHITAJI ENTERPRISES LTD", "Price List", " [ AsOnDate to 23/07/2025 ]", "CodeItemUnitP7"]
+    for row in range(first_row, first_row + rows):
+        code = f"KK{row:03d}" if rng.random() < 0.3 else str(1000 + row)
+        stars = "***" if rng.random() < 0.1 else ""
+        if rng.random() < MALFORMED_SHARE:
+            lines.append(f"{code}{_description(rng)}{stars} {rng.choice(UNKNOWN_UNITS)} {_price(rng)}")
+        else:
+            lines.append(f"{code}{_description(rng)}{stars}{rng.choice(MAHITAJI_UNITS)}{_price(rng)}")
+    return lines
+
+
+def _sam_west_page(rng: random.Random, first_row: int, rows: int, page: int) -> List[str]:
+    lines = ["Date 26/07/2025", "Time 09:48",
+             "SUPERMARKET PRICELIST" if page == 1 else "Continue SUPERMARKET PRICELIST",
+             "# Description BUYING PRICE UNIT"]
+    for row in range(first_row, first_row + rows):
+        index = row + 1
+        if rng.random() < MALFORMED_SHARE:
+            lines.append(f"{index}{_description(rng)} {_price(rng)}")
+        else:
+            lines.append(f"{index}{_description(rng)}KES {_price(rng)}{rng.choice(SAM_WEST_UNITS)}")
+    lines.append(f"Page {page} Continued on next page Printed by SAP Business One")
+    return lines
+
+
+def iter_pages(layout: str, rows: int, seed: int = 0) -> Iterator[List[str]]:
+    """Pages of pricelist text lines, headers included"""
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown synthetic layout {layout!r}; expected one of {', '.join(LAYOUTS)}")
+    rng = random.Random(f"{layout}:{seed}")
+    for page, first_row in enumerate(range(0, rows, ROWS_PER_PAGE), start=1):
+        count = min(ROWS_PER_PAGE, rows - first_row)
+        if layout == "mahitaji":
+            yield _mahitaji_page(rng, first_row, count)
+        else:
+            yield _sam_west_page(rng, first_row, count, page)
+
+
+def write_text(path: Path, layout: str, rows: int, seed: int = 0) -> Path:
+    """The pricelist as an extracted-text file"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for lines in iter_pages(layout, rows, seed):
+            f.write('\n'.join(lines))
+            f.write('\n')
+    return path
+
+
+def _pdf_string(line: str) -> bytes:
+    escaped = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return f"({escaped}) Tj T*\n".encode('latin-1', 'replace')
+
+
+def write_pdf(path: Path, layout: str, rows: int, seed: int = 0) -> Path:
+    """The pricelist as an A4 PDF with one Helvetica text line per row"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    offsets = {}
+    page_ids: List[int] = []
+
+    with open(path, 'wb') as f:
+        def start_object(number: int) -> None:
+            offsets[number] = f.tell()
+            f.write(f"{number} 0 obj\n".encode('ascii'))
+
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        start_object(1)
+        f.write(b"<< /Type /Catalog /Pages 2 0 R >>\nendobj\n")
+        start_object(3)
+        f.write(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>\nendobj\n")
+
+        # Objects 1-3 are the catalog, page tree and font; each page takes two more
+        number = 4
+        for lines in iter_pages(layout, rows, seed):
+            content = zlib.compress(
+                b"BT /F1 8 Tf 11 TL 36 806 Td\n" + b"".join(map(_pdf_string, lines)) + b"ET\n")
+            start_object(number)
+            f.write(f"<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n".encode('ascii'))
+            f.write(content)
+            f.write(b"\nendstream\nendobj\n")
+            start_object(number + 1)
+            f.write(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                    f"/Resources << /Font << /F1 3 0 R >> >> /Contents {number} 0 R >>\nendobj\n".encode('ascii'))
+            page_ids.append(number + 1)
+            number += 2
+
+        start_object(2)
+        kids = ' '.join(f"{page} 0 R" for page in page_ids)
+        f.write(f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>\nendobj\n".encode('ascii'))
+
+        xref = f.tell()
+        f.write(f"xref\n0 {number}\n0000000000 65535 f \n".encode('ascii'))
+        for obj in range(1, number):
+            f.write(f"{offsets[obj]:010d} 00000 n \n".encode('ascii'))
+        f.write(f"trailer\n<< /Size {number} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('ascii'))
+    return path
+
+
+def fixture_path(fixtures_dir: Path, layout: str, rows: int, source: str, seed: int = 0) -> Path:
+    """Generate a pricelist once and reuse it across benchmark runs"""
+    suffix = "pdf" if source == "pdf" else "txt"
+    path = Path(fixtures_dir) / f"{layout}-{format_size(rows)}-s{seed}-v{GENERATOR_VERSION}.{suffix}"
+    if not path.exists():
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        (write_pdf if source == "pdf" else write_text)(tmp_path, layout, rows, seed)
+        tmp_path.replace(path)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Write a synthetic supplier pricelist')
+    parser.add_argument('--layout', choices=LAYOUTS, default='mahitaji')
+    parser.add_argument('--rows', default='1k', help='Product rows, e.g. 1000, 100k, 1m (default 1k)')
+    parser.add_argument('--format', choices=['text', 'pdf'], default='text')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', required=True, help='File to write')
+    args = parser.parse_args()
+
+    rows = parse_size(args.rows)
+    writer = write_pdf if args.format == 'pdf' else write_text
+    path = writer(Path(args.output), args.layout, rows, args.seed)
+    print(f"✓ Wrote {rows} {args.layout} rows to {path} ({path.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
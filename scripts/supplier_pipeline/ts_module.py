@@ -0,0 +1,133 @@
+"""
+Generated TypeScript product modules
+Writes data/distributors/<id>-products.ts for each supplier plus an index module
+that data/distributor-data.ts imports. Files are rendered in a stream and only
+replace the existing file when their content hash differs, so unchanged
+suppliers don't trigger editor, TypeScript or bundler rebuilds.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Set
+
+from .output import coerce_price
+from .pdf_text import file_sha256
+from .registry import SupplierConfig, load_distributor_files
+
+GENERATED_BY = "scripts/generate-supplier-products.py"
+INDEX_MODULE = "index.ts"
+
+
+def products_var(supplier_id: str) -> str:
+    """Exported array name, e.g. "sam-west" -> "sam_west_products" """
+    return re.sub(r'\W', '_', supplier_id) + "_products"
+
+
+def metadata_var(supplier_id: str) -> str:
+    """Metadata import name, e.g. "sam-west" -> "samWestMetadata" """
+    words = re.findall(r'[A-Za-z0-9]+', supplier_id)
+    return words[0].lower() + ''.join(word.capitalize() for word in words[1:]) + "Metadata"
+
+
+def products_module_path(distributors_dir: Path, supplier_id: str) -> Path:
+    return Path(distributors_dir) / f"{supplier_id}-products.ts"
+
+
+def category_slug(category: str) -> str:
+    """Match the lowercase, hyphenated categories of the existing modules ("Personal Care" -> "personal-care")"""
+    return re.sub(r'[^a-z0-9]+', '-', (category or 'general').lower()).strip('-') or 'general'
+
+
+def to_module_product(product: Dict[str, Any], index: int, distributor_name: str) -> Dict[str, Any]:
+    """Map a pipeline product onto the Product shape in lib/types.ts"""
+    entry = {
+        "id": index,
+        "code": product.get("sku") or product.get("id") or str(index),
+        "name": product.get("name", ""),
+        "description": product.get("description") or product.get("name", ""),
+        "unit": product.get("unit") or "PCS",
+        "price": coerce_price(product.get("unitPrice")) or 0,
+        "category": category_slug(product.get("category", "")),
+        "inStock": bool(product.get("inStock", True)),
+        "distributorName": distributor_name,
+    }
+    if product.get("brand"):
+        entry["brand"] = product["brand"]
+    return entry
+
+
+def render_products_module(supplier: SupplierConfig, products: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Yield the module source piece by piece, one product per line"""
+    distributor_name = supplier.metadata.get("name") or supplier.name
+    yield f"// {distributor_name} Products\n"
+    yield f"// Generated by {GENERATED_BY} from {supplier.source.name} - do not edit by hand\n\n"
+    yield 'import type { Product } from "@/lib/types"\n\n'
+    yield f"export const {products_var(supplier.id)}: Product[] = [\n"
+
+    categories = set()
+    first = True
+    for index, product in enumerate(products, start=1):
+        entry = to_module_product(product, index, distributor_name)
+        categories.add(entry["category"])
+        yield ("  " if first else ",\n  ") + json.dumps(entry, ensure_ascii=False)
+        first = False
+    yield "\n];\n\n" if not first else "];\n\n"
+    yield f"export const categories = {json.dumps(sorted(categories), indent=2)};\n"
+
+
+def render_index_module(distributors: Dict[str, Path], with_products: Set[str]) -> Iterator[str]:
+    """Index of every distributor, imported by data/distributor-data.ts
+
+    Distributors without a generated products module are listed with no products,
+    so they still appear in the app.
+    """
+    yield f"// Generated by {GENERATED_BY} - do not edit by hand\n\n"
+    yield 'import type { Product } from "@/lib/types"\n'
+    for supplier_id, config_path in distributors.items():
+        yield f"import {metadata_var(supplier_id)} from './{config_path.name}'\n"
+        if supplier_id in with_products:
+            yield f"import {{ {products_var(supplier_id)} }} from './{supplier_id}-products'\n"
+    yield "\nexport const generatedDistributors: Record<string, { metadata: unknown; products: Product[] }> = {\n"
+    for supplier_id in distributors:
+        products = products_var(supplier_id) if supplier_id in with_products else "[]"
+        yield f"  {json.dumps(supplier_id)}: {{ metadata: {metadata_var(supplier_id)}, products: {products} }},\n"
+    yield "}\n"
+
+
+def write_if_changed(path: Path, chunks: Iterable[str]) -> bool:
+    """Stream chunks to a temporary file and replace path only if the content hash changed"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    digest = hashlib.sha256()
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+            for chunk in chunks:
+                digest.update(chunk.encode('utf-8'))
+                f.write(chunk)
+        if path.exists() and file_sha256(path) == digest.hexdigest():
+            return False
+        os.replace(tmp_path, path)
+        return True
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def write_products_module(distributors_dir: Path, supplier: SupplierConfig,
+                          products: Iterable[Dict[str, Any]]) -> bool:
+    """Write <id>-products.ts; returns False when the existing module already matched"""
+    path = products_module_path(distributors_dir, supplier.id)
+    return write_if_changed(path, render_products_module(supplier, products))
+
+
+def write_index_module(distributors_dir: Path) -> bool:
+    """Write the index for every data/distributors/*.json, importing products modules that exist"""
+    distributors = dict(sorted(load_distributor_files(distributors_dir).items()))
+    with_products = {
+        supplier_id for supplier_id in distributors
+        if products_module_path(distributors_dir, supplier_id).exists()
+    }
+    return write_if_changed(Path(distributors_dir) / INDEX_MODULE, render_index_module(distributors, with_products))